@@ -0,0 +1,145 @@
+"""
+Generatory grafów syntetycznych do benchmarków (z ziarnem, powtarzalne).
+Każdy zwraca SyntheticGraph: wierzchołki 1..n, krawędzie jako tablica (m, 2),
+opcjonalne etykiety i pozycje (żeby pomiary nie zależały od spring_layout).
+"""
+import math
+import random
+import numpy as np
+
+LABELS = ("A", "B", "C")
+
+
+class SyntheticGraph:
+    def __init__(self, kind, n, edges, labels=None, pos=None):
+        self.kind = kind
+        self.n = n
+        self.edges = edges
+        self.labels = labels
+        self.pos = pos
+
+    @property
+    def m(self) -> int:
+        return len(self.edges)
+
+    def vertices(self):
+        return range(1, self.n + 1)
+
+    def vertex_labels(self):
+        if self.labels is None:
+            return None
+        return {v: [lbl] for v, lbl in zip(self.vertices(), self.labels)}
+
+    def positions(self):
+        return {v: self.pos[v - 1] for v in self.vertices()}
+
+    def to_graph(self, cls, placement="local"):
+        return cls(vertices=self.vertices(), edges=map(tuple, self.edges.tolist()),
+                   vertex_labels=self.vertex_labels(), pos=self.positions(),
+                   placement=placement)
+
+    def write_obj(self, path):
+        with open(path, 'w') as f:
+            for v in self.vertices():
+                lbl = f" {self.labels[v - 1]}" if self.labels is not None else ""
+                f.write(f"v {v}{lbl}\n")
+            for i, (u, v) in enumerate(self.edges.tolist(), start=1):
+                f.write(f"e {u} {v} {i}\n")
+
+    def write_csv(self, path):
+        with open(path, 'w') as f:
+            first = [str(self.n)]
+            if self.labels is not None:
+                first.extend(self.labels)
+            f.write(", ".join(first) + "\n")
+            for u, v in self.edges.tolist():
+                f.write(f"{u}, {v}\n")
+
+
+def _dedup(edges):
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    if not len(edges):
+        return edges.reshape(0, 2)
+    _, first = np.unique(edges, axis=0, return_index=True)
+    return edges[np.sort(first)]
+
+
+def random_digraph(n: int, avg_degree: float = 3.0, seed: int = 0) -> SyntheticGraph:
+    """Losowy graf skierowany (model G(n, m)) bez pętli i krawędzi wielokrotnych."""
+    rng = np.random.default_rng(seed)
+    m = int(n * avg_degree)
+    edges = _dedup(rng.integers(1, n + 1, size=(m, 2), dtype=np.int64))
+    return SyntheticGraph("random", n, edges, pos=rng.random((n, 2)))
+
+
+def _grid_edges(side):
+    ids = np.arange(1, side * side + 1, dtype=np.int64).reshape(side, side)
+    right = np.stack([ids[:, :-1].ravel(), ids[:, 1:].ravel()], axis=1)
+    down = np.stack([ids[:-1, :].ravel(), ids[1:, :].ravel()], axis=1)
+    return ids, right, down
+
+
+def _grid_pos(side):
+    ys, xs = np.divmod(np.arange(side * side), side)
+    return np.stack([xs, ys], axis=1) / max(side - 1, 1)
+
+
+def grid(n: int, seed: int = 0) -> SyntheticGraph:
+    """Kwadratowa siatka ceil(sqrt(n)) x ceil(sqrt(n)) z krawędziami w prawo i w dół."""
+    side = max(2, math.isqrt(n - 1) + 1)
+    _, right, down = _grid_edges(side)
+    return SyntheticGraph("grid", side * side, np.concatenate([right, down]),
+                          pos=_grid_pos(side))
+
+
+def scale_free(n: int, attach: int = 2, seed: int = 0) -> SyntheticGraph:
+    """
+    Graf bezskalowy (przyłączanie preferencyjne): każdy nowy wierzchołek
+    wskazuje attach istniejących, losowanych proporcjonalnie do stopnia.
+    """
+    rng = random.Random(seed)
+    targets = list(range(1, attach + 2))
+    endpoints = []
+    src = []
+    dst = []
+    # mała klika na start
+    for u in targets:
+        for v in targets:
+            if u < v:
+                src.append(v)
+                dst.append(u)
+                endpoints.extend((u, v))
+    for v in range(attach + 2, n + 1):
+        chosen = set()
+        while len(chosen) < attach:
+            chosen.add(endpoints[rng.randrange(len(endpoints))])
+        for u in chosen:
+            src.append(v)
+            dst.append(u)
+            endpoints.extend((u, v))
+    edges = np.stack([np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64)], axis=1)
+    pos = np.random.default_rng(seed).random((n, 2))
+    return SyntheticGraph("scale_free", n, edges, pos=pos)
+
+
+def labelled_mesh(n: int, labels=LABELS, seed: int = 0) -> SyntheticGraph:
+    """
+    Siatka trójkątów z losowymi etykietami: krawędzie w prawo, w dół
+    i po przekątnej z powrotem, więc każda komórka ma skierowany cykl długości 3.
+    """
+    side = max(2, math.isqrt(n - 1) + 1)
+    ids, right, down = _grid_edges(side)
+    back = np.stack([ids[1:, 1:].ravel(), ids[:-1, :-1].ravel()], axis=1)
+    edges = _dedup(np.concatenate([right, down, back]))
+    rng = np.random.default_rng(seed)
+    chosen = rng.integers(0, len(labels), size=side * side)
+    return SyntheticGraph("mesh", side * side, edges,
+                          labels=[labels[i] for i in chosen], pos=_grid_pos(side))
+
+
+GENERATORS = {
+    "random": random_digraph,
+    "grid": grid,
+    "scale_free": scale_free,
+    "mesh": labelled_mesh,
+}
@@ -0,0 +1,107 @@
+"""
+Czas importu pakietu bez rysowania (import src w świeżym interpreterze).
+Kończy się kodem 1, jeśli najlepszy czas przekracza budżet albo import
+wciągnął moduły do rysowania (matplotlib, PIL).
+Z --cli sprawdza też, że main.py --out (zapis PNG przez src.render) nie ładuje pyplot.
+
+PRZYKŁADOWE UŻYCIE:
+
+     python benchmarks/import_time.py --budget 1.5 [--cli]
+
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# budżet w sekundach na import src (numpy + networkx + silnik przepisywania)
+IMPORT_BUDGET = 1.5
+FORBIDDEN_MODULES = ("matplotlib", "PIL")
+# main.py --out rysuje na płótnie Agg, bez pyplot i wyboru backendu
+CLI_FORBIDDEN_MODULES = ("matplotlib.pyplot",)
+
+_PROBE = (
+    "import sys, time, json\n"
+    "start = time.perf_counter()\n"
+    "import src\n"
+    "elapsed = time.perf_counter() - start\n"
+    "print(json.dumps({'time': elapsed, 'modules': sorted({m.split('.')[0] for m in sys.modules})}))\n"
+)
+
+# main.py --out KATALOG z domyślnymi plikami, moduły po zakończeniu
+_CLI_PROBE = (
+    "import sys, time, json, runpy\n"
+    "sys.argv = ['main.py', '--out', sys.argv[1]]\n"
+    "start = time.perf_counter()\n"
+    "runpy.run_path('main.py', run_name='__main__')\n"
+    "elapsed = time.perf_counter() - start\n"
+    "print(json.dumps({'time': elapsed, 'modules': sorted(sys.modules)}))\n"
+)
+
+
+def measure_import(repeat: int = 5):
+    """Czasy importu src w repeat świeżych procesach i moduły załadowane przy ostatnim."""
+    times = []
+    modules = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _PROBE], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout)
+        times.append(result["time"])
+        modules = result["modules"]
+    return times, modules
+
+
+def check(budget: float = IMPORT_BUDGET, repeat: int = 5) -> int:
+    times, modules = measure_import(repeat)
+    best = min(times)
+    print(f"import src: {best * 1000:.1f} ms (najlepszy z {repeat}), budżet {budget * 1000:.0f} ms")
+    status = 0
+    loaded = [m for m in FORBIDDEN_MODULES if m in modules]
+    if loaded:
+        print(f"[WARN] import src ładuje moduły do rysowania: {', '.join(loaded)}")
+        status = 1
+    if best > budget:
+        print("[WARN] przekroczony budżet czasu importu")
+        status = 1
+    return status
+
+
+def measure_cli(out_dir: str):
+    """Czas main.py --out out_dir w świeżym procesie i załadowane moduły."""
+    out = subprocess.run([sys.executable, "-c", _CLI_PROBE, out_dir], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    # main.py wypisuje komunikaty - wynik jest w ostatniej linii
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    return result["time"], result["modules"]
+
+
+def check_cli(out_dir: str) -> int:
+    elapsed, modules = measure_cli(out_dir)
+    print(f"main.py --out: {elapsed * 1000:.1f} ms")
+    loaded = [m for m in CLI_FORBIDDEN_MODULES if m in modules]
+    if loaded:
+        print(f"[WARN] main.py --out ładuje: {', '.join(loaded)}")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Czas importu src bez rysowania")
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET, help="budżet w sekundach")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cli", action="store_true", help="sprawdź też main.py --out")
+    args = parser.parse_args(argv)
+    status = check(args.budget, args.repeat)
+    if args.cli:
+        with tempfile.TemporaryDirectory() as out_dir:
+            status |= check_cli(out_dir)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
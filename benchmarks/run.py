@@ -0,0 +1,330 @@
+"""
+Benchmarki importu, wczytywania, dopasowań, apply, update_positions i rysowania.
+
+PRZYKŁADOWE UŻYCIE:
+
+     python benchmarks/run.py --sizes 100,1000,10000 --out wyniki.json
+     python benchmarks/run.py --compare stare.json nowe.json --threshold 0.2
+
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use("Agg")  # rysowanie bez okna
+import matplotlib.pyplot as plt
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import src as dp  # noqa: E402
+from generators import GENERATORS  # noqa: E402
+from import_time import measure_import  # noqa: E402
+
+PRODUCTIONS_DIR = os.path.join(ROOT, "graphs", "graphs_obj")
+# produkcje z graphs/graphs_obj: nazwa -> (L, R)
+PRODUCTIONS = {
+    "subdivide": ("production_left.obj", "production_right.obj"),
+    "reverse": ("production_left2.obj", "production_right2.obj"),
+    "triangle": ("pl2.obj", "pr2.obj"),
+}
+# powyżej tych rozmiarów pomiar jest pomijany (rysowanie i spring_layout są kwadratowe)
+DEFAULT_LIMITS = {"draw": 10 ** 3, "layout": 10 ** 3, "force_layout": 10 ** 5}
+BACKENDS = {"graph": dp.Graph, "array": dp.ArrayGraph}
+
+
+def measure(fn, repeat: int, setup=None, min_time: float = 0.01):
+    """
+    Czasy (w sekundach, na jedno wywołanie) repeat pomiarów fn(setup()).
+    Bez setup krótkie operacje są powtarzane w pętli (jak timeit.autorange),
+    aż jeden pomiar trwa co najmniej min_time. Zwraca (czasy, liczba wywołań).
+    """
+    number = 1
+    if setup is None:
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                fn(None)
+            if time.perf_counter() - start >= min_time or number >= 10 ** 6:
+                break
+            number *= 10
+    times = []
+    for _ in range(repeat):
+        state = setup() if setup is not None else None
+        start = time.perf_counter()
+        for _ in range(number):
+            fn(state)
+        times.append((time.perf_counter() - start) / number)
+    return times, number
+
+
+def load_productions():
+    productions = {}
+    for name, (left, right) in PRODUCTIONS.items():
+        L = dp.Graph.from_obj(os.path.join(PRODUCTIONS_DIR, left))
+        R = dp.Graph.from_obj(os.path.join(PRODUCTIONS_DIR, right), pos_like=L.pos)
+        productions[name] = dp.Production(L, R)
+    return productions
+
+
+class Runner:
+    def __init__(self, repeat: int, backend: str, limits: dict, verbose: bool = True):
+        self.repeat = repeat
+        self.backend = backend
+        self.graph_cls = BACKENDS[backend]
+        self.limits = limits
+        self.verbose = verbose
+        self.results = []
+
+    def record(self, bench, graph, n, m, fn, setup=None, **params):
+        try:
+            times, number = measure(fn, self.repeat, setup)
+        except Exception as e:
+            entry = {"bench": bench, "graph": graph, "n": n, "m": m, "params": params,
+                     "error": f"{type(e).__name__}: {e}"}
+            if self.verbose:
+                print(f"[WARN] {bench} {graph} n={n} {params}: {entry['error']}", file=sys.stderr)
+            self.results.append(entry)
+        else:
+            self.record_times(bench, graph, n, m, times, number, **params)
+
+    def record_times(self, bench, graph, n, m, times, number=1, **params):
+        # pomiary zrobione poza measure (np. w osobnych procesach)
+        entry = {"bench": bench, "graph": graph, "n": n, "m": m, "params": params,
+                 "times": times, "number": number, "min": min(times),
+                 "median": statistics.median(times)}
+        if self.verbose:
+            print(f"{bench:<18} {graph:<11} n={n:<8} {_params_str(params):<28} "
+                  f"median {entry['median'] * 1000:10.3f} ms", file=sys.stderr)
+        self.results.append(entry)
+
+    def record_skip(self, benches, graph, n, m, reason, **params):
+        # jawny wpis zamiast cichego pominięcia (--compare go nie porównuje)
+        for bench in benches:
+            self.results.append({"bench": bench, "graph": graph, "n": n, "m": m,
+                                 "params": params, "skipped": reason})
+        if self.verbose:
+            print(f"[WARN] {'/'.join(benches)} {graph} n={n} {params}: pominięte ({reason})", file=sys.stderr)
+
+    def skip(self, bench, n):
+        limit = self.limits.get(bench)
+        return limit is not None and n > limit
+
+    def run_import(self):
+        # import src w świeżych procesach (bez matplotlib, patrz import_time.py)
+        times, _ = measure_import(self.repeat)
+        self.record_times("import", "-", 0, 0, times)
+
+    def run_production(self, productions):
+        # compute_K_graph nie zależy od grafu wejściowego
+        for name, production in productions.items():
+            self.record("compute_K_graph", "-", 0, 0,
+                        lambda _, p=production: p.compute_K_graph(), production=name)
+
+    def run_graph(self, synthetic, productions, workdir):
+        kind, n, m = synthetic.kind, synthetic.n, synthetic.m
+        cls = self.graph_cls
+
+        obj_path = os.path.join(workdir, f"{kind}_{n}.obj")
+        csv_path = os.path.join(workdir, f"{kind}_{n}.csv")
+        synthetic.write_obj(obj_path)
+        synthetic.write_csv(csv_path)
+        self.record("from_obj", kind, n, m,
+                    lambda _: cls.from_obj(obj_path, lazy_pos=True))
+        self.record("from_csv", kind, n, m,
+                    lambda _: cls.from_csv(csv_path, lazy_pos=True))
+        os.remove(obj_path)
+        os.remove(csv_path)
+
+        for engine, limit in ((dp.LAYOUT_SPRING, "layout"), (dp.LAYOUT_FORCE, "force_layout")):
+            if self.skip(limit, n):
+                continue
+            G = synthetic.to_graph(cls)
+            G.layout_engine = engine
+            G.layout_seed = 0
+            self.record("layout", kind, n, m, lambda _: G._compute_layout(), engine=engine)
+
+        G = synthetic.to_graph(cls)
+        for name, production in productions.items():
+            mapping = next(iter(production.find_matches(G, limit=1)), None)
+            params = {}
+            if mapping is None:
+                # np. "triangle" nie pasuje do żadnego generatora (warunek wiszących krawędzi) -
+                # dopasowanie w dołożonej kopii L zamiast pominięcia pomiaru
+                mapping = _plant(G, production)
+                params["planted"] = True
+            if mapping is None:
+                self.record_skip(("apply", "update_positions"), kind, n, m, "no match", production=name)
+                continue
+            for transform in (False, True):
+                self.record("apply", kind, n, m,
+                            lambda _, p=production, mp=mapping, t=transform: p.apply(G, mp, transform_positions=t),
+                            production=name, transform_positions=transform, **params)
+            output = production.apply(G, mapping)
+            self.record("update_positions", kind, n, m,
+                        lambda _, p=production, mp=mapping, out=output: p.update_positions(G, out, mp),
+                        production=name, **params)
+
+        if not self.skip("draw", n):
+            # rysowanie zawsze przez Graph (ArrayGraph.draw i tak konwertuje)
+            drawn = synthetic.to_graph(dp.Graph)
+            self.record("draw", kind, n, m, lambda _: _draw(drawn))
+
+
+def _plant(G, production):
+    """
+    Dokłada do G rozłączną kopię L (z etykietami i pozycjami L przesuniętymi
+    poza graf) i zwraca dopasowanie L w tej kopii albo None.
+    """
+    c = production.compiled
+    L = production.L
+    first = G.next_node_id()
+    copy = {a: first + k for k, a in enumerate(c.L_nodes_sorted)}
+    offset = max((p[0] for p in G.pos.values()), default=0.0) + 1.0
+    for a, node in copy.items():
+        x, y = L.pos[a][:2] if a in L.pos else (0.0, 0.0)
+        G.add_node(node, pos=[float(x) + offset, float(y)])
+        if L.get_labels(a) is not None:
+            G.set_label(node, L.get_labels(a))
+    for u, v in L.edges():
+        G.add_edge(copy[u], copy[v])
+    return next(iter(production.find_matches(G, limit=1, anchors=list(copy.values()))), None)
+
+
+def _draw(graph):
+    fig = plt.figure()
+    graph.draw()
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+def _params_str(params) -> str:
+    return ",".join(f"{k}={v}" for k, v in sorted(params.items()))
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def run(args):
+    sizes = [int(float(s)) for s in args.sizes.split(",") if s.strip()]
+    kinds = [k.strip() for k in args.graphs.split(",") if k.strip()]
+    for kind in kinds:
+        if kind not in GENERATORS:
+            raise ValueError(f"Nieznany generator: {kind} (dostępne: {', '.join(GENERATORS)})")
+    limits = dict(DEFAULT_LIMITS)
+    if args.draw_max is not None:
+        limits["draw"] = args.draw_max
+    if args.layout_max is not None:
+        limits["layout"] = args.layout_max
+    if args.force_layout_max is not None:
+        limits["force_layout"] = args.force_layout_max
+
+    runner = Runner(args.repeat, args.backend, limits, verbose=not args.quiet)
+    runner.run_import()
+    productions = load_productions()
+    runner.run_production(productions)
+    with tempfile.TemporaryDirectory() as workdir:
+        for kind in kinds:
+            for n in sizes:
+                synthetic = GENERATORS[kind](n, seed=args.seed)
+                runner.run_graph(synthetic, productions, workdir)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": args.backend,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": runner.results,
+    }
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    return 0
+
+
+def _key(entry):
+    return (entry["bench"], entry["graph"], entry["n"], _params_str(entry["params"]))
+
+
+def compare(old_path, new_path, threshold: float) -> int:
+    """
+    Porównuje dwa pliki wyników po najlepszym czasie (min - najmniej zaszumiony).
+    Zwraca 1, jeśli któryś pomiar jest wolniejszy o więcej niż threshold
+    (0.2 = 20%), inaczej 0.
+    """
+    with open(old_path, 'r') as f:
+        old = {_key(e): e for e in json.load(f)["results"] if "min" in e}
+    with open(new_path, 'r') as f:
+        new = {_key(e): e for e in json.load(f)["results"] if "min" in e}
+
+    regressions = 0
+    print(f"{'bench':<18} {'graph':<11} {'n':<8} {'params':<44} {'stare ms':>10} {'nowe ms':>10} {'x':>6}")
+    for key in sorted(old.keys() & new.keys(), key=str):
+        before = old[key]["min"]
+        after = new[key]["min"]
+        ratio = after / before if before > 0 else float("inf")
+        mark = ""
+        if ratio > 1 + threshold:
+            mark = "  REGRESJA"
+            regressions += 1
+        elif ratio < 1 / (1 + threshold):
+            mark = "  szybciej"
+        bench, graph, n, params = key
+        print(f"{bench:<18} {graph:<11} {n:<8} {params:<44} {before * 1000:10.3f} {after * 1000:10.3f} {ratio:6.2f}{mark}")
+    for key in sorted(old.keys() - new.keys(), key=str):
+        print(f"[WARN] brak w nowych wynikach: {key}")
+    print(f"Regresji: {regressions}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarki DPO")
+    parser.add_argument("--sizes", default="100,1000,10000",
+                        help="rozmiary grafów, np. 1e2,1e4,1e6")
+    parser.add_argument("--graphs", default=",".join(GENERATORS),
+                        help="generatory: " + ", ".join(GENERATORS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="graph")
+    parser.add_argument("--draw-max", type=int, default=None,
+                        help=f"największy graf do rysowania (domyślnie {DEFAULT_LIMITS['draw']})")
+    parser.add_argument("--layout-max", type=int, default=None,
+                        help=f"największy graf do spring_layout (domyślnie {DEFAULT_LIMITS['layout']})")
+    parser.add_argument("--force-layout-max", type=int, default=None,
+                        help=f"największy graf do force_layout (domyślnie {DEFAULT_LIMITS['force_layout']})")
+    parser.add_argument("--out", default=None, help="plik JSON z wynikami (domyślnie stdout)")
+    parser.add_argument("--quiet", action="store_true")
+    parser.add_argument("--compare", nargs=2, metavar=("STARE", "NOWE"),
+                        help="porównaj dwa pliki wyników zamiast mierzyć")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="próg regresji dla --compare (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+    if args.compare:
+        return compare(args.compare[0], args.compare[1], args.threshold)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
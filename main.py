@@ -1,14 +1,61 @@
+import os
 import sys
-import matplotlib.pyplot as plt
-from src.graph import Graph
-from src.production import Production
 
 """
 PRZYKŁADOWE UŻYCIE: 
 
      python main.py graphs/initial_graph.csv graphs/production_left.csv graphs/production_right.csv graphs/mapping.csv
+
+     z --out KATALOG rysunki są zapisywane do plików PNG zamiast wyświetlane:
+     python main.py --out wyniki graphs/initial_graph.csv ...
+
+     tryb wsadowy - wiele zadań z pliku JSONL/manifestu, bez rysowania, wyniki jako JSONL:
+     python main.py --batch zadania.jsonl [--results wyniki.jsonl]
      
 """
+
+
+def run_batch(jobs_file, results_file=None):
+    from src.batch import BatchRunner, iter_jobs
+
+    runner = BatchRunner()
+    jobs = iter_jobs(jobs_file)
+    if results_file is None:
+        stats = runner.run(jobs, sys.stdout)
+    else:
+        with open(results_file, 'w') as out:
+            stats = runner.run(jobs, out)
+    print(f"Zadania: {stats['jobs']}, zastosowane: {stats['applied']}, błędy: {stats['errors']}",
+          file=sys.stderr)
+    return 1 if stats["errors"] else 0
+
+
+def _option(name):
+    # wartość opcji "name WARTOŚĆ" (usuwana z sys.argv) albo None
+    if name not in sys.argv:
+        return None
+    i = sys.argv.index(name)
+    if i + 1 >= len(sys.argv):
+        print(f"Brak wartości po {name}")
+        sys.exit(1)
+    value = sys.argv[i + 1]
+    del sys.argv[i:i + 2]
+    return value
+
+
+if "--batch" in sys.argv:
+    jobs_file = _option("--batch")
+    sys.exit(run_batch(jobs_file, _option("--results")))
+
+from src.graph import Graph  # noqa: E402
+from src.production import Production  # noqa: E402
+from src.render import render_to_file  # noqa: E402
+
+# katalog na rysunki (bez okien) - opcja --out
+output_dir = _option("--out")
+if output_dir is not None:
+    os.makedirs(output_dir, exist_ok=True)
+
 # Wczytanie plików z argumentów wywołania lub default
 if len(sys.argv) < 5:
     input_graph_file = "graphs/graphs_obj/initial_graph.obj"
@@ -49,8 +96,15 @@ else:
     mapping_file = sys.argv[4]
 
 
+def load_input_graph(path, loader):
+    # katalog ze zrzutem (Graph.save_snapshot) wczytujemy bez parsowania tekstu
+    if os.path.isdir(path):
+        return Graph.load_snapshot(path)
+    return loader(path)
+
+
 try:
-    G = Graph.from_csv(input_graph_file)
+    G = load_input_graph(input_graph_file, Graph.from_csv)
     L = Graph.from_csv(left_graph_file)
     R = Graph.from_csv(right_graph_file, pos_like=L.pos)
     with open(mapping_file, 'r') as f:
@@ -59,7 +113,7 @@ try:
                     for x in mapping_line.split(',') if x.strip()]
 except Exception as e:
     try:
-        G = Graph.from_obj(input_graph_file)
+        G = load_input_graph(input_graph_file, Graph.from_obj)
         L = Graph.from_obj(left_graph_file)
         R = Graph.from_obj(right_graph_file, pos_like=L.pos)
         with open(mapping_file, 'r') as f:
@@ -76,26 +130,35 @@ L.edge_idx = {}
 R.edge_idx = {}
 
 production = Production(L, R)
-production.draw()
+if output_dir is not None:
+    production.draw(path=os.path.join(output_dir, "production.png"))
+    render_to_file(G, os.path.join(output_dir, "input.png"), title="Graf wejściowy (G)")
+else:
+    # pyplot tylko przy oknach - --out i tryb wsadowy rysują przez src.render (Agg)
+    import matplotlib.pyplot as plt
+
+    production.draw()
 
-plt.figure(figsize=(5, 4))
-plt.title("Graf wejściowy (G)")
-G.draw()
-plt.show()
+    plt.figure(figsize=(5, 4))
+    plt.title("Graf wejściowy (G)")
+    G.draw()
+    plt.show()
 
 try:
     result_graph = production.apply(G, mapping_list, transform_positions=True)
     print("Produkcja została zastosowana poprawnie.")
 
     if result_graph:
-        plt.figure(figsize=(5, 4))
-        plt.title("Graf wynikowy (G')")
-        result_graph.draw()
-        plt.show()
+        if output_dir is not None:
+            render_to_file(result_graph, os.path.join(output_dir, "result.png"), title="Graf wynikowy (G')")
+        else:
+            import matplotlib.pyplot as plt
+
+            plt.figure(figsize=(5, 4))
+            plt.title("Graf wynikowy (G')")
+            result_graph.draw()
+            plt.show()
 
 except Exception as e:
     print(f"Produkcja nie może być zastosowana, error: {e}")
     sys.exit(1)
-
-
-
@@ -1,2 +1,21 @@
+from .layout import *
 from .graph import *
 from .production import *
+from .matching import *
+from .array_graph import *
+from .transaction import *
+from .compiled import *
+from .parallel_step import *
+from .rewriting import *
+from .parallel_search import *
+from .loaders import *
+from .snapshot import *
+from .instrumentation import *
+from .render import *
+from .derivation import *
+from .state_space import *
+from .batch import *
+from .history import *
+from .delta import *
+from .bulk_validation import *
+from .critical_pairs import *
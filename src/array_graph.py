@@ -0,0 +1,855 @@
+from collections.abc import MutableMapping
+import networkx as nx
+import numpy as np
+from .graph import Graph, PLACEMENT_SPRING, PLACEMENT_LOCAL, label_key
+
+# brak etykiety / indeksu w tablicach
+NO_LABEL = -1
+NO_IDX = np.iinfo(np.int64).min
+
+
+class LabelTable:
+    """
+    Internowanie etykiet: każda różna etykieta jest trzymana raz,
+    a wierzchołki i krawędzie przechowują tylko jej numer.
+    """
+
+    def __init__(self):
+        self.values = []
+        self.ids = {}
+
+    def intern(self, label) -> int:
+        if label is None:
+            return NO_LABEL
+        key = label_key(label)
+        label_id = self.ids.get(key)
+        if label_id is None:
+            label_id = len(self.values)
+            self.values.append(label)
+            self.ids[key] = label_id
+        return label_id
+
+    def lookup(self, label) -> int:
+        if label is None:
+            return NO_LABEL
+        return self.ids.get(label_key(label), NO_LABEL)
+
+    def get(self, label_id):
+        if label_id < 0:
+            return None
+        return self.values[label_id]
+
+
+def _last_per_key(keys):
+    # różne klucze i pozycja ostatniego wystąpienia każdego z nich
+    unique, first_from_end = np.unique(keys[::-1], return_index=True)
+    return unique, len(keys) - 1 - first_from_end
+
+
+class _AttrView(MutableMapping):
+    # widok słownikowy (jak vertex_labels / pos w Graph) nad tablicami ArrayGraph
+    def __init__(self, keys, getter, setter, deleter):
+        self._keys = keys
+        self._get = getter
+        self._set = setter
+        self._del = deleter
+
+    def __getitem__(self, key):
+        value = self._get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._set(key, value)
+
+    def __delitem__(self, key):
+        if self._get(key) is None:
+            raise KeyError(key)
+        self._del(key)
+
+    def __iter__(self):
+        for key in self._keys():
+            if self._get(key) is not None:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self):
+        return dict(self)
+
+
+class ArrayGraph(Graph):
+    """
+    Graf skierowany w tablicach numpy (CSR/CSC) z tym samym API co Graph.
+    Nowe krawędzie trafiają do nakładki, usunięte są oznaczane; compact() przebudowuje tablice.
+    """
+
+    def __init__(self, vertices=None, edges=None, vertex_labels=None, edge_labels=None, vertex_idx=None, edge_idx=None, pos=None, pos_like=None, placement=PLACEMENT_SPRING, lazy_pos=False):
+        if placement not in (PLACEMENT_SPRING, PLACEMENT_LOCAL):
+            raise ValueError(f"Nieznany tryb rozmieszczania: {placement}")
+        self.placement = placement
+        self._unplaced = set()
+        self._max_node = None
+        self._labels = LabelTable()
+
+        node_ids = np.fromiter(vertices, dtype=np.int64) if vertices is not None else np.empty(0, dtype=np.int64)
+        if edges is not None:
+            edge_list = list(edges)
+            edge_arr = np.array(edge_list, dtype=np.int64).reshape(len(edge_list), 2)
+        else:
+            edge_arr = np.empty((0, 2), dtype=np.int64)
+
+        # wierzchołki tylko z krawędzi są dopisywane na końcu (jak w nx.DiGraph.add_edge)
+        all_ids = np.concatenate([node_ids, edge_arr.ravel()])
+        _, first = np.unique(all_ids, return_index=True)
+        node_ids = all_ids[np.sort(first)]
+
+        self._build(node_ids, edge_arr)
+
+        if vertex_labels is not None:
+            for node, lbl in vertex_labels.items():
+                self._vlabel[self._slot_or_raise(node)] = self._labels.intern(lbl)
+        if vertex_idx is not None:
+            for node, idx in vertex_idx.items():
+                self._vidx[self._slot_or_raise(node)] = idx
+        if edge_labels is not None:
+            for (u, v), lbl in edge_labels.items():
+                self._set_edge_attr(u, v, label_id=self._labels.intern(lbl))
+        if edge_idx is not None:
+            for (u, v), idx in edge_idx.items():
+                self._set_edge_attr(u, v, index=idx)
+
+        self._init_pos(pos, pos_like, lazy_pos)
+
+    def _init_pos(self, pos, pos_like, lazy_pos):
+        self._pos_like = pos_like
+        self._xy = None
+        if pos is not None:
+            self.pos = pos
+        elif not lazy_pos:
+            self.pos = self._compute_layout()
+
+    @classmethod
+    def _from_parsed(cls, parsed, pos_like=None, placement=PLACEMENT_SPRING, lazy_pos=False):
+        # tablice budowane wprost z buforów parsera, bez słowników pośrednich
+        edge_arr = np.empty((len(parsed.src), 2), dtype=np.int64)
+        edge_arr[:, 0] = np.frombuffer(parsed.src, dtype=np.int64)
+        edge_arr[:, 1] = np.frombuffer(parsed.dst, dtype=np.int64)
+        if placement not in (PLACEMENT_SPRING, PLACEMENT_LOCAL):
+            raise ValueError(f"Nieznany tryb rozmieszczania: {placement}")
+
+        graph = cls.__new__(cls)
+        graph.placement = placement
+        graph._unplaced = set()
+        graph._max_node = None
+        graph._labels = LabelTable()
+        for label in parsed.labels:
+            graph._labels.intern(label)
+
+        node_ids = np.frombuffer(parsed.vertices, dtype=np.int64)
+        all_ids = np.concatenate([node_ids, edge_arr.ravel()])
+        _, first = np.unique(all_ids, return_index=True)
+        all_ids = all_ids[np.sort(first)]
+        # wierzchołki tylko z krawędzi nie mają etykiety ani indeksu
+        n_extra = len(all_ids) - len(node_ids)
+        vlabel = np.concatenate([np.frombuffer(parsed.vertex_labels, dtype=np.int32),
+                                 np.full(n_extra, NO_LABEL, dtype=np.int32)])
+        vidx = np.full(len(all_ids), NO_IDX, dtype=np.int64)
+        if parsed.vertex_idx is not None:
+            vidx[:len(node_ids)] = np.frombuffer(parsed.vertex_idx, dtype=np.int64)
+        elabel = None
+        if parsed.edge_labels is not None:
+            elabel = np.frombuffer(parsed.edge_labels, dtype=np.int32)
+            if not (elabel != NO_LABEL).any():
+                elabel = None
+        eidx = None
+        if parsed.edge_idx is not None and len(parsed.edge_idx):
+            eidx = np.frombuffer(parsed.edge_idx, dtype=np.int64)
+
+        # powtórzona krawędź: jak w słownikach Graph wygrywa ostatni indeks
+        # i ostatnia niepusta etykieta
+        if len(edge_arr):
+            edge_arr, inverse = np.unique(edge_arr, axis=0, return_inverse=True)
+            inverse = inverse.ravel()
+            if eidx is not None:
+                eidx = eidx[_last_per_key(inverse)[1]]
+            if elabel is not None:
+                labelled = np.flatnonzero(elabel != NO_LABEL)
+                keys, last = _last_per_key(inverse[labelled])
+                resolved = np.full(len(edge_arr), NO_LABEL, dtype=np.int32)
+                resolved[keys] = elabel[labelled[last]]
+                elabel = resolved
+        if eidx is not None:
+            eidx = eidx.copy()
+        if elabel is not None:
+            elabel = elabel.copy()
+
+        graph._build(all_ids, edge_arr, vlabel=vlabel, vidx=vidx, elabel=elabel, eidx=eidx)
+        graph._init_pos(None, pos_like, lazy_pos)
+        return graph
+
+    # --- budowa tablic ---------------------------------------------------
+
+    def _build(self, node_ids, edge_arr, vlabel=None, vidx=None, xy=None, elabel=None, eidx=None):
+        n = len(node_ids)
+        self._n = n
+        self._n_base = n
+        self._node_ids = np.asarray(node_ids, dtype=np.int64).copy()
+        self._alive = np.ones(n, dtype=bool)
+        self._vlabel = np.full(n, NO_LABEL, dtype=np.int32) if vlabel is None else vlabel
+        self._vidx = np.full(n, NO_IDX, dtype=np.int64) if vidx is None else vidx
+        if xy is not None:
+            self._xy = xy
+
+        order = np.argsort(self._node_ids, kind="stable")
+        self._sorted_ids = self._node_ids[order]
+        self._sorted_slots = order
+        # sloty wierzchołków dodanych po zbudowaniu (poza posortowaną tablicą)
+        self._extra = {}
+
+        if len(edge_arr):
+            src = np.searchsorted(self._sorted_ids, edge_arr[:, 0])
+            dst = np.searchsorted(self._sorted_ids, edge_arr[:, 1])
+            src = self._sorted_slots[src]
+            dst = self._sorted_slots[dst]
+        else:
+            src = np.empty(0, dtype=np.int64)
+            dst = np.empty(0, dtype=np.int64)
+        index_dtype = np.int32 if n < 2 ** 31 else np.int64
+
+        # CSR: krawędzie posortowane po (źródło, cel), bez duplikatów
+        key = src * max(n, 1) + dst
+        _, first = np.unique(key, return_index=True)
+        src = src[first]
+        dst = dst[first]
+        if elabel is not None:
+            elabel = elabel[first]
+        if eidx is not None:
+            eidx = eidx[first]
+        self._indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self._indptr[1:])
+        self._indices = dst.astype(index_dtype)
+        self._ealive = np.ones(len(dst), dtype=bool)
+        self._elabel = elabel
+        self._eidx = eidx
+
+        # CSC: dla każdego celu źródła i pozycje krawędzi w CSR
+        in_order = np.lexsort((src, dst))
+        self._in_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(dst, minlength=n), out=self._in_indptr[1:])
+        self._in_indices = src[in_order].astype(index_dtype)
+        self._in_eid = in_order.astype(np.int64 if len(dst) >= 2 ** 31 else np.int32)
+
+        self._out_deg = np.diff(self._indptr).astype(np.int32)
+        self._in_deg = np.diff(self._in_indptr).astype(np.int32)
+
+        # nakładka: krawędzie dodane po zbudowaniu {slot_u: {slot_v: [etykieta, indeks]}}
+        self._added_out = {}
+        self._added_in = {}
+        self._n_added = 0
+
+    def _grow(self, needed):
+        capacity = len(self._node_ids)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, 2 * capacity, 16)
+
+        def grow(arr, fill):
+            out = np.full((new_capacity,) + arr.shape[1:], fill, dtype=arr.dtype)
+            out[:len(arr)] = arr
+            return out
+
+        self._node_ids = grow(self._node_ids, 0)
+        self._alive = grow(self._alive, False)
+        self._vlabel = grow(self._vlabel, NO_LABEL)
+        self._vidx = grow(self._vidx, NO_IDX)
+        self._out_deg = grow(self._out_deg, 0)
+        self._in_deg = grow(self._in_deg, 0)
+        if self._xy is not None:
+            self._xy = grow(self._xy, np.nan)
+
+    def compact(self):
+        """Przebudowuje tablice CSR/CSC i zwalnia sloty usuniętych elementów."""
+        self._compact_into(self)
+
+    def _compact_into(self, target):
+        # zwarte tablice grafu budowane w target (self albo nowy obiekt)
+        slots = np.flatnonzero(self._alive[:self._n])
+        src, dst, elabel, eidx = self._edge_arrays()
+        node_ids = self._node_ids[slots]
+        edge_arr = np.stack([self._node_ids[src], self._node_ids[dst]], axis=1) if len(src) else np.empty((0, 2), dtype=np.int64)
+        vlabel = self._vlabel[slots].copy()
+        vidx = self._vidx[slots].copy()
+        xy = self._xy[slots].copy() if self._xy is not None else None
+        target._build(node_ids, edge_arr, vlabel=vlabel, vidx=vidx, xy=xy,
+                      elabel=elabel, eidx=eidx)
+
+    def _edge_arrays(self):
+        # wszystkie żywe krawędzie jako tablice slotów (+ etykiety i indeksy)
+        counts = np.diff(self._indptr)
+        src = np.repeat(np.arange(self._n_base), counts)
+        alive = self._ealive
+        src = src[alive]
+        dst = self._indices[alive].astype(np.int64)
+        elabel = self._elabel[alive] if self._elabel is not None else None
+        eidx = self._eidx[alive] if self._eidx is not None else None
+        if self._n_added:
+            add_src = []
+            add_dst = []
+            add_label = []
+            add_idx = []
+            for su, targets in self._added_out.items():
+                for sv, (label_id, idx) in targets.items():
+                    add_src.append(su)
+                    add_dst.append(sv)
+                    add_label.append(label_id)
+                    add_idx.append(idx)
+            src = np.concatenate([src, np.array(add_src, dtype=np.int64)])
+            dst = np.concatenate([dst, np.array(add_dst, dtype=np.int64)])
+            if elabel is not None or any(lbl != NO_LABEL for lbl in add_label):
+                if elabel is None:
+                    elabel = np.full(len(src) - len(add_src), NO_LABEL, dtype=np.int32)
+                elabel = np.concatenate([elabel, np.array(add_label, dtype=np.int32)])
+            if eidx is not None or any(idx != NO_IDX for idx in add_idx):
+                if eidx is None:
+                    eidx = np.full(len(src) - len(add_src), NO_IDX, dtype=np.int64)
+                eidx = np.concatenate([eidx, np.array(add_idx, dtype=np.int64)])
+        return src, dst, elabel, eidx
+
+    def _maybe_compact(self):
+        if self._n_added > max(1024, len(self._indices) // 4):
+            self.compact()
+
+    # --- sloty -----------------------------------------------------------
+
+    def _slot(self, node) -> int:
+        slot = self._extra.get(node)
+        if slot is not None:
+            return slot
+        i = np.searchsorted(self._sorted_ids, node)
+        if i < len(self._sorted_ids) and self._sorted_ids[i] == node:
+            slot = int(self._sorted_slots[i])
+            if self._alive[slot]:
+                return slot
+        return -1
+
+    def _slot_or_raise(self, node) -> int:
+        slot = self._slot(node)
+        if slot < 0:
+            raise nx.NetworkXError(f"The node {node} is not in the digraph.")
+        return slot
+
+    def _base_edge(self, su, sv, alive_only=True) -> int:
+        # pozycja krawędzi su->sv w CSR albo -1
+        if su >= self._n_base or sv >= self._n_base:
+            return -1
+        lo, hi = self._indptr[su], self._indptr[su + 1]
+        i = lo + int(np.searchsorted(self._indices[lo:hi], sv))
+        if i < hi and self._indices[i] == sv and (self._ealive[i] or not alive_only):
+            return i
+        return -1
+
+    # --- API jak w Graph -------------------------------------------------
+
+    def nodes(self):
+        n = self._n
+        return self._node_ids[:n][self._alive[:n]].tolist()
+
+    def edges(self):
+        src, dst, _, _ = self._edge_arrays()
+        return list(zip(self._node_ids[src].tolist(), self._node_ids[dst].tolist()))
+
+    def number_of_nodes(self) -> int:
+        return int(np.count_nonzero(self._alive[:self._n]))
+
+    def number_of_edges(self) -> int:
+        return int(np.count_nonzero(self._ealive)) + self._n_added
+
+    def has_node(self, node) -> bool:
+        return self._slot(node) >= 0
+
+    def next_node_id(self) -> int:
+        if self._max_node is None:
+            ids = self._node_ids[:self._n][self._alive[:self._n]]
+            self._max_node = int(ids.max()) if len(ids) else 0
+        return self._max_node + 1
+
+    def has_edge(self, u, v) -> bool:
+        su = self._slot(u)
+        sv = self._slot(v)
+        if su < 0 or sv < 0:
+            return False
+        if self._base_edge(su, sv) >= 0:
+            return True
+        return sv in self._added_out.get(su, ())
+
+    def _successor_slots(self, su):
+        result = []
+        if su < self._n_base:
+            lo, hi = self._indptr[su], self._indptr[su + 1]
+            result = self._indices[lo:hi][self._ealive[lo:hi]].tolist()
+        added = self._added_out.get(su)
+        if added:
+            result.extend(added)
+        return result
+
+    def _predecessor_slots(self, sv):
+        result = []
+        if sv < self._n_base:
+            lo, hi = self._in_indptr[sv], self._in_indptr[sv + 1]
+            alive = self._ealive[self._in_eid[lo:hi]]
+            result = self._in_indices[lo:hi][alive].tolist()
+        added = self._added_in.get(sv)
+        if added:
+            result.extend(added)
+        return result
+
+    def successors(self, node):
+        slots = self._successor_slots(self._slot_or_raise(node))
+        return self._node_ids[slots].tolist()
+
+    def predecessors(self, node):
+        slots = self._predecessor_slots(self._slot_or_raise(node))
+        return self._node_ids[slots].tolist()
+
+    def out_degree(self, node) -> int:
+        return int(self._out_deg[self._slot_or_raise(node)])
+
+    def in_degree(self, node) -> int:
+        return int(self._in_deg[self._slot_or_raise(node)])
+
+    def _new_slot(self, node) -> int:
+        slot = self._n
+        self._grow(slot + 1)
+        self._n += 1
+        self._node_ids[slot] = node
+        self._alive[slot] = True
+        self._vlabel[slot] = NO_LABEL
+        self._vidx[slot] = NO_IDX
+        self._out_deg[slot] = 0
+        self._in_deg[slot] = 0
+        if self._xy is not None:
+            self._xy[slot] = np.nan
+        self._extra[node] = slot
+        self._track_max_node(node)
+        return slot
+
+    def add_node(self, node, index=None, label=None, pos=None):
+        slot = self._slot(node)
+        existed = slot >= 0
+        if not existed:
+            slot = self._new_slot(node)
+        if label:
+            self._vlabel[slot] = self._labels.intern(label)
+        if index:
+            self._vidx[slot] = index
+        self._place_node(node, pos, existed)
+
+    def add_edge(self, u, v, index=None, label=None):
+        su = self._slot(u)
+        if su < 0:
+            su = self._new_slot(u)
+        sv = self._slot(v)
+        if sv < 0:
+            sv = self._new_slot(v)
+        if not self.has_edge(u, v):
+            i = self._base_edge(su, sv, alive_only=False)
+            if i >= 0:
+                # krawędź była w CSR i została usunięta - wystarczy ją przywrócić
+                self._ealive[i] = True
+                if self._elabel is not None:
+                    self._elabel[i] = NO_LABEL
+                if self._eidx is not None:
+                    self._eidx[i] = NO_IDX
+            else:
+                self._added_out.setdefault(su, {})[sv] = [NO_LABEL, NO_IDX]
+                self._added_in.setdefault(sv, set()).add(su)
+                self._n_added += 1
+            self._out_deg[su] += 1
+            self._in_deg[sv] += 1
+        if label:
+            self._set_edge_attr(u, v, label_id=self._labels.intern(label))
+        if index:
+            self._set_edge_attr(u, v, index=index)
+        self._maybe_compact()
+
+    def _remove_edge_slots(self, su, sv):
+        i = self._base_edge(su, sv)
+        if i >= 0:
+            self._ealive[i] = False
+        else:
+            del self._added_out[su][sv]
+            if not self._added_out[su]:
+                del self._added_out[su]
+            self._added_in[sv].discard(su)
+            if not self._added_in[sv]:
+                del self._added_in[sv]
+            self._n_added -= 1
+        self._out_deg[su] -= 1
+        self._in_deg[sv] -= 1
+
+    def remove_edge(self, u, v):
+        if not self.has_edge(u, v):
+            raise nx.NetworkXError(f"The edge {u}-{v} not in graph.")
+        self._remove_edge_slots(self._slot(u), self._slot(v))
+
+    def remove_node(self, node):
+        slot = self._slot_or_raise(node)
+        for sv in self._successor_slots(slot):
+            self._remove_edge_slots(slot, sv)
+        for su in self._predecessor_slots(slot):
+            self._remove_edge_slots(su, slot)
+        self._alive[slot] = False
+        self._vlabel[slot] = NO_LABEL
+        self._vidx[slot] = NO_IDX
+        if self._xy is not None:
+            self._xy[slot] = np.nan
+        self._extra.pop(node, None)
+        self._unplaced.discard(node)
+        if node == self._max_node:
+            self._max_node = None
+
+    # --- etykiety i indeksy ----------------------------------------------
+
+    def get_labels(self, node):
+        slot = self._slot(node)
+        if slot < 0:
+            return None
+        return self._labels.get(self._vlabel[slot])
+
+    def set_label(self, node, label: str):
+        self._vlabel[self._slot_or_raise(node)] = self._labels.intern(label)
+
+    def _del_label(self, node):
+        self._vlabel[self._slot_or_raise(node)] = NO_LABEL
+
+    def _local_adjacency(self, nodes):
+        # jak w Graph, ale wektorowo: sloty przez _sorted_ids, krawędzie z CSR
+        nodes = np.asarray(nodes, dtype=np.int64)
+        i = np.minimum(np.searchsorted(self._sorted_ids, nodes), max(len(self._sorted_ids) - 1, 0))
+        slots = np.full(len(nodes), -1, dtype=np.int64)
+        if len(self._sorted_ids):
+            found = self._sorted_ids[i] == nodes
+            slots[found] = self._sorted_slots[i[found]]
+        if self._extra:
+            extra = np.fromiter(self._extra.keys(), dtype=np.int64, count=len(self._extra))
+            extra_slots = np.fromiter(self._extra.values(), dtype=np.int64, count=len(self._extra))
+            j = np.minimum(np.searchsorted(nodes, extra), max(len(nodes) - 1, 0))
+            hit = nodes[j] == extra if len(nodes) else np.zeros(len(extra), dtype=bool)
+            slots[j[hit]] = extra_slots[hit]
+        exists = slots >= 0
+        exists[exists] = self._alive[slots[exists]]
+        slots[~exists] = -1
+        out_deg = np.where(exists, self._out_deg[slots], 0).astype(np.int64)
+        in_deg = np.where(exists, self._in_deg[slots], 0).astype(np.int64)
+
+        # numer pozycji w nodes dla każdego slotu (-1 poza nodes)
+        local = np.full(len(self._node_ids), -1, dtype=np.int64)
+        local[slots[exists]] = np.flatnonzero(exists)
+        base = np.flatnonzero(exists & (slots < self._n_base))
+        lo = self._indptr[slots[base]]
+        counts = self._indptr[slots[base] + 1] - lo
+        owner = np.repeat(base, counts)
+        e = np.repeat(lo - (np.cumsum(counts) - counts), counts) + np.arange(int(counts.sum()))
+        keep = self._ealive[e]
+        src = owner[keep]
+        dst = local[self._indices[e[keep]]]
+        inside = dst >= 0
+        src = src[inside]
+        dst = dst[inside]
+        if self._added_out:
+            add_src = []
+            add_dst = []
+            for su, targets in self._added_out.items():
+                if local[su] < 0:
+                    continue
+                for sv in targets:
+                    if local[sv] >= 0:
+                        add_src.append(local[su])
+                        add_dst.append(local[sv])
+            src = np.concatenate([src, np.array(add_src, dtype=np.int64)])
+            dst = np.concatenate([dst, np.array(add_dst, dtype=np.int64)])
+        return exists, out_deg, in_deg, src, dst
+
+    # zapytania jak w Graph - zamiast osobnych indeksów jeden przebieg numpy po tablicach
+
+    def _live_nodes(self, mask):
+        n = self._n
+        return self._node_ids[:n][self._alive[:n] & mask[:n]].tolist()
+
+    def nodes_with_label(self, label) -> list:
+        label_id = self._labels.lookup(label)
+        if label_id == NO_LABEL:
+            return []
+        return self._live_nodes(self._vlabel == label_id)
+
+    def count_label(self, label) -> int:
+        label_id = self._labels.lookup(label)
+        if label_id == NO_LABEL:
+            return 0
+        n = self._n
+        return int(np.count_nonzero(self._alive[:n] & (self._vlabel[:n] == label_id)))
+
+    def label_counts(self) -> dict:
+        n = self._n
+        ids = self._vlabel[:n][self._alive[:n]]
+        counts = np.bincount(ids[ids != NO_LABEL], minlength=len(self._labels.values))
+        return {label_key(self._labels.get(i)): int(c) for i, c in enumerate(counts) if c}
+
+    def edges_with_label(self, label) -> list:
+        label_id = self._labels.lookup(label)
+        src, dst, elabel, _ = self._edge_arrays()
+        if label_id == NO_LABEL or elabel is None:
+            return []
+        hit = elabel == label_id
+        return list(zip(self._node_ids[src[hit]].tolist(), self._node_ids[dst[hit]].tolist()))
+
+    def nodes_with_degree(self, out_degree: int | None = None, in_degree: int | None = None,
+                          at_least: bool = False) -> list:
+        mask = np.ones(len(self._alive), dtype=bool)
+        for deg, d in ((self._out_deg, out_degree), (self._in_deg, in_degree)):
+            if d is not None:
+                mask &= (deg >= d) if at_least else (deg == d)
+        return self._live_nodes(mask)
+
+    def get_idx(self, node):
+        slot = self._slot(node)
+        if slot < 0 or self._vidx[slot] == NO_IDX:
+            return None
+        return int(self._vidx[slot])
+
+    def set_idx(self, node, index):
+        self._vidx[self._slot_or_raise(node)] = index
+
+    def _del_idx(self, node):
+        self._vidx[self._slot_or_raise(node)] = NO_IDX
+
+    def _get_edge_attr(self, u, v):
+        # (numer etykiety, indeks) krawędzi albo None
+        su = self._slot(u)
+        sv = self._slot(v)
+        if su < 0 or sv < 0:
+            return None
+        i = self._base_edge(su, sv)
+        if i >= 0:
+            label_id = self._elabel[i] if self._elabel is not None else NO_LABEL
+            idx = self._eidx[i] if self._eidx is not None else NO_IDX
+            return int(label_id), int(idx)
+        added = self._added_out.get(su, {}).get(sv)
+        if added is None:
+            return None
+        return added[0], added[1]
+
+    def _set_edge_attr(self, u, v, label_id=None, index=None):
+        su = self._slot_or_raise(u)
+        sv = self._slot_or_raise(v)
+        i = self._base_edge(su, sv)
+        if i >= 0:
+            if label_id is not None:
+                if self._elabel is None:
+                    self._elabel = np.full(len(self._indices), NO_LABEL, dtype=np.int32)
+                self._elabel[i] = label_id
+            if index is not None:
+                if self._eidx is None:
+                    self._eidx = np.full(len(self._indices), NO_IDX, dtype=np.int64)
+                self._eidx[i] = index
+            return
+        added = self._added_out.get(su, {}).get(sv)
+        if added is None:
+            raise nx.NetworkXError(f"The edge {u}-{v} not in graph.")
+        if label_id is not None:
+            added[0] = label_id
+        if index is not None:
+            added[1] = index
+
+    def _edge_label(self, edge):
+        attr = self._get_edge_attr(*edge)
+        return None if attr is None else self._labels.get(attr[0])
+
+    def _edge_index(self, edge):
+        attr = self._get_edge_attr(*edge)
+        return None if attr is None or attr[1] == NO_IDX else attr[1]
+
+    @property
+    def vertex_labels(self):
+        return _AttrView(self.nodes, self.get_labels, self.set_label, self._del_label)
+
+    @property
+    def vertex_idx(self):
+        return _AttrView(self.nodes, self.get_idx, self.set_idx, self._del_idx)
+
+    @property
+    def edge_labels(self):
+        return _AttrView(self.edges, self._edge_label,
+                         lambda e, lbl: self._set_edge_attr(*e, label_id=self._labels.intern(lbl)),
+                         lambda e: self._set_edge_attr(*e, label_id=NO_LABEL))
+
+    @property
+    def edge_idx(self):
+        return _AttrView(self.edges, self._edge_index,
+                         lambda e, idx: self._set_edge_attr(*e, index=idx),
+                         lambda e: self._set_edge_attr(*e, index=NO_IDX))
+
+    # --- pozycje ---------------------------------------------------------
+
+    def _get_xy(self, node):
+        slot = self._slot(node)
+        if slot < 0 or np.isnan(self._xy[slot, 0]):
+            return None
+        return self._xy[slot].copy()
+
+    def _set_xy(self, node, value):
+        self._xy[self._slot_or_raise(node)] = value
+
+    def _del_xy(self, node):
+        self._xy[self._slot_or_raise(node)] = np.nan
+
+    @property
+    def pos(self):
+        if self._xy is None:
+            self.pos = self._compute_layout()
+        return _AttrView(self.nodes, self._get_xy, self._set_xy, self._del_xy)
+
+    @pos.setter
+    def pos(self, value):
+        xy = np.full((len(self._node_ids), 2), np.nan)
+        for node, p in value.items():
+            slot = self._slot(node)
+            if slot >= 0:
+                xy[slot] = p[0], p[1]
+        self._xy = xy
+
+    @property
+    def pos_computed(self) -> bool:
+        return self._xy is not None
+
+    def _layout_graph(self) -> nx.DiGraph:
+        return self.to_networkx()
+
+    # --- konwersje -------------------------------------------------------
+
+    def copy_structure(self):
+        out = ArrayGraph.__new__(ArrayGraph)
+        out.placement = self.placement
+        out._unplaced = set()
+        out._max_node = self._max_node
+        out._labels = LabelTable()
+        out._labels.values = list(self._labels.values)
+        out._labels.ids = dict(self._labels.ids)
+        out._pos_like = None
+        out._n = self._n
+        out._n_base = self._n_base
+        for name in ("_node_ids", "_alive", "_vlabel", "_sorted_ids", "_sorted_slots",
+                     "_indptr", "_indices", "_ealive", "_in_indptr", "_in_indices",
+                     "_in_eid", "_out_deg", "_in_deg"):
+            setattr(out, name, getattr(self, name).copy())
+        # tak jak w Graph.copy_structure: bez indeksów i etykiet krawędzi
+        out._vidx = np.full(len(self._node_ids), NO_IDX, dtype=np.int64)
+        out._elabel = None
+        out._eidx = None
+        out._xy = self._xy.copy() if self._xy is not None else None
+        out._extra = dict(self._extra)
+        out._added_out = {su: {sv: [NO_LABEL, NO_IDX] for sv in targets}
+                          for su, targets in self._added_out.items()}
+        out._added_in = {sv: set(sources) for sv, sources in self._added_in.items()}
+        out._n_added = self._n_added
+        out.instrumentation = self.instrumentation
+        return out
+
+    # nazwy tablic w zwartej postaci grafu (to_arrays / from_arrays)
+    ARRAY_NAMES = ("node_ids", "alive", "vlabel", "vidx", "sorted_ids", "sorted_slots",
+                   "indptr", "indices", "ealive", "in_indptr", "in_indices", "in_eid",
+                   "out_deg", "in_deg")
+    OPTIONAL_ARRAY_NAMES = ("elabel", "eidx", "xy")
+
+    def to_arrays(self) -> dict:
+        """Tablice opisujące graf; przy zmianach po zbudowaniu budowane od nowa, bez zmiany grafu."""
+        graph = self
+        if self._n_added or self._extra or self._n != len(self._node_ids):
+            graph = ArrayGraph.__new__(ArrayGraph)
+            graph._xy = None
+            self._compact_into(graph)
+        arrays = {name: getattr(graph, "_" + name) for name in self.ARRAY_NAMES}
+        for name in self.OPTIONAL_ARRAY_NAMES:
+            arr = getattr(graph, "_" + name)
+            if arr is not None:
+                arrays[name] = arr
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, labels: list, placement=PLACEMENT_SPRING):
+        """
+        Graf zbudowany wprost na podanych tablicach (bez kopiowania), np. z pamięci
+        współdzielonej albo plików mapowanych w pamięci. labels to tablica etykiet.
+        """
+        graph = cls.__new__(cls)
+        graph.placement = placement
+        graph._unplaced = set()
+        graph._max_node = None
+        graph._labels = LabelTable()
+        for label in labels:
+            graph._labels.intern(label)
+        graph._pos_like = None
+        for name in cls.ARRAY_NAMES:
+            setattr(graph, "_" + name, arrays[name])
+        for name in cls.OPTIONAL_ARRAY_NAMES:
+            setattr(graph, "_" + name, arrays.get(name))
+        graph._n = len(graph._node_ids)
+        graph._n_base = graph._n
+        graph._extra = {}
+        graph._added_out = {}
+        graph._added_in = {}
+        graph._n_added = 0
+        return graph
+
+    @classmethod
+    def load_snapshot(cls, path: str, mmap: bool = True):
+        """Graf na tablicach zmapowanych z plików zrzutu (plików nie wolno w tym czasie zmieniać)."""
+        from .snapshot import load_snapshot
+        return load_snapshot(path, mmap=mmap)
+
+    def to_networkx(self) -> nx.DiGraph:
+        g = nx.DiGraph()
+        g.add_nodes_from(self.nodes())
+        g.add_edges_from(self.edges())
+        labels = dict(self.vertex_labels)
+        if labels:
+            nx.set_node_attributes(g, labels, name="label")
+        return g
+
+    def to_graph(self) -> Graph:
+        return Graph(vertices=self.nodes(), edges=self.edges(),
+                     vertex_labels=dict(self.vertex_labels) or None,
+                     edge_labels=dict(self.edge_labels) or None,
+                     vertex_idx=dict(self.vertex_idx) or None,
+                     edge_idx=dict(self.edge_idx) or None,
+                     pos=(self.pos.copy() if self.pos_computed else None),
+                     placement=self.placement, lazy_pos=not self.pos_computed)
+
+    @classmethod
+    def from_graph(cls, graph: Graph):
+        # Graph nie usuwa indeksów usuniętych wierzchołków i krawędzi - tu są pomijane
+        vertex_idx = {n: i for n, i in graph.vertex_idx.items() if graph.has_node(n)}
+        edge_idx = {e: i for e, i in graph.edge_idx.items() if graph.has_edge(*e)}
+        return cls(vertices=graph.nodes(), edges=graph.edges(),
+                   vertex_labels=dict(graph.vertex_labels) or None,
+                   edge_labels=dict(graph.edge_labels) or None,
+                   vertex_idx=vertex_idx or None,
+                   edge_idx=edge_idx or None,
+                   pos=(dict(graph.pos) if graph.pos_computed else None),
+                   placement=graph.placement, lazy_pos=not graph.pos_computed)
+
+    def nbytes(self) -> int:
+        """Rozmiar tablic numpy (bez nakładki i tablicy etykiet)."""
+        total = 0
+        for arr in (self._node_ids, self._alive, self._vlabel, self._vidx,
+                    self._sorted_ids, self._sorted_slots, self._indptr,
+                    self._indices, self._ealive, self._elabel, self._eidx,
+                    self._in_indptr, self._in_indices, self._in_eid,
+                    self._out_deg, self._in_deg, self._xy):
+            if arr is not None:
+                total += arr.nbytes
+        return total
+
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from .graph import Graph, PLACEMENT_LOCAL
+from .production import Production
+from .transaction import UndoLog
+from .snapshot import SNAPSHOT_META
+
+# ile grafów wejściowych trzymać w pamięci naraz (najdawniej użyte są zwalniane)
+MAX_CACHED_GRAPHS = 16
+
+
+def load_graph(path: str, pos_like=None, lazy_pos: bool = True) -> Graph:
+    """
+    Wczytuje graf, wybierając format po rozszerzeniu: .obj, .csv albo katalog
+    ze zrzutem (save_snapshot). Domyślnie bez liczenia układu.
+    """
+    if os.path.isdir(path):
+        return Graph.load_snapshot(path)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".obj":
+        return Graph.from_obj(path, pos_like=pos_like, placement=PLACEMENT_LOCAL, lazy_pos=lazy_pos)
+    if ext == ".csv":
+        return Graph.from_csv(path, pos_like=pos_like, placement=PLACEMENT_LOCAL, lazy_pos=lazy_pos)
+    raise Exception(f"Nieznany format grafu: {path} (oczekiwano .obj, .csv albo katalogu ze zrzutem)")
+
+
+def parse_mapping(line: str) -> list[int]:
+    return [int(x) for x in line.replace(',', ' ').split()]
+
+
+def iter_mappings(path: str):
+    """Kolejne odwzorowania z pliku (jedno na linię) jako (numer linii, lista)."""
+    with open(path, 'r') as f:
+        for k, line in enumerate(f, start=1):
+            if line.strip():
+                yield k, parse_mapping(line)
+
+
+def iter_jobs(path: str):
+    """
+    Zadania z pliku: JSONL ({"graph", "left", "right", "mapping" | "mappings",
+    opcjonalnie "id" i "output"}) albo manifest z czterema ścieżkami w linii
+    (G L R plik_odwzorowań, rozdzielone spacjami lub przecinkami). # to komentarz.
+    """
+    with open(path, 'r') as f:
+        for k, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('{'):
+                job = json.loads(line)
+            else:
+                parts = line.replace(',', ' ').split()
+                if len(parts) != 4:
+                    raise Exception(f"{path}:{k}: oczekiwano 4 ścieżek (G L R odwzorowania)")
+                job = dict(zip(("graph", "left", "right", "mapping"), parts))
+            job.setdefault("id", k)
+            yield job
+
+
+class BatchRunner:
+    """
+    Wiele zadań (G, L, R, odwzorowania) w jednym procesie, bez rysowania.
+    Grafy i produkcje są pamiętane po ścieżce i skrócie pliku; G nie jest kopiowany.
+    """
+
+    def __init__(self, max_graphs: int = MAX_CACHED_GRAPHS):
+        self.max_graphs = max_graphs
+        self._digests = {}   # ścieżka -> (mtime_ns, rozmiar, skrót)
+        self._graphs = OrderedDict()
+        self._productions = {}
+        self.stats = {"jobs": 0, "applied": 0, "errors": 0, "graphs_loaded": 0,
+                      "productions_compiled": 0}
+
+    def _digest(self, path: str) -> str:
+        # skrót zawartości liczony ponownie tylko po zmianie pliku (mtime albo rozmiar)
+        target = os.path.join(path, SNAPSHOT_META) if os.path.isdir(path) else path
+        st = os.stat(target)
+        cached = self._digests.get(path)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2]
+        h = hashlib.blake2b(digest_size=16)
+        with open(target, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        if target != path:
+            # tablice zrzutu są zapisywane przed meta.json - jego czas wyznacza wersję
+            h.update(str(st.st_mtime_ns).encode())
+        digest = h.hexdigest()
+        self._digests[path] = (st.st_mtime_ns, st.st_size, digest)
+        return digest
+
+    def graph(self, path: str) -> Graph:
+        return self._host(path)[0]
+
+    def _host(self, path: str):
+        # (graf, liczba wierzchołków, liczba krawędzi) - number_of_edges w networkx jest O(n)
+        key = self._digest(path)
+        entry = self._graphs.get(key)
+        if entry is None:
+            G = load_graph(path)
+            entry = (G, G.number_of_nodes(), G.number_of_edges())
+            self.stats["graphs_loaded"] += 1
+            self._graphs[key] = entry
+            if len(self._graphs) > self.max_graphs:
+                self._graphs.popitem(last=False)
+        else:
+            self._graphs.move_to_end(key)
+        return entry
+
+    def production(self, left: str, right: str) -> Production:
+        key = (self._digest(left), self._digest(right))
+        production = self._productions.get(key)
+        if production is None:
+            L = load_graph(left)
+            R = load_graph(right, pos_like=L.pos)
+            production = Production(L, R)
+            self.stats["productions_compiled"] += 1
+            self._productions[key] = production
+        return production
+
+    def _mappings(self, job):
+        if "mappings" in job:
+            return enumerate(job["mappings"], start=1)
+        mapping = job["mapping"]
+        if isinstance(mapping, list):
+            return [(1, mapping)]
+        return iter_mappings(mapping)
+
+    def run_job(self, job):
+        """Generator wyników (słowników) - po jednym na każde odwzorowanie zadania."""
+        self.stats["jobs"] += 1
+        job_id = job.get("id")
+        try:
+            host = self._host(job["graph"])
+            production = self.production(job["left"], job["right"])
+            mappings = self._mappings(job)
+        except Exception as e:
+            self.stats["errors"] += 1
+            yield {"job": job_id, "line": None, "ok": False, "error": _error(e)}
+            return
+        output = job.get("output")
+        try:
+            for line, mapping in mappings:
+                yield self._apply(job_id, host, production, line, mapping, output)
+        except Exception as e:
+            # błąd czytania pliku odwzorowań w trakcie (np. niepoprawna liczba)
+            self.stats["errors"] += 1
+            yield {"job": job_id, "line": None, "ok": False, "error": _error(e)}
+
+    def _apply(self, job_id, host, production, line, mapping, output):
+        G, _, m = host
+        start = time.perf_counter()
+        log = UndoLog(G)
+        # rollback usuwa nowe wierzchołki, więc zapamiętane maksimum byłoby liczone od nowa
+        top = G.next_node_id() - 1
+        try:
+            try:
+                production.apply(G, mapping, inplace=True, undo_log=log)
+            except Exception as e:
+                self.stats["errors"] += 1
+                return {"job": job_id, "line": line, "mapping": mapping, "ok": False, "error": _error(e)}
+            added_nodes = log.added_nodes()
+            removed_nodes = log.removed_nodes()
+            added_edges = log.added_edges()
+            removed_edges = log.removed_edges()
+            result = {
+                "job": job_id, "line": line, "mapping": mapping, "ok": True,
+                # liczba wierzchołków z grafu przed cofnięciem; krawędzie z dziennika,
+                # bo number_of_edges w networkx jest O(n)
+                "nodes": G.number_of_nodes(),
+                "edges": m + len(added_edges) - len(removed_edges),
+                "added_nodes": added_nodes, "removed_nodes": removed_nodes,
+                "added_edges": added_edges, "removed_edges": removed_edges,
+            }
+            if output is not None:
+                path = output.format(job=job_id, line=line)
+                G.save_snapshot(path)
+                result["output"] = path
+        finally:
+            # także po błędzie: zmiany z dziennika i numery przydzielone nowym
+            # wierzchołkom, żeby kolejne zadania na tym grafie dawały te same wyniki
+            log.rollback()
+            G._max_node = top
+        self.stats["applied"] += 1
+        result["time_ms"] = (time.perf_counter() - start) * 1000
+        return result
+
+    def run(self, jobs, out):
+        """Wykonuje zadania i zapisuje wyniki jako JSONL do pliku out (otwartego do zapisu)."""
+        for job in jobs:
+            for result in self.run_job(job):
+                out.write(json.dumps(result) + "\n")
+        return self.stats
+
+
+def _error(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}"
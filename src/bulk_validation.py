@@ -0,0 +1,105 @@
+import numpy as np
+from .graph import Graph
+
+# kody przyczyn odrzucenia w validate_many (0 - odwzorowanie poprawne)
+VALID = 0
+NOT_INJECTIVE = 1
+MISSING_EDGE = 2
+MISSING_NODE = 3
+EXTRA_EDGE = 4
+DANGLING = 5
+
+
+def validate_many(production, G: Graph, mappings):
+    """
+    Sprawdza naraz wiele odwzorowań L -> G (tablica k x |L|) warunkami Production.validate.
+    Zwraca (maska poprawnych, kody przyczyn, opisy albo None). Etykiet nie sprawdza.
+    """
+    c = production.compiled
+    n_L = len(c.L_nodes_sorted)
+    M = np.asarray(mappings, dtype=np.int64)
+    if M.ndim == 1 and M.size == 0:
+        M = M.reshape(0, n_L)
+    if M.ndim != 2 or M.shape[1] != n_L:
+        raise Exception("Niepoprawna liczba wierzchołków w odwzorowaniu dla grafu L.")
+    k = len(M)
+    code = np.zeros(k, dtype=np.int8)
+    detail = np.zeros(k, dtype=np.int64)
+    if k == 0 or n_L == 0:
+        return code == VALID, code, [None] * k
+
+    # numery lokalne: pozycje w posortowanej tablicy użytych wierzchołków G
+    nodes, inverse = np.unique(M, return_inverse=True)
+    I = inverse.reshape(k, n_L)
+    exists, out_deg, in_deg, src, dst = G._local_adjacency(nodes)
+    n = len(nodes)
+    edge_keys = np.unique(src * n + dst)
+
+    def has_edge(a, b):
+        keys = a * n + b
+        if not len(edge_keys):
+            return np.zeros(keys.shape, dtype=bool)
+        i = np.minimum(np.searchsorted(edge_keys, keys), len(edge_keys) - 1)
+        return edge_keys[i] == keys
+
+    def mark(fail, reason, where):
+        fail &= code == VALID
+        code[fail] = reason
+        detail[fail] = where[fail]
+
+    # kolejność warunków jak w Production.validate - ten sam pierwszy błąd
+    S = np.sort(I, axis=1)
+    dup = (S[:, 1:] == S[:, :-1]).any(axis=1)
+    mark(dup, NOT_INJECTIVE, np.zeros(k, dtype=np.int64))
+
+    L_edges = np.array(c.L_edges_idx, dtype=np.int64).reshape(-1, 2)
+    if len(L_edges):
+        present = has_edge(I[:, L_edges[:, 0]], I[:, L_edges[:, 1]])
+        mark(~present.all(axis=1), MISSING_EDGE, np.argmin(present, axis=1))
+
+    alive = exists[I]
+    mark(~alive.all(axis=1), MISSING_NODE, np.argmin(alive, axis=1))
+
+    # pary wierzchołków L bez krawędzi w L - w G nie może być między nimi krawędzi
+    L_pairs = set(c.L_edges_idx)
+    forbidden = np.array([(i, j) for i in range(n_L) for j in range(n_L) if (i, j) not in L_pairs],
+                         dtype=np.int64).reshape(-1, 2)
+    if len(forbidden):
+        extra = has_edge(I[:, forbidden[:, 0]], I[:, forbidden[:, 1]])
+        mark(extra.any(axis=1), EXTRA_EDGE, np.argmax(extra, axis=1))
+
+    # po powyższych krawędzie G między dopasowanymi wierzchołkami to dokładnie obrazy
+    # krawędzi L, więc usuwany wierzchołek spełnia warunek wiszących krawędzi
+    # wtedy i tylko wtedy, gdy ma w G takie same stopnie jak w L
+    if c.removed_idx:
+        removed = np.array(c.removed_idx, dtype=np.int64)
+        L_out = np.bincount(L_edges[:, 0], minlength=n_L)[removed] if len(L_edges) else np.zeros(len(removed), dtype=np.int64)
+        L_in = np.bincount(L_edges[:, 1], minlength=n_L)[removed] if len(L_edges) else np.zeros(len(removed), dtype=np.int64)
+        local = I[:, removed]
+        dangling = (out_deg[local] != L_out) | (in_deg[local] != L_in)
+        mark(dangling.any(axis=1), DANGLING, removed[np.argmax(dangling, axis=1)])
+
+    reasons = [None] * k
+    for row in np.flatnonzero(code != VALID).tolist():
+        reasons[row] = _reason(c, M[row], int(code[row]), int(detail[row]), forbidden)
+    return code == VALID, code, reasons
+
+
+def _reason(c, mapping, code: int, detail: int, forbidden) -> str:
+    # komunikaty jak wyjątki z Production.validate; przy kilku nadmiarowych
+    # krawędziach wskazana może być inna niż w validate (zależy od kolejności w G)
+    L = c.L_nodes_sorted
+    if code == NOT_INJECTIVE:
+        return "Odwzorowanie nie jest injektywne – różne węzły L odwzorowano na ten sam węzeł grafu G."
+    if code == MISSING_EDGE:
+        i, j = c.L_edges_idx[detail]
+        return (f"Brak wymaganej krawędzi ({L[i]}->{L[j]}) z L w grafie początkowym "
+                f"(oczekiwano {mapping[i]}->{mapping[j]}).")
+    if code == MISSING_NODE:
+        return f"Wierzchołek {mapping[detail]} (obraz {L[detail]} z L) nie istnieje w grafie G."
+    if code == EXTRA_EDGE:
+        i, j = forbidden[detail]
+        return (f"Krawędź ({mapping[i]}->{mapping[j]}) w G nie jest dozwolona – brak odpowiadającej "
+                f"krawędzi ({L[i]}->{L[j]}) w L.")
+    return (f"Naruszenie warunku wiszącej krawędzi: wierzchołek {mapping[detail]} (do usunięcia) "
+            f"ma krawędź do wierzchołka, który nie jest objęty dopasowaniem, albo krawędź spoza L.")
@@ -0,0 +1,75 @@
+import numpy as np
+from .graph import Graph
+
+
+class CompiledProduction:
+    """
+    Struktury pochodne produkcji liczone raz (Production.compile()).
+    Wierzchołki L są numerowane pozycją w L_nodes_sorted, nowe wierzchołki R - w new_R_nodes.
+    """
+
+    def __init__(self, L: Graph, R: Graph):
+        self.L_nodes_sorted = tuple(sorted(L.nodes()))
+        self.L_index = {a: i for i, a in enumerate(self.L_nodes_sorted)}
+        self.L_nodes = frozenset(self.L_nodes_sorted)
+        self.R_nodes = frozenset(R.nodes())
+        self.L_edges = tuple(L.edges())
+        self.L_edge_set = frozenset(self.L_edges)
+        R_edges = set(R.edges())
+
+        # krawędzie L jako pary numerów
+        self.L_edges_idx = tuple((self.L_index[u], self.L_index[v])
+                                 for u, v in self.L_edges)
+
+        # wierzchołki usuwane i zachowane (numery w L_nodes_sorted)
+        self.removed_idx = tuple(i for i, a in enumerate(self.L_nodes_sorted)
+                                 if a not in self.R_nodes)
+        self.preserved_idx = tuple(i for i, a in enumerate(self.L_nodes_sorted)
+                                   if a in self.R_nodes)
+
+        # krawędzie między zachowanymi wierzchołkami, których nie ma w R
+        preserved = {self.L_nodes_sorted[i] for i in self.preserved_idx}
+        self.removed_edges_idx = tuple(
+            (self.L_index[u], self.L_index[v]) for u, v in self.L_edges
+            if u in preserved and v in preserved and (u, v) not in R_edges)
+
+        # nowe wierzchołki R (w kolejności, w jakiej apply przydziela im identyfikatory)
+        self.new_R_nodes = tuple(sorted(self.R_nodes - self.L_nodes))
+        self.new_labels = tuple(R.get_labels(r) for r in self.new_R_nodes)
+        new_index = {r: k for k, r in enumerate(self.new_R_nodes)}
+
+        # krawędzie R: numer >= 0 to wierzchołek L, ujemny -(k+1) to k-ty nowy wierzchołek
+        def ref(node):
+            if node in self.L_index:
+                return self.L_index[node]
+            return -(new_index[node] + 1)
+
+        self.R_edge_plan = tuple((ref(u), ref(v)) for u, v in R.edges())
+
+        # krawędzie R między wierzchołkami L, których nie było w L (dodawane do G)
+        L_edges_idx = set(self.L_edges_idx)
+        self.added_edges_idx = tuple((i, j) for i, j in self.R_edge_plan
+                                     if i >= 0 and j >= 0 and (i, j) not in L_edges_idx)
+
+        # pozycje: macierz [x, y, 1] wierzchołków L i pseudoodwrotność do lstsq
+        self.L_points = None
+        self.L_pinv = None
+        if self.L_nodes_sorted and all(a in L.pos for a in self.L_nodes_sorted):
+            self.L_points = np.array([L.pos[a] for a in self.L_nodes_sorted],
+                                     dtype=float)
+            if len(self.L_nodes_sorted) >= 3:
+                A = np.hstack([self.L_points, np.ones((len(self.L_points), 1))])
+                self.L_pinv = np.linalg.pinv(A)
+
+        # nowe wierzchołki R z pozycjami jako [x, y, 1]
+        self.new_with_pos = tuple(k for k, r in enumerate(self.new_R_nodes)
+                                  if r in R.pos)
+        if self.new_with_pos:
+            self.new_points = np.array(
+                [list(R.pos[self.new_R_nodes[k]][:2]) + [1.0]
+                 for k in self.new_with_pos], dtype=float)
+        else:
+            self.new_points = np.empty((0, 3))
+
+    def mapping_dict(self, mapping) -> dict:
+        return dict(zip(self.L_nodes_sorted, mapping))
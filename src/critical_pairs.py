@@ -0,0 +1,250 @@
+from .graph import Graph, label_key
+from .transaction import UndoLog
+from .parallel_step import Footprint, ConflictTracker, apply_footprints
+
+# rodzaje zależności: zastosowanie pierwszej produkcji może umożliwić dopasowanie drugiej
+DEPENDENCY_PRODUCE_USE = "produce-use"        # druga używa wierzchołka albo krawędzi dodanej przez pierwszą
+DEPENDENCY_DELETE_ENABLE = "delete-enable"    # pierwsza usuwa krawędź, która blokowała dopasowanie drugiej
+
+
+def _compatible(l1, l2) -> bool:
+    # ten sam wierzchołek G może być obrazem obu (pusta etykieta pasuje do każdej)
+    return not l1 or not l2 or label_key(l1) == label_key(l2)
+
+
+def _overlaps(labels1, edges1, labels2, edges2):
+    """
+    Niepuste częściowe injekcje L1 -> L2 (pary numerów), przy których oba grafy
+    mogą być jednocześnie indukowanymi dopasowaniami w jednym G.
+    """
+    n1, n2 = len(labels1), len(labels2)
+    pairs = []
+    used = set()
+
+    def consistent(i, j):
+        for i2, j2 in pairs + [(i, j)]:
+            if ((i, i2) in edges1) != ((j, j2) in edges2):
+                return False
+            if ((i2, i) in edges1) != ((j2, j) in edges2):
+                return False
+        return True
+
+    def search(i):
+        if i == n1:
+            if pairs:
+                yield tuple(pairs)
+            return
+        yield from search(i + 1)
+        for j in range(n2):
+            if j in used or not _compatible(labels1[i], labels2[j]) or not consistent(i, j):
+                continue
+            pairs.append((i, j))
+            used.add(j)
+            yield from search(i + 1)
+            used.discard(j)
+            pairs.pop()
+
+    yield from search(0)
+
+
+class CriticalPair:
+    """Nakładanie dwóch produkcji (overlap) i rodzaj kolizji albo zależności (kind)."""
+
+    def __init__(self, first: int, second: int, overlap: dict, kind: str):
+        self.first = first
+        self.second = second
+        self.overlap = overlap
+        self.kind = kind
+
+    def __repr__(self):
+        return f"CriticalPair({self.first}, {self.second}, {self.overlap}, {self.kind!r})"
+
+
+class ProductionAnalysis:
+    """
+    Pary krytyczne i zależności zbioru produkcji, liczone raz na grafach L, K, R.
+    Kolizję dwóch dopasowań rozstrzyga potem jedno wyszukanie ich nakładania.
+    """
+
+    def __init__(self, productions):
+        self.productions = list(productions)
+        self._index = {id(p): k for k, p in enumerate(self.productions)}
+        self.critical_pairs = []
+        self.dependencies = []
+        # (a, b) -> {nakładanie jako krotka par (numer w L_a, numer w L_b): rodzaj kolizji}
+        self._conflicts = {}
+        # (a, b) -> wszystkie możliwe nakładania (kolidujące i niekolidujące)
+        self._overlaps = {}
+        # (a, b) -> lista zależności b od a
+        self._depends = {}
+        for a in range(len(self.productions)):
+            for b in range(len(self.productions)):
+                self._analyse_conflicts(a, b)
+                self._analyse_dependencies(a, b)
+
+    def index(self, production) -> int:
+        k = self._index.get(id(production))
+        if k is None:
+            raise Exception("Produkcja nie należy do analizowanego zbioru.")
+        return k
+
+    def _L(self, production):
+        c = production.compiled
+        labels = [production.L.get_labels(a) for a in c.L_nodes_sorted]
+        return labels, set(c.L_edges_idx)
+
+    def _analyse_conflicts(self, a: int, b: int):
+        pa, pb = self.productions[a], self.productions[b]
+        n_b = len(pb.compiled.L_nodes_sorted)
+        table = {}
+        known = self._overlaps[(a, b)] = set()
+        for pairs in _overlaps(*self._L(pa), *self._L(pb)):
+            known.add(pairs)
+            # najmniejszy G z oboma dopasowaniami: wierzchołki L_b i niesklejone wierzchołki L_a
+            shared = dict(pairs)
+            mapping_a = [shared.get(i, n_b + i) for i in range(len(pa.compiled.L_nodes_sorted))]
+            tracker = ConflictTracker()
+            tracker.add(Footprint(pb, list(range(n_b))))
+            kind = tracker.conflict_reason(Footprint(pa, mapping_a))
+            if kind is None:
+                continue
+            table[pairs] = kind
+            La, Lb = pa.compiled.L_nodes_sorted, pb.compiled.L_nodes_sorted
+            self.critical_pairs.append(CriticalPair(a, b, {La[i]: Lb[j] for i, j in pairs}, kind))
+        if table:
+            self._conflicts[(a, b)] = table
+
+    def _analyse_dependencies(self, a: int, b: int):
+        pa, pb = self.productions[a], self.productions[b]
+        ca = pa.compiled
+        K = pa.K if pa.K is not None else pa.compute_K_graph()
+        # graf po kroku a w miejscu dopasowania: zachowane wierzchołki (etykiety z K)
+        # i nowe wierzchołki R, krawędzie jak w R
+        nodes = sorted(K.nodes()) + list(ca.new_R_nodes)
+        index = {r: k for k, r in enumerate(nodes)}
+        labels = [K.get_labels(r) for r in sorted(K.nodes())] + list(ca.new_labels)
+        edges = {(index[u], index[v]) for u, v in pa.R.edges()}
+        n_kept = K.number_of_nodes()
+        kept_edges = {(index[u], index[v]) for u, v in K.edges()}
+        removed_edges = {(index[ca.L_nodes_sorted[i]], index[ca.L_nodes_sorted[j]])
+                         for i, j in ca.removed_edges_idx}
+        # zachowane wierzchołki, którym krok a zmniejsza stopień
+        removed = {ca.L_nodes_sorted[i] for i in ca.removed_idx}
+        lowered = {w for edge in removed_edges for w in edge}
+        lowered |= {index[u] for u, v in ca.L_edges if v in removed and u not in removed}
+        lowered |= {index[v] for u, v in ca.L_edges if u in removed and v not in removed}
+        deleted_b = set(pb.compiled.removed_idx)
+
+        labels_b, edges_b = self._L(pb)
+        found = []
+        for pairs in _overlaps(labels, edges, labels_b, edges_b):
+            shared = dict(pairs)
+            kind = None
+            if any(i >= n_kept for i in shared):
+                kind = DEPENDENCY_PRODUCE_USE
+            elif any(u in shared and v in shared for u, v in edges - kept_edges):
+                kind = DEPENDENCY_PRODUCE_USE
+            elif any(u in shared and v in shared for u, v in removed_edges):
+                kind = DEPENDENCY_DELETE_ENABLE
+            elif any(shared[i] in deleted_b for i in lowered & shared.keys()):
+                # warunek wiszących krawędzi b może być spełniony dopiero po kroku a
+                kind = DEPENDENCY_DELETE_ENABLE
+            if kind is not None:
+                Lb = pb.compiled.L_nodes_sorted
+                found.append(CriticalPair(a, b, {nodes[i]: Lb[j] for i, j in pairs}, kind))
+        if found:
+            self._depends[(a, b)] = found
+            self.dependencies.extend(found)
+
+    def parallel_independent(self, a: int, b: int) -> bool:
+        """Czy dopasowania produkcji a i b (zgodne z etykietami L) nigdy nie kolidują."""
+        return (a, b) not in self._conflicts
+
+    def depends(self, a: int, b: int) -> bool:
+        """Czy zastosowanie produkcji a może utworzyć nowe dopasowanie produkcji b."""
+        return (a, b) in self._depends
+
+    def conflict(self, a: int, mapping_a, b: int, mapping_b):
+        """Rodzaj kolizji dwóch dopasowań (stałe CONFLICT_*) albo None - bez budowania śladów."""
+        return self._conflict_at(a, mapping_a, b, {x: j for j, x in enumerate(mapping_b)})
+
+    def _conflict_at(self, a: int, mapping_a, b: int, position_b: dict):
+        # position_b: wierzchołek G -> numer w L_b (liczony raz dla przyjętego dopasowania)
+        pairs = tuple((i, position_b[x]) for i, x in enumerate(mapping_a) if x in position_b)
+        if not pairs:
+            return None
+        if pairs in self._overlaps[(a, b)]:
+            return self._conflicts.get((a, b), {}).get(pairs)
+        # nakładania spoza analizy: validate nie sprawdza etykiet, więc odwzorowanie
+        # niezgodne z etykietami L przechodzi - wtedy zwykłe porównanie śladów
+        tracker = ConflictTracker()
+        tracker.add(Footprint(self.productions[b], list(position_b)))
+        return tracker.conflict_reason(Footprint(self.productions[a], mapping_a))
+
+    def independent_groups(self):
+        """Podział produkcji na grupy parami równolegle niezależnych (zachłannie)."""
+        groups = []
+        for a in range(len(self.productions)):
+            if not self.parallel_independent(a, a):
+                groups.append([a])
+                continue
+            for group in groups:
+                if all(self.parallel_independent(a, b) for b in group):
+                    group.append(a)
+                    break
+            else:
+                groups.append([a])
+        return groups
+
+
+def _conflicts_with(analysis, a, mapping, accepted, owners) -> bool:
+    # sprawdzane są tylko przyjęte dopasowania o wspólnych wierzchołkach
+    checked = set()
+    for x in mapping:
+        for k in owners.get(x, ()):
+            if k in checked:
+                continue
+            checked.add(k)
+            b, position, _ = accepted[k]
+            if analysis._conflict_at(a, mapping, b, position) is not None:
+                return True
+    return False
+
+
+def select_concurrent(G: Graph, candidates, analysis: ProductionAnalysis, limit: int | None = None):
+    """Jak select_independent, ale kolizje rozstrzyga tablica z analysis."""
+    accepted = []
+    owners = {}  # wierzchołek G -> numery przyjętych dopasowań
+    for production, mapping in candidates:
+        if limit is not None and len(accepted) >= limit:
+            break
+        a = analysis.index(production)
+        try:
+            production.validate(G, mapping)
+        except Exception:
+            continue
+        mapping = list(mapping)
+        if _conflicts_with(analysis, a, mapping, accepted, owners):
+            continue
+        for x in mapping:
+            owners.setdefault(x, []).append(len(accepted))
+        position = {x: j for j, x in enumerate(mapping)}
+        accepted.append((a, position, Footprint(production, mapping)))
+    return [fp for _, _, fp in accepted]
+
+
+def apply_concurrent(G: Graph, productions, analysis: ProductionAnalysis | None = None, matches=None,
+                     transform_positions: bool = False, inplace: bool = False,
+                     undo_log: UndoLog | None = None, limit: int | None = None):
+    """
+    Stosuje niekolidujące dopasowania wielu produkcji w jednym przejściu.
+    Zwraca (graf wynikowy, lista zastosowanych par (produkcja, odwzorowanie)).
+    """
+    if analysis is None:
+        analysis = ProductionAnalysis(productions)
+    if matches is None:
+        matches = ((p, m) for p in productions for m in p.find_matches(G))
+    footprints = select_concurrent(G, matches, analysis, limit=limit)
+    output = apply_footprints(G, footprints, transform_positions=transform_positions,
+                              inplace=inplace, undo_log=undo_log)
+    return output, [(fp.production, fp.mapping) for fp in footprints]
@@ -0,0 +1,150 @@
+import json
+import os
+import pickle
+from .graph import Graph
+from .transaction import UndoLog
+
+# formaty dziennika delt (po rozszerzeniu pliku)
+LOG_JSONL = "jsonl"    # jedna delta na linię, czytelny, do przesyłania
+LOG_BINARY = "binary"  # kolejne rekordy pickle - mniejszy i szybszy
+
+
+class StepDelta:
+    """Zmiany grafu w jednym kroku (z UndoLog): usunięte i dodane elementy, etykiety, odwzorowanie."""
+
+    def __init__(self, title, removed_nodes, removed_edges, added_nodes, added_edges,
+                 relabelled=None, mapping=None):
+        self.title = title
+        self.removed_nodes = removed_nodes
+        self.removed_edges = removed_edges
+        self.added_nodes = added_nodes  # lista (wierzchołek, indeks, etykieta, pozycja)
+        self.added_edges = added_edges  # lista (u, v, indeks, etykieta)
+        self.relabelled = relabelled if relabelled is not None else []  # lista (wierzchołek, etykieta)
+        self.mapping = mapping
+
+    @classmethod
+    def from_log(cls, log: UndoLog, title=None, mapping=None):
+        G = log.graph
+        removed_edges = [(op[1], op[2]) for op in log.ops if op[0] == "remove_edge"]
+        added = log.added_nodes()
+        # bez liczenia układu, jeśli graf ma leniwe pozycje
+        pos = G.pos if G.pos_computed else {}
+        added_nodes = [(node, G.vertex_idx.get(node), G.get_labels(node),
+                        list(map(float, pos[node])) if node in pos else None)
+                       for node in added]
+        added_edges = [(u, v, G.edge_idx.get((u, v)), G.edge_labels.get((u, v)))
+                       for u, v in log.added_edges()]
+        new = set(added)
+        relabelled = {}
+        for op in log.ops:
+            node = op[1]
+            if op[0] == "set_label" and node not in new and G.has_node(node):
+                relabelled[node] = G.get_labels(node)
+        return cls(title, log.removed_nodes(), removed_edges, added_nodes, added_edges,
+                   relabelled=list(relabelled.items()),
+                   mapping=list(mapping) if mapping is not None else None)
+
+    def apply_to(self, graph: Graph):
+        # odtworzenie kroku bez produkcji - pozycje nowych wierzchołków są w delcie
+        for u, v in self.removed_edges:
+            if graph.has_edge(u, v):
+                graph.remove_edge(u, v)
+        for node in self.removed_nodes:
+            if graph.has_node(node):
+                graph.remove_node(node)
+        for node, index, label, pos in self.added_nodes:
+            graph.add_node(node, index=index, pos=pos)
+            if label is not None:
+                # jak w Production._rewrite - także pusta etykieta []
+                graph.set_label(node, label)
+        for u, v, index, label in self.added_edges:
+            graph.add_edge(u, v, index=index, label=label)
+        for node, label in self.relabelled:
+            graph.set_label(node, label)
+
+    def to_dict(self) -> dict:
+        return {
+            "title": self.title,
+            "mapping": self.mapping,
+            "removed_nodes": self.removed_nodes,
+            "removed_edges": [list(e) for e in self.removed_edges],
+            "added_nodes": [list(n) for n in self.added_nodes],
+            "added_edges": [list(e) for e in self.added_edges],
+            "relabelled": [list(r) for r in self.relabelled],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data.get("title"), data["removed_nodes"],
+                   [tuple(e) for e in data["removed_edges"]],
+                   [tuple(n) for n in data["added_nodes"]],
+                   [tuple(e) for e in data["added_edges"]],
+                   relabelled=[tuple(r) for r in data.get("relabelled", ())],
+                   mapping=data.get("mapping"))
+
+
+def _log_format(path: str, fmt: str | None) -> str:
+    if fmt is None:
+        fmt = LOG_JSONL if path.lower().endswith((".jsonl", ".json")) else LOG_BINARY
+    if fmt not in (LOG_JSONL, LOG_BINARY):
+        raise ValueError(f"Nieznany format dziennika delt: {fmt}")
+    return fmt
+
+
+class DeltaLog:
+    """
+    Dziennik delt tylko do dopisywania: JSONL (*.jsonl) albo binarny (rekordy
+    pickle, inne rozszerzenia). Każda delta jest zapisywana od razu, więc plik
+    można czytać strumieniowo (iter_deltas) jeszcze w trakcie wyprowadzenia.
+    """
+
+    def __init__(self, path: str, fmt: str | None = None):
+        self.path = path
+        self.format = _log_format(path, fmt)
+        self.file = open(path, 'a' if self.format == LOG_JSONL else 'ab')
+
+    def append(self, delta: StepDelta):
+        if self.format == LOG_JSONL:
+            self.file.write(json.dumps(delta.to_dict()) + "\n")
+        else:
+            pickle.dump(delta.to_dict(), self.file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_deltas(path: str, fmt: str | None = None):
+    """Kolejne delty z dziennika (strumieniowo, bez wczytywania całego pliku)."""
+    fmt = _log_format(path, fmt)
+    if fmt == LOG_JSONL:
+        with open(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield StepDelta.from_dict(json.loads(line))
+        return
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        while f.tell() < size:
+            yield StepDelta.from_dict(pickle.load(f))
+
+
+def replay(start, path: str, steps: int | None = None, fmt: str | None = None) -> Graph:
+    """
+    Odtwarza graf po steps krokach dziennika (domyślnie po wszystkich).
+    start to graf (modyfikowany w miejscu) albo katalog ze zrzutem (save_snapshot).
+    """
+    graph = Graph.load_snapshot(start) if isinstance(start, str) else start
+    if steps is not None and steps <= 0:
+        return graph
+    for k, delta in enumerate(iter_deltas(path, fmt), start=1):
+        delta.apply_to(graph)
+        if steps is not None and k >= steps:
+            break
+    return graph
@@ -0,0 +1,168 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from .graph import Graph, PLACEMENT_LOCAL
+from .transaction import UndoLog
+from .delta import StepDelta
+from .render import new_figure, render_graph, save_figure
+
+FRAME_PATTERN = "frame_{:05d}.png"
+
+
+class DerivationRecorder:
+    """
+    Zapis wyprowadzenia jako stan początkowy i delty kolejnych Production.apply.
+    Stare wierzchołki się nie ruszają, więc klatki animacji są stabilne.
+    """
+
+    def __init__(self, graph: Graph, transform_positions: bool = True):
+        self.graph = graph
+        self.transform_positions = transform_positions
+        pos = graph.pos  # układ liczony raz, tu (przy leniwym grafie)
+        self.initial = {
+            "nodes": graph.nodes(),
+            "edges": graph.edges(),
+            "labels": {n: graph.get_labels(n) for n in graph.nodes()
+                       if graph.get_labels(n) is not None},
+            "vertex_idx": dict(graph.vertex_idx),
+            "edge_labels": dict(graph.edge_labels),
+            "edge_idx": dict(graph.edge_idx),
+            "pos": {n: list(pos[n]) for n in graph.nodes()},
+        }
+        self.steps = []
+
+    def apply(self, production, mapping, title: str | None = None) -> StepDelta:
+        """Stosuje produkcję w miejscu i zapisuje deltę kroku."""
+        log = UndoLog(self.graph)
+        production.apply(self.graph, mapping, transform_positions=self.transform_positions,
+                         inplace=True, undo_log=log)
+        delta = StepDelta.from_log(log, title=title, mapping=mapping)
+        self.steps.append(delta)
+        return delta
+
+    def __len__(self):
+        return len(self.steps)
+
+    @property
+    def n_frames(self) -> int:
+        return len(self.steps) + 1
+
+    def initial_graph(self) -> Graph:
+        return _initial_graph(self.initial)
+
+    def frame_graph(self, k: int) -> Graph:
+        """Graf po k krokach (odtworzony z delt)."""
+        graph = self.initial_graph()
+        for delta in self.steps[:k]:
+            delta.apply_to(graph)
+        return graph
+
+    def bounds(self):
+        """Wspólne granice osi dla wszystkich klatek (xmin, xmax, ymin, ymax)."""
+        points = list(self.initial["pos"].values())
+        for delta in self.steps:
+            points.extend(pos for _, _, _, pos in delta.added_nodes if pos is not None)
+        if not points:
+            return (-1.0, 1.0, -1.0, 1.0)
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        pad_x = 0.05 * (max(xs) - min(xs) or 1.0)
+        pad_y = 0.05 * (max(ys) - min(ys) or 1.0)
+        return (min(xs) - pad_x, max(xs) + pad_x, min(ys) - pad_y, max(ys) + pad_y)
+
+    def render(self, path: str, workers: int | None = None, fps: float = 5,
+               figsize=(6, 4.5), dpi=80, chunk_size: int | None = None) -> list[str]:
+        """
+        Renderuje klatki w puli procesów do GIF (path *.gif) albo PNG w katalogu path.
+        Zwraca ścieżki klatek.
+        """
+        gif = path.lower().endswith(".gif")
+        frame_dir = os.path.splitext(path)[0] + "_frames" if gif else path
+        os.makedirs(frame_dir, exist_ok=True)
+
+        workers = workers or os.cpu_count() or 1
+        n = self.n_frames
+        if chunk_size is None:
+            chunk_size = max(1, math.ceil(n / (workers * 4)))
+        chunks = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+        setup = (self.initial, self.steps, self.bounds(), figsize, dpi, frame_dir)
+
+        frames = []
+        if workers == 1:
+            _init_frame_worker(*setup)
+            for start, stop in chunks:
+                frames.extend(_render_chunk(start, stop))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_frame_worker,
+                                     initargs=setup) as executor:
+                for paths in executor.map(_render_chunk, *zip(*chunks)):
+                    frames.extend(paths)
+
+        if gif:
+            write_gif(frames, path, fps=fps)
+        return frames
+
+
+def write_gif(frames: list[str], path: str, fps: float = 5):
+    """Składa klatki PNG w animowany GIF (Pillow, zależność matplotlib)."""
+    from PIL import Image
+
+    def images():
+        for frame in frames[1:]:
+            with Image.open(frame) as im:
+                yield im.convert("RGB").convert("P", palette=Image.ADAPTIVE)
+
+    with Image.open(frames[0]) as first:
+        first = first.convert("RGB").convert("P", palette=Image.ADAPTIVE)
+    first.save(path, save_all=True, append_images=images(),
+               duration=int(1000 / fps), loop=0)
+
+
+def _initial_graph(initial) -> Graph:
+    return Graph(vertices=initial["nodes"], edges=initial["edges"],
+                 vertex_labels=dict(initial["labels"]) or None,
+                 edge_labels=dict(initial["edge_labels"]) or None,
+                 vertex_idx=dict(initial["vertex_idx"]) or None,
+                 edge_idx=dict(initial["edge_idx"]) or None,
+                 pos={n: list(p) for n, p in initial["pos"].items()},
+                 placement=PLACEMENT_LOCAL)
+
+
+# stan procesu renderującego (ustawiany raz w inicjalizatorze puli)
+_frame_worker = {}
+
+
+def _init_frame_worker(initial, steps, bounds, figsize, dpi, frame_dir):
+    _frame_worker.update(initial=initial, steps=steps, bounds=bounds, figsize=figsize,
+                         dpi=dpi, frame_dir=frame_dir, graph=None, index=0)
+
+
+def _render_chunk(start, stop):
+    w = _frame_worker
+    # graf procesu idzie tylko do przodu; przy cofnięciu budujemy go od nowa
+    if w["graph"] is None or w["index"] > start:
+        w["graph"] = _initial_graph(w["initial"])
+        w["index"] = 0
+    graph = w["graph"]
+    steps = w["steps"]
+    while w["index"] < start:
+        steps[w["index"]].apply_to(graph)
+        w["index"] += 1
+
+    xmin, xmax, ymin, ymax = w["bounds"]
+    paths = []
+    for k in range(start, stop):
+        if k > w["index"]:
+            steps[w["index"]].apply_to(graph)
+            w["index"] += 1
+        fig = new_figure(figsize=w["figsize"], dpi=w["dpi"])
+        ax = fig.add_subplot()
+        ax.set_xlim(xmin, xmax)
+        ax.set_ylim(ymin, ymax)
+        render_graph(graph, ax)
+        title = steps[k - 1].title if k > 0 else None
+        ax.set_title(f"G{k}" + (f": {title}" if title else ""))
+        path = os.path.join(w["frame_dir"], FRAME_PATTERN.format(k))
+        save_figure(fig, path)
+        paths.append(path)
+    return paths
@@ -1,35 +1,80 @@
+import math
+from itertools import chain
 import networkx as nx
-import matplotlib.pyplot as plt
+import numpy as np
+from .loaders import parse_csv, parse_obj
+from .instrumentation import Instrumentation, NULL_INSTRUMENTATION
+from .layout import LAYOUT_SPRING, LAYOUT_FORCE, LAYOUT_AUTO, AUTO_FORCE_NODES, FORCE_ITERATIONS, force_layout
+
+# tryby rozmieszczania nowych wierzchołków w add_node
+PLACEMENT_SPRING = "spring"  # spring_layout całego grafu (z zamrożonymi starymi wierzchołkami)
+PLACEMENT_LOCAL = "local"    # tylko na podstawie sąsiedztwa, patrz relax_local()
+# liczba iteracji nx.spring_layout (wartość domyślna networkx)
+SPRING_ITERATIONS = 50
+
+
+def label_key(label):
+    # etykiety z plików .obj są listami - do indeksów i liczenia potrzebna wersja haszowalna
+    if isinstance(label, list):
+        return tuple(label)
+    return label
+
+
+def _index_add(index, key, item):
+    # kubełki to słowniki bez wartości: O(1) dodawanie i usuwanie, kolejność wstawiania
+    bucket = index.get(key)
+    if bucket is None:
+        index[key] = {item: None}
+    else:
+        bucket[item] = None
+
+
+def _index_discard(index, key, item):
+    bucket = index.get(key)
+    if bucket is not None:
+        bucket.pop(item, None)
+        if not bucket:
+            del index[key]
 
 
 class Graph:
-    def __init__(self, vertices=None, edges=None, vertex_labels=None, edge_labels=None, vertex_idx=None, edge_idx=None, pos=None, pos_like=None):
+    # Instrumentation albo None (wyłączona), patrz enable_instrumentation()
+    instrumentation = None
+    # silnik układu: LAYOUT_AUTO, LAYOUT_SPRING, LAYOUT_FORCE albo funkcja
+    # (layout_graph, pos=, fixed=, seed=) -> {wierzchołek: pozycja}
+    layout_engine = LAYOUT_AUTO
+    # ziarno układu (None - losowe); ten sam seed daje ten sam układ
+    layout_seed = None
+
+    def __init__(self, vertices=None, edges=None, vertex_labels=None, edge_labels=None, vertex_idx=None, edge_idx=None, pos=None, pos_like=None, placement=PLACEMENT_SPRING, lazy_pos=False):
+        if placement not in (PLACEMENT_SPRING, PLACEMENT_LOCAL):
+            raise ValueError(f"Nieznany tryb rozmieszczania: {placement}")
+        self.placement = placement
+        # wierzchołki dodane w trybie lokalnym, które czekają na relax_local()
+        self._unplaced = set()
+        # największy identyfikator wierzchołka (None = do przeliczenia), patrz next_node_id()
+        self._max_node = None
         self.nx_graph = nx.DiGraph()
         self.vertex_labels = {}
         self.vertex_idx = {}
         self.edge_labels = {}
         self.edge_idx = {}
-        self.pos = {}
+        self._pos = None
 
         if vertices is not None:
-            for v in vertices:
-                self.nx_graph.add_node(v)
+            self.nx_graph.add_nodes_from(vertices)
 
         if edges is not None:
-            for u, v in edges:
-                self.nx_graph.add_edge(u, v)
+            self.nx_graph.add_edges_from(edges)
 
+        # etykiety są tylko w słownikach (bez kopii w atrybutach nx_graph)
         if vertex_labels is not None:
             self.vertex_labels.update(vertex_labels)
-        if self.vertex_labels:
-            nx.set_node_attributes(
-                self.nx_graph, self.vertex_labels, name="label")
 
         if edge_labels is not None:
             self.edge_labels.update(edge_labels)
-        if self.edge_labels:
-            nx.set_edge_attributes(
-                self.nx_graph, self.edge_labels, name="label")
+
+        self._build_indexes()
 
         if vertex_idx is not None:
             self.vertex_idx.update(vertex_idx)
@@ -43,174 +88,491 @@ class Graph:
             nx.set_edge_attributes(
                 self.nx_graph, self.edge_idx, name="index")
 
+        self._pos_like = pos_like
         if pos is not None:
             self.pos = pos
-        elif pos_like is not None:
-            oldVertexes = [node for node in list(
-                self.nx_graph.nodes()) if node in pos_like]
-            self.pos = dict([(node, pos_like[node]) if node in pos_like else (
-                node, [0, 0]) for node in list(self.nx_graph.nodes())])
-            self.pos = nx.spring_layout(
-                self.nx_graph, pos=self.pos, fixed=oldVertexes)
-        else:
-            self.pos = nx.spring_layout(self.nx_graph)
+        elif not lazy_pos:
+            self.pos = self._compute_layout()
+        # w trybie leniwym pozycje zostaną policzone przy pierwszym odczycie self.pos
+
+    @property
+    def pos(self):
+        if self._pos is None:
+            self._pos = self._compute_layout()
+        return self._pos
+
+    @pos.setter
+    def pos(self, value):
+        self._pos = value
+
+    @property
+    def pos_computed(self) -> bool:
+        return self._pos is not None
+
+    def _layout_graph(self) -> nx.DiGraph:
+        # graf networkx, na którym liczone są układy (spring_layout)
+        return self.nx_graph
+
+    def enable_instrumentation(self, instrumentation: Instrumentation | None = None) -> Instrumentation:
+        """Włącza pomiar czasu układu (layout, relax_local) i liczników; zwraca obiekt ze statystykami."""
+        if instrumentation is None:
+            instrumentation = Instrumentation()
+        self.instrumentation = instrumentation
+        return instrumentation
+
+    def disable_instrumentation(self):
+        self.instrumentation = None
+
+    def _instrumentation(self):
+        return self.instrumentation if self.instrumentation is not None else NULL_INSTRUMENTATION
+
+    def _layout_engine(self):
+        # LAYOUT_AUTO: nx.spring_layout dla małych grafów, force_layout dla dużych
+        engine = self.layout_engine
+        if engine == LAYOUT_AUTO:
+            return LAYOUT_FORCE if self.number_of_nodes() > AUTO_FORCE_NODES else LAYOUT_SPRING
+        return engine
+
+    def _run_layout(self, layout_graph, pos=None, fixed=None):
+        # układ wybranym silnikiem; zwraca (pozycje, liczba iteracji)
+        engine = self._layout_engine()
+        if engine == LAYOUT_SPRING:
+            return nx.spring_layout(layout_graph, pos=pos, fixed=fixed, iterations=SPRING_ITERATIONS,
+                                    seed=self.layout_seed), SPRING_ITERATIONS
+        if engine == LAYOUT_FORCE:
+            return force_layout(layout_graph.nodes(), layout_graph.edges(), pos=pos, fixed=fixed,
+                                seed=self.layout_seed), FORCE_ITERATIONS
+        if callable(engine):
+            return engine(layout_graph, pos=pos, fixed=fixed, seed=self.layout_seed), 0
+        raise ValueError(f"Nieznany silnik układu: {engine}")
+
+    def _compute_layout(self):
+        probe = self._instrumentation()
+        with probe.phase("layout"):
+            pos, iterations = self._spring_layout()
+        probe.count("layout_iterations", iterations)
+        return pos
 
-    @classmethod
-    def from_csv(cls, filepath: str, pos_like=None):
-        vertices = []
-        edges = []
-        labels = {}
-        with open(filepath, 'r') as f:
-            lines = [line.strip() for line in f if line.strip()]
-        if not lines:
-            return cls()
-
-        # ilość wierzchołków
-        first_line = lines[0].split(',')
-        try:
-            count = int(first_line[0].strip())
-        except ValueError:
-            count = None
-
-        if count is not None:
-            vertices = list(range(1, count+1))
-
-            # na razie etykiety w pierwszej linii 3, yellow, orange, blue
-            if len(first_line) > 1:
-                labels_list = [x.strip() for x in first_line[1:]]
-                if len(labels_list) == count:
-                    for i, lab in enumerate(labels_list, start=1):
-                        labels[i] = lab
-
-        # w reszcie linii krawędzie
-        for line in (lines[1:] if count is not None else lines):
-            parts = line.split(',')
-            if len(parts) >= 2:
-                try:
-                    u = int(parts[0].strip())
-                    v = int(parts[1].strip())
-                except ValueError:
-                    continue  # jest jakiś syf zamiast dwóch liczb
-                edges.append((u, v))
-                # TODO: trzebaby dodać że następne częsci linii to etykiety, np 3, 1, red (3->1 etykieta= red)
-        return cls(vertices=vertices, edges=edges, vertex_labels=(labels if labels else None), pos_like=pos_like)
+    def _spring_layout(self):
+        pos_like = self._pos_like
+        self._pos_like = None
+        layout_graph = self._layout_graph()
+        if pos_like is not None and self._layout_engine() != LAYOUT_SPRING:
+            # pozostałe silniki same rozmieszczają wierzchołki bez pozycji
+            fixed = [node for node in layout_graph.nodes() if node in pos_like]
+            pos = {node: pos_like[node] for node in fixed}
+            return self._run_layout(layout_graph, pos=pos or None, fixed=fixed or None)
+        if pos_like is not None:
+            oldVertexes = [node for node in list(
+                layout_graph.nodes()) if node in pos_like]
+            pos = dict([(node, pos_like[node]) if node in pos_like else (
+                node, [0, 0]) for node in list(layout_graph.nodes())])
+            return self._run_layout(layout_graph, pos=pos, fixed=oldVertexes)
+        return self._run_layout(layout_graph)
 
     @classmethod
-    def from_obj(cls, filepath: str, pos_like=None):
-        vertices = []
-        edges = []
-        v_labels = {}
-        e_labels = {}
-        e_idx = {}
-        v_idx = {}
-        with open(filepath, 'r') as f:
-            lines = [line.strip() for line in f if line.strip()]
-        if not lines:
-            return cls()
-        for line in lines:
-            line = line.strip()
-            first_char = line[0]
-            if first_char == 'v':
-                labels = line[1:].strip().split()
-                idx = labels[0]
-                labels = labels[1:]
-                if idx or idx.strip() == "":
-                    idx = f'{len(vertices) + 1}'
-                try:
-                    idx = int(idx.strip())
-                except ValueError:
-                    print(f'[WARN] Expected number in line:\n\t{line}')
-                    continue
-                v_idx[idx] = idx
-
-                node_id = len(vertices) + 1
-                vertices.append(node_id)
-                if labels:
-                    v_labels[node_id] = labels
-                else:
-                    v_labels[node_id] = []
-            elif first_char == 'e':
-                parts = line[1:].strip().split()
-                if len(parts) >= 2:
-                    try:
-                        u = int(parts[0].strip())
-                        v = int(parts[1].strip())
-                        i = int(parts[2].strip()) if len(parts) >= 3 else None
-                    except ValueError:
-                        print(f'[WARN] Expected numbers in line:\n\t{line}')
-                        continue
-                    if i is None:
-                        i = len(edges) + 1
-                    e_idx[(u, v)] = i
-                    if len(parts) >= 4:
-                        e_labels[(u, v)] = parts[3:]
-                    edges.append((u, v))
+    def _from_parsed(cls, parsed, pos_like=None, placement=PLACEMENT_SPRING, lazy_pos=False):
+        # budowa grafu z bufora ParsedGraph (src/loaders.py) jednym wywołaniem konstruktora
+        label = parsed.label
+        v_labels = {v: label(l) for v, l in zip(parsed.vertices, parsed.vertex_labels) if l >= 0}
+        v_idx = None
+        if parsed.vertex_idx is not None:
+            v_idx = dict(zip(parsed.vertex_idx, parsed.vertex_idx))
+        e_idx = None
+        if parsed.edge_idx is not None:
+            e_idx = dict(zip(zip(parsed.src, parsed.dst), parsed.edge_idx))
+        e_labels = None
+        if parsed.edge_labels is not None:
+            e_labels = {(u, v): label(l) for u, v, l in zip(parsed.src, parsed.dst, parsed.edge_labels) if l >= 0}
         return cls(
-            vertices=vertices,
-            edges=edges,
+            vertices=parsed.vertices,
+            edges=zip(parsed.src, parsed.dst),
             vertex_labels=(v_labels if v_labels else None),
             edge_labels=(e_labels if e_labels else None),
             vertex_idx=(v_idx if v_idx else None),
             edge_idx=(e_idx if e_idx else None),
-            pos_like=pos_like
+            pos_like=pos_like,
+            placement=placement,
+            lazy_pos=lazy_pos
         )
 
+    @classmethod
+    def from_csv(cls, filepath: str, pos_like=None, placement=PLACEMENT_SPRING, lazy_pos=False):
+        parsed = parse_csv(filepath)
+        if parsed is None:
+            return cls(placement=placement, lazy_pos=lazy_pos)
+        return cls._from_parsed(parsed, pos_like=pos_like, placement=placement, lazy_pos=lazy_pos)
+
+    @classmethod
+    def from_obj(cls, filepath: str, pos_like=None, placement=PLACEMENT_SPRING, lazy_pos=False):
+        parsed = parse_obj(filepath)
+        if parsed is None:
+            return cls(placement=placement, lazy_pos=lazy_pos)
+        return cls._from_parsed(parsed, pos_like=pos_like, placement=placement, lazy_pos=lazy_pos)
+
     def nodes(self):
         return list(self.nx_graph.nodes())
 
     def edges(self):
         return list(self.nx_graph.edges())
 
+    def number_of_nodes(self) -> int:
+        return self.nx_graph.number_of_nodes()
+
+    def number_of_edges(self) -> int:
+        return self.nx_graph.number_of_edges()
+
+    def has_node(self, node) -> bool:
+        return self.nx_graph.has_node(node)
+
+    def next_node_id(self) -> int:
+        """Pierwszy wolny identyfikator: max(nodes()) + 1 (albo 1 dla pustego grafu)."""
+        if self._max_node is None:
+            self._max_node = max(self.nx_graph.nodes(), default=0)
+        return self._max_node + 1
+
+    def _track_max_node(self, node):
+        if self._max_node is not None and node > self._max_node:
+            self._max_node = node
+
     def has_edge(self, u, v) -> bool:
         return self.nx_graph.has_edge(u, v)
 
-    def add_node(self, node, index=None, label=None):
+    def successors(self, node):
+        return self.nx_graph.successors(node)
+
+    def predecessors(self, node):
+        return self.nx_graph.predecessors(node)
+
+    def out_degree(self, node) -> int:
+        return self.nx_graph.out_degree(node)
+
+    def in_degree(self, node) -> int:
+        return self.nx_graph.in_degree(node)
+
+    def _local_adjacency(self, nodes):
+        """
+        Dla posortowanej tablicy nodes: (istnieje, stopień wyjściowy, stopień
+        wejściowy, źródła, cele) - krawędzie tylko między wierzchołkami z nodes,
+        jako numery pozycji w nodes. Koszt O(suma stopni nodes).
+        """
+        ids = nodes.tolist()
+        position = {node: i for i, node in enumerate(ids)}
+        n = len(ids)
+        exists = np.zeros(n, dtype=bool)
+        out_deg = np.zeros(n, dtype=np.int64)
+        in_deg = np.zeros(n, dtype=np.int64)
+        src = []
+        dst = []
+        # słowniki sąsiedztwa nx.DiGraph bezpośrednio - bez widoków na każdy wierzchołek
+        succ = self.nx_graph._succ
+        pred = self.nx_graph._pred
+        for i, node in enumerate(ids):
+            out = succ.get(node)
+            if out is None:
+                continue
+            exists[i] = True
+            out_deg[i] = len(out)
+            in_deg[i] = len(pred[node])
+            for v in out:
+                j = position.get(v)
+                if j is not None:
+                    src.append(i)
+                    dst.append(j)
+        return (exists, out_deg, in_deg,
+                np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64))
+
+    # --- indeksy etykiet i stopni ----------------------------------------
+
+    def _build_indexes(self):
+        # etykieta -> wierzchołki, etykieta krawędzi -> krawędzie, stopień -> wierzchołki;
+        # potem aktualizowane w O(1) przez add_*/remove_*/set_label
+        self._label_index = {}
+        for node, label in self.vertex_labels.items():
+            if label is not None:
+                _index_add(self._label_index, label_key(label), node)
+        self._edge_label_index = {}
+        for edge, label in self.edge_labels.items():
+            if label is not None:
+                _index_add(self._edge_label_index, label_key(label), edge)
+        self._out_index = {}
+        for node, d in self.nx_graph.out_degree():
+            _index_add(self._out_index, d, node)
+        self._in_index = {}
+        for node, d in self.nx_graph.in_degree():
+            _index_add(self._in_index, d, node)
+
+    def _shift_degree(self, index, node, old: int, new: int):
+        _index_discard(index, old, node)
+        _index_add(index, new, node)
+
+    def nodes_with_label(self, label) -> list:
+        """Wierzchołki z etykietą label - O(wyniku), bez przeglądania grafu."""
+        return list(self._label_index.get(label_key(label), ()))
+
+    def count_label(self, label) -> int:
+        """Liczba wierzchołków z etykietą label - O(1)."""
+        return len(self._label_index.get(label_key(label), ()))
+
+    def label_counts(self) -> dict:
+        """Liczba wierzchołków dla każdej etykiety (klucze jak label_key)."""
+        return {key: len(nodes) for key, nodes in self._label_index.items()}
+
+    def edges_with_label(self, label) -> list:
+        """Krawędzie z etykietą label - O(wyniku)."""
+        return list(self._edge_label_index.get(label_key(label), ()))
+
+    def nodes_with_degree(self, out_degree: int | None = None, in_degree: int | None = None,
+                          at_least: bool = False) -> list:
+        """
+        Wierzchołki o danym stopniu wyjściowym i/lub wejściowym (at_least=True:
+        co najmniej takim). Koszt O(mniejszego kubełka stopnia), bez przeglądania grafu.
+        """
+        buckets = []
+        for index, d in ((self._out_index, out_degree), (self._in_index, in_degree)):
+            if d is None:
+                continue
+            if at_least:
+                buckets.append({node: None for k, bucket in index.items() if k >= d for node in bucket})
+            else:
+                buckets.append(index.get(d, {}))
+        if not buckets:
+            return self.nodes()
+        if len(buckets) == 1:
+            return list(buckets[0])
+        first, second = sorted(buckets, key=len)
+        return [node for node in first if node in second]
+
+    def add_node(self, node, index=None, label=None, pos=None):
         # wygląda że działa
-        oldVertexes = list(self.nx_graph.nodes())
-        self.nx_graph.add_node(node)
+        existed = node in self.nx_graph
+        if not existed:
+            self._register_node(node)
         if label:
-            self.vertex_labels[node] = label
-            nx.set_node_attributes(self.nx_graph, {node: label}, name="label")
+            self.set_label(node, label)
         if index:
             self.vertex_idx[node] = index
             nx.set_node_attributes(
                 self.nx_graph, {node: index}, name="index")
 
-        self.pos[node] = [0.0, 0.0]
-        self.pos = nx.spring_layout(
-            self.nx_graph, pos=self.pos, fixed=oldVertexes)
-        # spring layout oblicza pozycje wieszchołków ale mozna mu powiedzeć których ma nie ruszać wiec w ten sposób licze pozycje nowego
+        self._place_node(node, pos, existed)
+
+    def _register_node(self, node):
+        # nowy wierzchołek bez krawędzi
+        self.nx_graph.add_node(node)
+        self._track_max_node(node)
+        _index_add(self._out_index, 0, node)
+        _index_add(self._in_index, 0, node)
+
+    def _place_node(self, node, pos=None, existed=False):
+        if not self.pos_computed:
+            # układ nie był jeszcze liczony - nowy wierzchołek dostanie pozycję razem z resztą
+            return
+
+        if pos is not None:
+            self.pos[node] = list(pos)
+            return
+
+        if self.placement == PLACEMENT_LOCAL:
+            # pozycja tymczasowa, właściwą liczy relax_local() - O(stopień)
+            self.pos[node] = self._neighbour_centroid(node)
+            self._unplaced.add(node)
+            return
+
+        probe = self._instrumentation()
+        with probe.phase("layout"):
+            layout_graph = self._layout_graph()
+            oldVertexes = [n for n in layout_graph.nodes() if n != node or existed]
+            self.pos[node] = [0.0, 0.0]
+            self.pos, iterations = self._run_layout(layout_graph, pos=dict(self.pos), fixed=oldVertexes)
+            # spring layout oblicza pozycje wieszchołków ale mozna mu powiedzeć których ma nie ruszać wiec w ten sposób licze pozycje nowego
+        probe.count("layout_iterations", iterations)
+
+    def _neighbour_centroid(self, node, skip=()):
+        xs = []
+        ys = []
+        for nb in chain(self.successors(node), self.predecessors(node)):
+            if nb in self.pos and nb not in skip and nb != node:
+                xs.append(self.pos[nb][0])
+                ys.append(self.pos[nb][1])
+        if not xs:
+            return [0.0, 0.0]
+        return [sum(xs) / len(xs), sum(ys) / len(ys)]
+
+    def _local_edge_length(self, moving, samples: int = 64) -> float:
+        # typowa długość krawędzi w otoczeniu - próbkujemy tylko kilka krawędzi
+        lengths = []
+        for node in moving:
+            for nb in chain(self.successors(node), self.predecessors(node)):
+                if nb in moving or nb not in self.pos:
+                    continue
+                for other in chain(self.successors(nb), self.predecessors(nb)):
+                    if other in moving or other == nb or other not in self.pos:
+                        continue
+                    lengths.append(math.dist(self.pos[nb], self.pos[other]))
+                    if len(lengths) >= samples:
+                        return sum(lengths) / len(lengths)
+                    break
+        if not lengths:
+            return 0.1
+        return sum(lengths) / len(lengths)
+
+    def relax_local(self, nodes=None, iterations: int = 10, spacing: float | None = None):
+        """
+        Lokalne rozmieszczenie wierzchołków z PLACEMENT_LOCAL (albo podanych), O(suma stopni * iterations).
+        Pozostałe pozycje się nie zmieniają.
+        """
+        if nodes is None:
+            nodes = self._unplaced
+        nodes = [n for n in nodes if self.has_node(n)]
+        self._unplaced = set()
+        if not nodes or not self.pos_computed:
+            return
+        probe = self._instrumentation()
+        with probe.phase("relax_local"):
+            self._relax(nodes, iterations, spacing)
+        probe.count("layout_iterations", iterations)
+        probe.count("nodes_relaxed", len(nodes))
+
+    def _relax(self, nodes, iterations, spacing):
+        moving = set(nodes)
+        if spacing is None:
+            spacing = self._local_edge_length(moving)
+        # punkt startowy: środek już rozmieszczonych sąsiadów, rozsunięty po okręgu
+        # żeby wierzchołki z tym samym sąsiedztwem nie nakładały się
+        for i, node in enumerate(sorted(moving)):
+            cx, cy = self._neighbour_centroid(node, skip=moving)
+            angle = 2 * math.pi * i / len(moving)
+            self.pos[node] = [cx + spacing * math.cos(angle),
+                              cy + spacing * math.sin(angle)]
+
+        for _ in range(iterations):
+            new_pos = {}
+            for node in moving:
+                x, y = self.pos[node]
+                neighbours = set(self.successors(node))
+                neighbours.update(self.predecessors(node))
+                neighbours.discard(node)
+                fx = 0.0
+                fy = 0.0
+                for nb in neighbours:
+                    if nb not in self.pos:
+                        continue
+                    dx = self.pos[nb][0] - x
+                    dy = self.pos[nb][1] - y
+                    dist = math.hypot(dx, dy) or 1e-9
+                    # sprężyna o długości spoczynkowej `spacing`
+                    f = (dist - spacing) / dist
+                    fx += f * dx
+                    fy += f * dy
+                if neighbours:
+                    fx /= len(neighbours)
+                    fy /= len(neighbours)
+                new_pos[node] = [x + 0.5 * fx, y + 0.5 * fy]
+            self.pos.update(new_pos)
+
+    def copy_structure(self):
+        """
+        Kopia wierzchołków, krawędzi, etykiet wierzchołków i pozycji
+        (bez indeksów i etykiet krawędzi) - punkt wyjścia dla Production.apply.
+        """
+        labels = {n: lbl for n, lbl in self.vertex_labels.items()
+                  if lbl is not None}
+        copy = type(self)(vertices=self.nodes(), edges=self.edges(),
+                          vertex_labels=(labels if labels else None),
+                          pos=(self.pos.copy() if self.pos_computed else None),
+                          placement=self.placement, lazy_pos=not self.pos_computed)
+        copy.instrumentation = self.instrumentation
+        return copy
+
+    def save_snapshot(self, path: str):
+        """Zapis binarny (katalog .npy + labels.pkl + meta.json), patrz src/snapshot.py."""
+        from .snapshot import save_snapshot
+        save_snapshot(self, path)
+
+    @classmethod
+    def load_snapshot(cls, path: str, mmap: bool = True):
+        """Wczytuje zrzut z save_snapshot bez parsowania; Graph dostaje kopię niezależną od plików."""
+        from .snapshot import load_snapshot
+        graph = load_snapshot(path, mmap=mmap)
+        pos = None
+        if graph.pos_computed:
+            # kopia jako listy - wiersze zmapowanej tablicy wiązałyby graf z plikiem zrzutu
+            pos = {n: [float(c) for c in graph.pos[n]] for n in graph.nodes()}
+        return cls(vertices=graph.nodes(), edges=graph.edges(),
+                   vertex_labels=dict(graph.vertex_labels) or None,
+                   edge_labels=dict(graph.edge_labels) or None,
+                   vertex_idx={n: int(i) for n, i in graph.vertex_idx.items()} or None,
+                   edge_idx={e: int(i) for e, i in graph.edge_idx.items()} or None,
+                   pos=pos, placement=graph.placement, lazy_pos=not graph.pos_computed)
 
     def add_edge(self, u, v, index=None, label=None):
-        self.nx_graph.add_edge(u, v)
+        for node in (u, v):
+            if node not in self.nx_graph:
+                self._register_node(node)
+        if not self.nx_graph.has_edge(u, v):
+            d_out = self.nx_graph.out_degree(u)
+            d_in = self.nx_graph.in_degree(v)
+            self.nx_graph.add_edge(u, v)
+            self._shift_degree(self._out_index, u, d_out, d_out + 1)
+            self._shift_degree(self._in_index, v, d_in, d_in + 1)
         if label:
-            self.edge_labels[u][v] = label
-            nx.set_node_attributes(
-                self.nx_graph, {(u, v): label}, name="label")
+            self._drop_edge_label((u, v))
+            self.edge_labels[(u, v)] = label
+            _index_add(self._edge_label_index, label_key(label), (u, v))
         if index:
             self.edge_idx[(u, v)] = index
             nx.set_edge_attributes(
                 self.nx_graph, {(u, v): index}, name="index")
 
+    def _drop_edge_label(self, edge):
+        label = self.edge_labels.pop(edge, None)
+        if label is not None:
+            _index_discard(self._edge_label_index, label_key(label), edge)
+
     def remove_node(self, node):
-        self.nx_graph.remove_node(node)
-        if node in self.vertex_labels:
-            del self.vertex_labels[node]
-            # del self.vertex_idx[node]
-        self.pos.pop(node)
+        graph = self.nx_graph
+        for v in graph.successors(node):
+            self._drop_edge_label((node, v))
+            if v != node:
+                d = graph.in_degree(v)
+                self._shift_degree(self._in_index, v, d, d - 1)
+        for u in graph.predecessors(node):
+            if u != node:
+                self._drop_edge_label((u, node))
+                d = graph.out_degree(u)
+                self._shift_degree(self._out_index, u, d, d - 1)
+        _index_discard(self._out_index, graph.out_degree(node), node)
+        _index_discard(self._in_index, graph.in_degree(node), node)
+        graph.remove_node(node)
+        self._unplaced.discard(node)
+        if node == self._max_node:
+            self._max_node = None
+        self.set_label(node, None)
+        # del self.vertex_idx[node]
+        if self.pos_computed:
+            self._pos.pop(node)
 
     def remove_edge(self, u, v):
         self.nx_graph.remove_edge(u, v)
-        if (u, v) in self.edge_labels:
-            del self.edge_labels[(u, v)]
-            # del self.edge_idx[(u, v)]
+        d_out = self.nx_graph.out_degree(u)
+        d_in = self.nx_graph.in_degree(v)
+        self._shift_degree(self._out_index, u, d_out + 1, d_out)
+        self._shift_degree(self._in_index, v, d_in + 1, d_in)
+        self._drop_edge_label((u, v))
+        # del self.edge_idx[(u, v)]
 
     def get_labels(self, node):
         return self.vertex_labels.get(node)
 
     def set_label(self, node, label: str):
-        self.vertex_labels[node] = label
-        nx.set_node_attributes(self.nx_graph, {node: label}, name="label")
+        """Ustawia etykietę wierzchołka (None usuwa etykietę)."""
+        old = self.vertex_labels.pop(node, None)
+        if old is not None:
+            _index_discard(self._label_index, label_key(old), node)
+        if label is not None:
+            self.vertex_labels[node] = label
+            _index_add(self._label_index, label_key(label), node)
 
     def get_idx(self, node):
         return self.vertex_idx.get(node)
@@ -220,74 +582,14 @@ class Graph:
         nx.set_node_attributes(self.nx_graph, {node: index}, name="index")
 
     def draw(self, title: str | None = None, offset=(0, 0), color='#99ccff', ax=None):
-        pos = {k: [self.pos[k][0] + offset[0], self.pos[k][1] + offset[1]]
-               for k in self.pos.keys()}
-
-        # indeksy
-        node_indices = {}
-        for node in self.nx_graph.nodes():
-            idx = self.vertex_idx.get(node)
-            node_indices[node] = str(idx) if idx is not None else str(node)
-
-        nx.draw_networkx_nodes(
-            self.nx_graph, pos, node_color=color, node_size=300, ax=ax)
-        nx.draw_networkx_labels(
-            self.nx_graph, pos, labels=node_indices, font_size=9, ax=ax)
-
-        # krawędzie
-        nx.draw_networkx_edges(self.nx_graph, pos, arrows=True, ax=ax)
-
-        # wierzchołki - etykiety w ramkach
-        if self.vertex_labels:
-            for node, (x, y) in pos.items():
-                lbl = self.vertex_labels.get(node)
-                if lbl:
-                    # Rysowanie tekstu z ramką (bbox)
-                    plt.text(x, y + 0.12, s=str(lbl),
-                             bbox=dict(facecolor='white', edgecolor='gray',
-                                       boxstyle='round,pad=0.2', alpha=0.8),
-                             horizontalalignment='center', fontsize=8, color='black', zorder=10)
-
-        # krawędzie - indeksy i etykiety w ramkach
-        edge_indices_to_draw = {}
-        for u, v in self.nx_graph.edges():
-
-            e_idx = self.edge_idx.get((u, v))
-            if e_idx is not None:
-                edge_indices_to_draw[(u, v)] = f"[{e_idx}]"
-
-            e_lbl = self.edge_labels.get((u, v))
-            if e_lbl:
-                (x0, y0) = pos[u]
-                (x1, y1) = pos[v]
-
-                mid_x = (x0 + x1) / 2
-                mid_y = (y0 + y1) / 2
-
-                plt.text(mid_x, mid_y + 0.08, s=str(e_lbl),
-                         bbox=dict(facecolor='white', edgecolor='gray',
-                                   boxstyle='round,pad=0.2', alpha=0.8),
-                         horizontalalignment='center', verticalalignment='center',
-                         fontsize=7, color='black', zorder=15)
-
-        if edge_indices_to_draw:
-            nx.draw_networkx_edge_labels(
-                self.nx_graph, pos,
-                edge_labels=edge_indices_to_draw,
-                font_size=8,
-                # Tło dla indeksu: przezroczyste lub lekko białe, bez ramki
-                bbox=dict(facecolor='white', edgecolor='none', alpha=1.0),
-                ax=ax
-            )
-
-        # ewentualny tytuł
-        if title:
-            xs = [p[0] for p in pos.values()]
-            if xs:
-                center_x = sum(xs) / len(xs)
-                max_y = max([p[1] for p in pos.values()])
-                plt.text(center_x, max_y + 0.4, title, fontsize=12,
-                         fontweight='bold', ha='center')
-
-        plt.axis('off')
-        return pos
+        """
+        Rysuje graf na ax (domyślnie bieżące osie pyplot) przez src/render.py:
+        kolekcje zamiast osobnego obiektu na każdy element, podpisy tylko dla małych grafów.
+        Zwraca pozycje wierzchołków z przesunięciem offset.
+        """
+        # matplotlib dopiero przy pierwszym rysowaniu - import src jest bez niego szybki
+        from .render import render_graph
+        if ax is None:
+            import matplotlib.pyplot as plt
+            ax = plt.gca()
+        return render_graph(self, ax, title=title, offset=offset, color=color)
@@ -0,0 +1,279 @@
+from bisect import bisect_right
+from .graph import Graph
+from .transaction import UndoLog
+
+
+def _state_at(hist, version: int):
+    # hist = (wersje, stany) - stan obowiązujący w danej wersji
+    versions, states = hist
+    return states[bisect_right(versions, version) - 1]
+
+
+class GraphHistory:
+    """
+    Wszystkie wersje grafu z kolejnych Production.apply, bez kopiowania grafu.
+    Pozycje niezmienionych wierzchołków są wspólne dla wszystkich wersji.
+    """
+
+    def __init__(self, graph: Graph, transform_positions: bool = True):
+        self.graph = graph
+        self.transform_positions = transform_positions
+        self.titles = [None]
+        # wierzchołek -> ([wersje], [(etykieta, indeks, pozycja) albo None])
+        self._node_hist = {}
+        # krawędź -> ([wersje], [(etykieta, indeks) albo None])
+        self._edge_hist = {}
+        # krawędzie z historią według końców - do sąsiedztwa w starych wersjach
+        self._hist_succ = {}
+        self._hist_pred = {}
+        self._n_nodes = [graph.number_of_nodes()]
+        self._n_edges = [graph.number_of_edges()]
+
+    def __len__(self):
+        return len(self._n_nodes)
+
+    @property
+    def head(self) -> int:
+        return len(self._n_nodes) - 1
+
+    def version(self, k: int) -> "GraphVersion":
+        """Widok (tylko do odczytu) grafu po k krokach; ujemne k liczone od końca."""
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError(f"Brak wersji {k} (dostępne 0..{self.head})")
+        return GraphVersion(self, k)
+
+    def __getitem__(self, k: int) -> "GraphVersion":
+        return self.version(k)
+
+    def apply(self, production, mapping, title: str | None = None) -> "GraphVersion":
+        """Stosuje produkcję w miejscu i zapisuje nową wersję."""
+        log = UndoLog(self.graph)
+        production.apply(self.graph, mapping, transform_positions=self.transform_positions,
+                         inplace=True, undo_log=log)
+        return self.record(log, title=title)
+
+    def record(self, log: UndoLog, title: str | None = None) -> "GraphVersion":
+        """
+        Zapisuje jako nową wersję zmiany wykonane na self.graph przez log
+        (np. przez własny kod stosujący produkcje w miejscu). Czyści log.
+        """
+        G = self.graph
+        version = len(self._n_nodes)
+        # stan sprzed kroku: dla każdego pola liczy się pierwszy wpis w dzienniku,
+        # pól bez wpisu krok nie zmienił, więc są brane z grafu
+        first = {}
+        before_edges = {}
+        for op in log.ops:
+            kind = op[0]
+            if kind == "add_node":
+                first.setdefault(op[1], {}).setdefault("absent", True)
+            elif kind == "add_edge":
+                before_edges.setdefault((op[1], op[2]), None)
+            elif kind in ("remove_edge", "set_edge"):
+                before_edges.setdefault((op[1], op[2]), op[3])
+            elif kind == "remove_node":
+                _, node, label, idx, pos, edges = op
+                fields = first.setdefault(node, {})
+                fields.setdefault("absent", False)
+                fields.setdefault("label", label)
+                fields.setdefault("idx", idx)
+                fields.setdefault("pos", _pos_tuple(pos))
+                for u, v, attrs in edges:
+                    before_edges.setdefault((u, v), attrs)
+            elif kind == "set_label":
+                fields = first.setdefault(op[1], {})
+                fields.setdefault("absent", False)
+                fields.setdefault("label", op[2])
+            elif kind == "set_pos":
+                fields = first.setdefault(op[1], {})
+                fields.setdefault("absent", False)
+                fields.setdefault("pos", _pos_tuple(op[2]))
+        before_nodes = {}
+        for node, fields in first.items():
+            if fields["absent"]:
+                before_nodes[node] = None
+            else:
+                before_nodes[node] = (fields["label"] if "label" in fields else G.get_labels(node),
+                                      fields["idx"] if "idx" in fields else G.get_idx(node),
+                                      fields["pos"] if "pos" in fields else self._head_pos(node))
+
+        d_nodes = 0
+        for node, before in before_nodes.items():
+            after = self._head_node_state(node)
+            d_nodes += (after is not None) - (before is not None)
+            self._push(self._node_hist, node, before, after, version)
+        d_edges = 0
+        for edge, before in before_edges.items():
+            after = self._head_edge_state(edge)
+            d_edges += (after is not None) - (before is not None)
+            if self._push(self._edge_hist, edge, before, after, version):
+                u, v = edge
+                self._hist_succ.setdefault(u, {})[v] = None
+                self._hist_pred.setdefault(v, {})[u] = None
+        log.commit()
+
+        self._n_nodes.append(self._n_nodes[-1] + d_nodes)
+        self._n_edges.append(self._n_edges[-1] + d_edges)
+        self.titles.append(title)
+        return GraphVersion(self, version)
+
+    @staticmethod
+    def _push(history, key, before, after, version) -> bool:
+        # dopisuje stan elementu; zwraca True, jeśli element dostał nową historię
+        hist = history.get(key)
+        if hist is None:
+            history[key] = ([0, version], [before, after])
+            return True
+        versions, states = hist
+        if versions[-1] == version:
+            states[-1] = after
+        else:
+            versions.append(version)
+            states.append(after)
+        return False
+
+    def _head_pos(self, node):
+        G = self.graph
+        if not G.pos_computed or node not in G.pos:
+            return None
+        return _pos_tuple(G.pos[node])
+
+    def _head_node_state(self, node):
+        G = self.graph
+        if not G.has_node(node):
+            return None
+        return (G.get_labels(node), G.get_idx(node), self._head_pos(node))
+
+    def _head_edge_state(self, edge):
+        G = self.graph
+        if not G.has_edge(*edge):
+            return None
+        return (G.edge_labels.get(edge), G.edge_idx.get(edge))
+
+
+def _pos_tuple(pos):
+    return None if pos is None else (float(pos[0]), float(pos[1]))
+
+
+class GraphVersion:
+    """
+    Wersja grafu z GraphHistory - API do odczytu jak w Graph (nodes, edges,
+    successors, etykiety, pozycje...). to_graph() buduje z niej zwykły Graph.
+    """
+
+    def __init__(self, history: GraphHistory, version: int):
+        self.history = history
+        self.version = version
+
+    def __repr__(self):
+        return f"GraphVersion({self.version}, nodes={self.number_of_nodes()}, edges={self.number_of_edges()})"
+
+    @property
+    def title(self):
+        return self.history.titles[self.version]
+
+    def _node_state(self, node):
+        h = self.history
+        hist = h._node_hist.get(node)
+        if hist is not None:
+            return _state_at(hist, self.version)
+        return h._head_node_state(node)
+
+    def _edge_state(self, edge):
+        h = self.history
+        hist = h._edge_hist.get(edge)
+        if hist is not None:
+            return _state_at(hist, self.version)
+        return h._head_edge_state(edge)
+
+    def number_of_nodes(self) -> int:
+        return self.history._n_nodes[self.version]
+
+    def number_of_edges(self) -> int:
+        return self.history._n_edges[self.version]
+
+    def has_node(self, node) -> bool:
+        return self._node_state(node) is not None
+
+    def has_edge(self, u, v) -> bool:
+        return self._edge_state((u, v)) is not None
+
+    def nodes(self):
+        h = self.history
+        nodes = [n for n in h.graph.nodes() if n not in h._node_hist]
+        nodes.extend(n for n, hist in h._node_hist.items() if _state_at(hist, self.version) is not None)
+        return nodes
+
+    def edges(self):
+        h = self.history
+        edges = [e for e in h.graph.edges() if e not in h._edge_hist]
+        edges.extend(e for e, hist in h._edge_hist.items() if _state_at(hist, self.version) is not None)
+        return edges
+
+    def _neighbours(self, node, head_neighbours, hist_neighbours, edge):
+        h = self.history
+        result = []
+        if h.graph.has_node(node):
+            result = [w for w in head_neighbours(node) if edge(w) not in h._edge_hist]
+        for w in hist_neighbours.get(node, ()):
+            if _state_at(h._edge_hist[edge(w)], self.version) is not None:
+                result.append(w)
+        return result
+
+    def successors(self, node):
+        return self._neighbours(node, self.history.graph.successors, self.history._hist_succ,
+                                lambda w: (node, w))
+
+    def predecessors(self, node):
+        return self._neighbours(node, self.history.graph.predecessors, self.history._hist_pred,
+                                lambda w: (w, node))
+
+    def out_degree(self, node) -> int:
+        return len(self.successors(node))
+
+    def in_degree(self, node) -> int:
+        return len(self.predecessors(node))
+
+    def get_labels(self, node):
+        state = self._node_state(node)
+        return None if state is None else state[0]
+
+    def get_idx(self, node):
+        state = self._node_state(node)
+        return None if state is None else state[1]
+
+    def get_pos(self, node):
+        state = self._node_state(node)
+        return None if state is None else state[2]
+
+    def edge_label(self, u, v):
+        state = self._edge_state((u, v))
+        return None if state is None else state[0]
+
+    @property
+    def pos(self) -> dict:
+        return {n: p for n in self.nodes() if (p := self.get_pos(n)) is not None}
+
+    def to_graph(self, cls=None) -> Graph:
+        """Zwykły graf (kopia) tej wersji - np. do rysowania albo dalszych przekształceń."""
+        G = self.history.graph
+        cls = cls or type(G)
+        nodes = self.nodes()
+        edges = self.edges()
+        states = {n: self._node_state(n) for n in nodes}
+        edge_states = {e: self._edge_state(e) for e in edges}
+        labels = {n: s[0] for n, s in states.items() if s[0] is not None}
+        idx = {n: s[1] for n, s in states.items() if s[1] is not None}
+        edge_labels = {e: s[0] for e, s in edge_states.items() if s[0] is not None}
+        edge_idx = {e: s[1] for e, s in edge_states.items() if s[1] is not None}
+        pos = {n: list(s[2]) for n, s in states.items() if s[2] is not None}
+        return cls(vertices=nodes, edges=edges,
+                   vertex_labels=labels or None, edge_labels=edge_labels or None,
+                   vertex_idx=idx or None, edge_idx=edge_idx or None,
+                   pos=(pos if G.pos_computed else None),
+                   placement=G.placement, lazy_pos=not G.pos_computed)
+
+    def draw(self, title: str | None = None, **kwargs):
+        return self.to_graph().draw(title=title if title is not None else self.title, **kwargs)
@@ -0,0 +1,130 @@
+import json
+import time
+
+
+class _Phase:
+    # mierzy czas jednej fazy (with probe.phase("nazwa"): ...)
+    __slots__ = ("probe", "name", "start")
+
+    def __init__(self, probe, name):
+        self.probe = probe
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.probe.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Instrumentation:
+    """
+    Czasy faz i liczniki zbierane przez Production/Graph po włączeniu
+    (enable_instrumentation). Hooki add_hook(fn) dostają każde zdarzenie
+    jako fn(rodzaj, nazwa, wartość), gdzie rodzaj to "phase" (sekundy) albo "count".
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.phases = {}    # nazwa -> [liczba wywołań, łączny czas, najdłuższy]
+        self.counters = {}
+        self.hooks = []
+
+    def phase(self, name: str) -> _Phase:
+        return _Phase(self, name)
+
+    def add_time(self, name: str, seconds: float):
+        entry = self.phases.get(name)
+        if entry is None:
+            self.phases[name] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+        for hook in self.hooks:
+            hook("phase", name, seconds)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+        for hook in self.hooks:
+            hook("count", name, n)
+
+    def timed_iter(self, name: str, iterable):
+        """Przepuszcza iterable, doliczając do fazy name czas spędzony w next()."""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(name, time.perf_counter() - start)
+                return
+            self.add_time(name, time.perf_counter() - start)
+            yield item
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def reset(self):
+        self.phases.clear()
+        self.counters.clear()
+
+    def to_dict(self) -> dict:
+        return {
+            "phases": {name: {"calls": calls, "total": total, "max": longest,
+                              "mean": total / calls}
+                       for name, (calls, total, longest) in self.phases.items()},
+            "counters": dict(self.counters),
+        }
+
+    def dump(self, path: str):
+        """Zapisuje zebrane statystyki do pliku JSON."""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    def report(self) -> str:
+        lines = [f"{'faza':<20} {'wywołania':>10} {'razem ms':>12} {'max ms':>10}"]
+        for name, (calls, total, longest) in sorted(self.phases.items(), key=lambda x: -x[1][1]):
+            lines.append(f"{name:<20} {calls:>10} {total * 1000:12.3f} {longest * 1000:10.3f}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:<20} {value:>10}")
+        return "\n".join(lines)
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _NullInstrumentation:
+    # używane, gdy instrumentacja jest wyłączona - metody nic nie robią
+    enabled = False
+    _phase = _NullPhase()
+
+    def phase(self, name):
+        return self._phase
+
+    def add_time(self, name, seconds):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+    def timed_iter(self, name, iterable):
+        return iterable
+
+
+NULL_INSTRUMENTATION = _NullInstrumentation()
@@ -0,0 +1,329 @@
+import math
+import numpy as np
+
+# silniki układu dla Graph.layout_engine
+LAYOUT_SPRING = "spring"  # nx.spring_layout (dokładny, O(n^2) na iterację)
+LAYOUT_FORCE = "force"    # force_layout: Barnes-Hut + wielopoziomowy, numpy
+LAYOUT_AUTO = "auto"      # spring dla małych grafów, force dla dużych
+# powyżej tylu wierzchołków LAYOUT_AUTO wybiera force_layout
+# (nx.spring_layout przechodzi wtedy na wersję rzadką, która wymaga scipy)
+AUTO_FORCE_NODES = 500
+
+FORCE_ITERATIONS = 50
+# iteracje na każdym drobniejszym poziomie (układ startowy jest już z grubszego);
+# poziomy większe niż REFINE_FULL_NODES dostają ich proporcjonalnie mniej (~1/sqrt),
+# ale nie mniej niż REFINE_MIN_ITERATIONS
+REFINE_ITERATIONS = 15
+REFINE_FULL_NODES = 10 ** 4
+REFINE_MIN_ITERATIONS = 5
+# poniżej tylu wierzchołków graf nie jest już zgrubiany
+COARSEST_NODES = 64
+# średnia liczba wierzchołków w liściu drzewa czwórkowego
+LEAF_SIZE = 4
+# ile wierzchołków naraz liczy siły odpychania (ogranicza pamięć)
+_CHUNK = 1 << 14
+
+# komórki oddziałujące przez środek masy: dzieci sąsiadów rodzica, które nie
+# sąsiadują z komórką wierzchołka (jak lista interakcji w FMM)
+# (27 przesunięć względem lewego dolnego dziecka rodzica, osobno dla parzystości komórki)
+_FAR = np.array([[[(a, b) for a in range(-2, 4) for b in range(-2, 4)
+                   if abs(a - px) > 1 or abs(b - py) > 1]
+                  for py in range(2)] for px in range(2)], dtype=np.int64)
+_NEAR = np.array([(a, b) for a in range(-1, 2) for b in range(-1, 2)], dtype=np.int64)
+
+
+def _occupancy(cell, levels: int) -> float:
+    # średnia (po punktach) liczba punktów w liściu danego punktu
+    ids = cell[:, 0] * (1 << levels) + cell[:, 1]
+    count = np.bincount(ids).astype(float)
+    return float((count * count).sum()) / max(len(cell), 1)
+
+
+class _QuadTree:
+    """Drzewo czwórkowe o stałej głębokości (masy i środki mas komórek, Barnes-Hut)."""
+
+    def __init__(self, xy, leaf: int = LEAF_SIZE):
+        self.xy = xy
+        n = len(xy)
+        self.lo = xy.min(axis=0)
+        span = float((xy.max(axis=0) - self.lo).max())
+        if not span > 0:
+            span = 1.0
+        self.size = span * (1 + 1e-9)
+        # odległość minimalna - pokrywające się punkty nie dają nieskończonej siły
+        self.min_d2 = (1e-3 * span / math.sqrt(n)) ** 2
+        levels = 0
+        while levels < 15 and n > leaf * 4 ** levels:
+            levels += 1
+        self.levels = levels
+        cell = self._cells(xy)
+        # skupione punkty (np. układ grafu losowego) przepełniają liście drzewa
+        # dobranego do równomiernego rozkładu: pogłębiamy, aż średnia liczba
+        # punktów w liściu widziana przez punkt (koszt _near) spadnie do ~leaf
+        while self.levels < 15 and _occupancy(cell, self.levels) > 2 * leaf:
+            self.levels += 1
+            cell = self._cells(xy)
+        levels = self.levels
+
+        self.mass = {}
+        self.centroid = {}
+        for level in range(2, levels + 1):
+            side = 1 << level
+            c = cell >> (levels - level)
+            ids = c[:, 0] * side + c[:, 1]
+            mass = np.bincount(ids, minlength=side * side).astype(float)
+            sx = np.bincount(ids, weights=xy[:, 0], minlength=side * side)
+            sy = np.bincount(ids, weights=xy[:, 1], minlength=side * side)
+            self.mass[level] = mass
+            self.centroid[level] = np.stack([sx, sy], axis=1) / np.maximum(mass, 1)[:, None]
+
+        side = 1 << levels
+        ids = cell[:, 0] * side + cell[:, 1]
+        self.order = np.argsort(ids, kind="stable")
+        self.count = np.bincount(ids, minlength=side * side)
+        self.start = np.cumsum(self.count) - self.count
+
+    def _cells(self, pts):
+        side = 1 << self.levels
+        c = np.floor((pts - self.lo) / self.size * side).astype(np.int64)
+        return np.clip(c, 0, side - 1)
+
+    def repulsion(self, pts, self_idx=None):
+        """
+        Suma wektorów delta/|delta|^2 od wszystkich punktów drzewa dla każdego z pts.
+        self_idx[i] to numer punktu drzewa równego pts[i] (pomijany) albo -1.
+        """
+        cell = self._cells(pts)
+        out = np.zeros_like(pts)
+        # pole od komórek grubego poziomu jest gładkie w obrębie komórki o 2 poziomy
+        # drobniejszej - liczone raz na taką komórkę (w jej środku, z poprawką
+        # pierwszego rzędu), a nie dla każdego punktu osobno
+        coarse = range(2, self.levels - 1)
+        for level in coarse:
+            self._far_by_cell(pts, cell, level, out)
+        fine = range(max(2, self.levels - 1), self.levels + 1)
+        for s in range(0, len(pts), _CHUNK):
+            p = pts[s:s + _CHUNK]
+            c = cell[s:s + _CHUNK]
+            idx = self_idx[s:s + _CHUNK] if self_idx is not None else None
+            for level in fine:
+                out[s:s + _CHUNK] += self._far(p, c >> (self.levels - level), level)[0]
+            out[s:s + _CHUNK] += self._near(p, c, idx)
+        return out
+
+    def _far_by_cell(self, pts, cell, level, out):
+        target = level + 2
+        side = 1 << target
+        c = cell >> (self.levels - target)
+        ids, inverse = np.unique(c[:, 0] * side + c[:, 1], return_inverse=True)
+        inverse = inverse.ravel()
+        tc = np.stack([ids // side, ids % side], axis=1)
+        center = self.lo + (tc + 0.5) * (self.size / side)
+        F = np.empty((len(ids), 2))
+        J = np.empty((len(ids), 3))
+        for s in range(0, len(ids), _CHUNK):
+            F[s:s + _CHUNK], J[s:s + _CHUNK] = self._far(center[s:s + _CHUNK], tc[s:s + _CHUNK] >> 2,
+                                                          level, jacobian=True)
+        d = pts - center[inverse]
+        Jp = J[inverse]
+        out[:, 0] += F[inverse, 0] + Jp[:, 0] * d[:, 0] + Jp[:, 1] * d[:, 1]
+        out[:, 1] += F[inverse, 1] + Jp[:, 1] * d[:, 0] + Jp[:, 2] * d[:, 1]
+
+    def _far(self, p, c, level, jacobian: bool = False):
+        # pole od komórek poziomu level dalekich od komórki c (współrzędne na tym poziomie);
+        # z jacobian=True także pochodne (xx, xy, yy) do przesunięcia punktu obliczeń
+        side = 1 << level
+        px = p[:, 0:1]
+        py = p[:, 1:2]
+        offsets = _FAR[c[:, 0] & 1, c[:, 1] & 1]
+        qx = (c[:, 0:1] >> 1) * 2 + offsets[:, :, 0]
+        qy = (c[:, 1:2] >> 1) * 2 + offsets[:, :, 1]
+        ok = (qx >= 0) & (qx < side) & (qy >= 0) & (qy < side)
+        ids = np.where(ok, qx * side + qy, 0)
+        centroid = self.centroid[level]
+        dx = px - centroid[ids, 0]
+        dy = py - centroid[ids, 1]
+        r2 = np.maximum(dx * dx + dy * dy, self.min_d2)
+        w = np.where(ok, self.mass[level][ids], 0.0) / r2
+        F = np.stack([(dx * w).sum(axis=1), (dy * w).sum(axis=1)], axis=1)
+        if not jacobian:
+            return F, None
+        # d/dx (dx/r^2) = 1/r^2 - 2 dx^2/r^4 itd.
+        w2 = 2 * w / r2
+        J = np.stack([(w - w2 * dx * dx).sum(axis=1), -(w2 * dx * dy).sum(axis=1),
+                      (w - w2 * dy * dy).sum(axis=1)], axis=1)
+        return F, J
+
+    def _near(self, p, cell, self_idx):
+        side = 1 << self.levels
+        t = len(p)
+        qx = cell[:, 0:1] + _NEAR[:, 0]
+        qy = cell[:, 1:2] + _NEAR[:, 1]
+        ok = (qx >= 0) & (qx < side) & (qy >= 0) & (qy < side)
+        ids = np.where(ok, qx * side + qy, 0)
+        counts = np.where(ok, self.count[ids], 0).ravel()
+        starts = self.start[ids].ravel()
+        total = int(counts.sum())
+        owner = np.repeat(np.repeat(np.arange(t), len(_NEAR)), counts)
+        offset = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        j = self.order[offset + np.arange(total)]
+        dx = p[owner, 0] - self.xy[j, 0]
+        dy = p[owner, 1] - self.xy[j, 1]
+        w = 1.0 / np.maximum(dx * dx + dy * dy, self.min_d2)
+        if self_idx is not None:
+            w[j == self_idx[owner]] = 0.0
+        return np.stack([np.bincount(owner, weights=dx * w, minlength=t),
+                         np.bincount(owner, weights=dy * w, minlength=t)], axis=1)
+
+
+def _refine(xy, E, movable, iterations: int, t0: float, k: float):
+    """Fruchterman-Reingold z odpychaniem przez _QuadTree; ruszają się tylko movable."""
+    n = len(xy)
+    mov = np.flatnonzero(movable)
+    if not len(mov) or iterations <= 0:
+        return xy
+    k2 = k * k
+    # przy kilku ruchomych wierzchołkach drzewo nieruchomych budujemy raz
+    static = _QuadTree(xy[~movable]) if len(mov) < n // 4 else None
+    own = np.arange(len(mov))
+    E = E[movable[E[:, 0]] | movable[E[:, 1]]]
+    t = t0
+    dt = t0 / (iterations + 1)
+    for _ in range(iterations):
+        if static is not None:
+            rep = static.repulsion(xy[mov]) + _QuadTree(xy[mov]).repulsion(xy[mov], own)
+        else:
+            rep = _QuadTree(xy).repulsion(xy[mov], mov)
+        disp = np.zeros((n, 2))
+        disp[mov] = rep * k2
+        if len(E):
+            delta = xy[E[:, 0]] - xy[E[:, 1]]
+            dist = np.sqrt((delta ** 2).sum(axis=1))
+            a = delta * (dist / k)[:, None]
+            for axis in (0, 1):
+                disp[:, axis] -= np.bincount(E[:, 0], weights=a[:, axis], minlength=n)
+                disp[:, axis] += np.bincount(E[:, 1], weights=a[:, axis], minlength=n)
+        d = disp[mov]
+        length = np.maximum(np.sqrt((d ** 2).sum(axis=1)), 1e-12)
+        xy[mov] += d * (np.minimum(length, t) / length)[:, None]
+        t -= dt
+    return xy
+
+
+def _undirected(E):
+    # krawędzie bez kierunku, pętli i powtórzeń - do sił przyciągania
+    E = E[E[:, 0] != E[:, 1]]
+    if not len(E):
+        return E.reshape(0, 2)
+    return np.unique(np.sort(E, axis=1), axis=0)
+
+
+def _coarsen(n: int, E, rng, rounds: int = 4):
+    """
+    Skojarzenie krawędzi (lokalnie najcięższa krawędź o losowej wadze, jak
+    w algorytmie Luby'ego) i sklejenie skojarzonych par. Zwraca (rodzic, liczba).
+    """
+    match = np.full(n, -1, dtype=np.int64)
+    if len(E):
+        w = rng.random(len(E))
+        src = np.concatenate([E[:, 0], E[:, 1]])
+        dst = np.concatenate([E[:, 1], E[:, 0]])
+        weight = np.concatenate([w, w])
+        for _ in range(rounds):
+            free = (match[src] < 0) & (match[dst] < 0)
+            if not free.any():
+                break
+            s, d, wt = src[free], dst[free], weight[free]
+            # dla każdego wierzchołka krawędź o największej wadze
+            order = np.lexsort((wt, s))
+            last = np.ones(len(order), dtype=bool)
+            last[:-1] = s[order][1:] != s[order][:-1]
+            best = order[last]
+            proposal = np.full(n, -1, dtype=np.int64)
+            proposal[s[best]] = d[best]
+            u = s[best]
+            mutual = proposal[proposal[u]] == u
+            match[u[mutual]] = proposal[u[mutual]]
+    rep = np.where(match >= 0, np.minimum(np.arange(n), match), np.arange(n))
+    _, parent = np.unique(rep, return_inverse=True)
+    return parent.ravel(), int(parent.max()) + 1 if n else 0
+
+
+def _refine_iterations(size: int) -> int:
+    scale = math.sqrt(min(1.0, REFINE_FULL_NODES / max(size, 1)))
+    return max(REFINE_MIN_ITERATIONS, round(REFINE_ITERATIONS * scale))
+
+
+def _multilevel(n: int, E, rng, iterations: int):
+    graphs = [(n, E)]
+    parents = []
+    while graphs[-1][0] > COARSEST_NODES:
+        size, edges = graphs[-1]
+        parent, coarse = _coarsen(size, edges, rng)
+        if coarse > 0.8 * size:
+            break  # np. gwiazda - skojarzenie prawie nic nie skleja
+        parents.append(parent)
+        graphs.append((coarse, _undirected(parent[edges])))
+
+    size, edges = graphs[-1]
+    xy = rng.random((size, 2))
+    xy = _refine(xy, edges, np.ones(size, dtype=bool), iterations, 0.1, math.sqrt(1.0 / size))
+    for level in reversed(range(len(parents))):
+        size, edges = graphs[level]
+        span = np.ptp(xy, axis=0)
+        k = math.sqrt(max(span[0] * span[1], 1e-12) / size)
+        # wierzchołki startują w miejscu rodzica, lekko rozsunięte
+        xy = xy[parents[level]] + (rng.random((size, 2)) - 0.5) * k
+        xy = _refine(xy, edges, np.ones(size, dtype=bool), _refine_iterations(size), 2 * k, k)
+    return xy
+
+
+def _rescale(xy):
+    # jak nx.rescale_layout: środek w zerze, największa współrzędna 1
+    xy = xy - xy.mean(axis=0)
+    lim = np.abs(xy).max()
+    return xy / lim if lim > 0 else xy
+
+
+def force_layout(nodes, edges, pos=None, fixed=None, seed=None, iterations: int = FORCE_ITERATIONS,
+                 multilevel: bool = True) -> dict:
+    """
+    Wielopoziomowy układ Fruchtermana-Reingolda w numpy (odpychanie metodą Barnesa-Huta).
+    Semantyka pos, fixed i skalowania jak w nx.spring_layout; ten sam seed daje ten sam układ.
+    """
+    nodes = list(nodes)
+    n = len(nodes)
+    if not n:
+        return {}
+    index = {node: i for i, node in enumerate(nodes)}
+    E = np.array([(index[u], index[v]) for u, v in edges], dtype=np.int64).reshape(-1, 2)
+    E = _undirected(E)
+    rng = np.random.default_rng(seed)
+
+    movable = np.ones(n, dtype=bool)
+    for node in fixed or ():
+        i = index.get(node)
+        if i is not None:
+            movable[i] = False
+    known = np.zeros(n, dtype=bool)
+    xy = rng.random((n, 2))
+    for node, p in (pos or {}).items():
+        i = index.get(node)
+        if i is not None:
+            xy[i] = p[0], p[1]
+            known[i] = True
+
+    if multilevel and movable.all() and not known.any():
+        xy = _multilevel(n, E, rng, iterations)
+    else:
+        if known.any() and not known.all():
+            # wierzchołki bez pozycji losowo w prostokącie znanych
+            lo = xy[known].min(axis=0)
+            span = np.maximum(np.ptp(xy[known], axis=0), 1e-3)
+            xy[~known] = lo + rng.random((int((~known).sum()), 2)) * span
+        span = np.ptp(xy, axis=0)
+        k = math.sqrt(max(span[0] * span[1], 1e-12) / n)
+        xy = _refine(xy, E, movable, iterations, 0.1 * max(span.max(), 1e-3), k)
+    if movable.all():
+        xy = _rescale(xy)
+    return {node: xy[i] for i, node in enumerate(nodes)}
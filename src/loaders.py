@@ -0,0 +1,158 @@
+import mmap
+from array import array
+
+NO_LABEL = -1
+
+
+class ParsedGraph:
+    """
+    Wynik jednoprzebiegowego parsowania pliku grafu w zwartych buforach
+    (array zamiast list krotek i słowników), z internowanymi etykietami.
+    Graph._from_parsed / ArrayGraph._from_parsed budują z niego graf hurtowo.
+    """
+
+    def __init__(self):
+        self.vertices = array('q')
+        self.vertex_labels = array('i')
+        self.vertex_idx = None
+        self.src = array('q')
+        self.dst = array('q')
+        self.edge_idx = None
+        self.edge_labels = None
+        self.labels = []
+        self._label_ids = {}
+
+    def intern(self, label) -> int:
+        key = tuple(label) if isinstance(label, list) else label
+        label_id = self._label_ids.get(key)
+        if label_id is None:
+            label_id = len(self.labels)
+            self.labels.append(label)
+            self._label_ids[key] = label_id
+        return label_id
+
+    def label(self, label_id):
+        # listy są kopiowane, żeby wierzchołki nie współdzieliły jednego obiektu
+        if label_id < 0:
+            return None
+        lbl = self.labels[label_id]
+        return list(lbl) if isinstance(lbl, list) else lbl
+
+
+def iter_lines(filepath: str):
+    """Niepuste, obcięte linie pliku (bytes), czytane przez mmap bez wczytywania całości."""
+    with open(filepath, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return  # pusty plik nie da się zmapować
+        with mm:
+            for line in iter(mm.readline, b""):
+                line = line.strip()
+                if line:
+                    yield line
+
+
+def parse_obj(filepath: str) -> ParsedGraph | None:
+    """
+    Parsuje plik .obj (linie "v [idx] etykiety..." i "e u v [idx] [etykiety...]")
+    w jednym przebiegu. Zwraca None dla pustego pliku.
+    """
+    parsed = ParsedGraph()
+    parsed.vertex_idx = array('q')
+    parsed.edge_idx = array('q')
+    parsed.edge_labels = array('i')
+    vertices = parsed.vertices
+    vertex_labels = parsed.vertex_labels
+    src = parsed.src
+    dst = parsed.dst
+    edge_idx = parsed.edge_idx
+    edge_labels = parsed.edge_labels
+    intern = parsed.intern
+
+    any_line = False
+    for line in iter_lines(filepath):
+        any_line = True
+        first_char = line[:1]
+        if first_char == b'v':
+            tokens = line[1:].split()
+            # pierwszy token to indeks, ale wierzchołki i tak są numerowane kolejno
+            labels = [t.decode() for t in tokens[1:]]
+            node_id = len(vertices) + 1
+            vertices.append(node_id)
+            parsed.vertex_idx.append(node_id)
+            vertex_labels.append(intern(labels))
+        elif first_char == b'e':
+            parts = line[1:].split()
+            if len(parts) >= 2:
+                try:
+                    u = int(parts[0])
+                    v = int(parts[1])
+                    i = int(parts[2]) if len(parts) >= 3 else None
+                except ValueError:
+                    print(f'[WARN] Expected numbers in line:\n\t{line.decode()}')
+                    continue
+                if i is None:
+                    i = len(src) + 1
+                src.append(u)
+                dst.append(v)
+                edge_idx.append(i)
+                if len(parts) >= 4:
+                    edge_labels.append(intern([t.decode() for t in parts[3:]]))
+                else:
+                    edge_labels.append(NO_LABEL)
+    if not any_line:
+        return None
+    return parsed
+
+
+def parse_csv(filepath: str) -> ParsedGraph | None:
+    """
+    Parsuje plik .csv (pierwsza linia: liczba wierzchołków i opcjonalnie etykiety,
+    dalej krawędzie "u, v") w jednym przebiegu. Zwraca None dla pustego pliku.
+    """
+    parsed = ParsedGraph()
+    src = parsed.src
+    dst = parsed.dst
+    lines = iter_lines(filepath)
+    first = next(lines, None)
+    if first is None:
+        return None
+
+    # ilość wierzchołków
+    first_line = first.split(b',')
+    try:
+        count = int(first_line[0].strip())
+    except ValueError:
+        count = None
+
+    if count is not None:
+        parsed.vertices.extend(range(1, count + 1))
+        parsed.vertex_labels.extend([NO_LABEL] * max(count, 0))
+        # etykiety w pierwszej linii: 3, yellow, orange, blue
+        if len(first_line) > 1:
+            labels_list = [x.strip().decode() for x in first_line[1:]]
+            if len(labels_list) == count:
+                for i, lab in enumerate(labels_list):
+                    parsed.vertex_labels[i] = parsed.intern(lab)
+        edge_lines = lines
+    else:
+        edge_lines = _chain_first(first, lines)
+
+    # w reszcie linii krawędzie
+    for line in edge_lines:
+        parts = line.split(b',')
+        if len(parts) >= 2:
+            try:
+                u = int(parts[0])
+                v = int(parts[1])
+            except ValueError:
+                continue  # jest jakiś syf zamiast dwóch liczb
+            src.append(u)
+            dst.append(v)
+    return parsed
+
+
+def _chain_first(first, rest):
+    yield first
+    yield from rest
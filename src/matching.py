@@ -0,0 +1,236 @@
+from collections import Counter
+from .graph import Graph, label_key
+
+
+def label_matches(l_label, g_label) -> bool:
+    # pusta etykieta w L (None albo []) pasuje do dowolnego wierzchołka G
+    if not l_label:
+        return True
+    return l_label == g_label
+
+
+class Matcher:
+    """
+    Wyszukiwanie injektywnych dopasowań L -> G (w stylu VF2++).
+    Dopasowanie jest indukowane (krawędzie G między dopasowanymi wierzchołkami
+    muszą odpowiadać krawędziom L), tak jak wymaga tego Production.apply.
+    """
+
+    def __init__(self, L: Graph, G: Graph, deleted=()):
+        self.L = L
+        self.G = G
+        self.deleted = set(deleted)
+        self.L_nodes_sorted = sorted(L.nodes())
+
+        self.l_succ = {a: set(L.successors(a)) for a in self.L_nodes_sorted}
+        self.l_pred = {a: set(L.predecessors(a)) for a in self.L_nodes_sorted}
+        self.l_label = {a: L.get_labels(a) for a in self.L_nodes_sorted}
+
+        self._orders = {}
+        # kolejność dla pełnego przeszukiwania liczona dopiero w matches()
+        self.order = None
+
+    def _label_frequency(self):
+        # z indeksu etykiet G - O(liczby różnych etykiet)
+        return Counter(self.G.label_counts())
+
+    def _compute_order(self, root=None):
+        # kolejność przeszukiwania: najpierw wierzchołki najbardziej związane
+        # z już wybranymi, potem o największym stopniu i najrzadszej etykiecie
+        # (częstości etykiet tylko przy pełnym przeszukiwaniu - to przegląd całego G)
+        if root in self._orders:
+            return self._orders[root]
+        if root is None and self.L_nodes_sorted:
+            freq = self._label_frequency()
+        else:
+            freq = Counter()
+        n_G = max(self.G.number_of_nodes(), 1)
+
+        def rarity(a):
+            lbl = self.l_label[a]
+            if not lbl:
+                return n_G
+            return freq.get(label_key(lbl), 0)
+
+        def degree(a):
+            return len(self.l_succ[a]) + len(self.l_pred[a])
+
+        order = []
+        chosen = set()
+        remaining = list(self.L_nodes_sorted)
+        if root is not None:
+            order.append(root)
+            chosen.add(root)
+            remaining.remove(root)
+        while remaining:
+            best = max(remaining, key=lambda a: (
+                len((self.l_succ[a] | self.l_pred[a]) & chosen),
+                a in self.deleted,
+                degree(a),
+                -rarity(a),
+            ))
+            order.append(best)
+            chosen.add(best)
+            remaining.remove(best)
+        self._orders[root] = order
+        return order
+
+    def _node_feasible(self, a, x) -> bool:
+        if not label_matches(self.l_label[a], self.G.get_labels(x)):
+            return False
+        out_G = self.G.out_degree(x)
+        in_G = self.G.in_degree(x)
+        out_L = len(self.l_succ[a])
+        in_L = len(self.l_pred[a])
+        if a in self.deleted:
+            # warunek wiszących krawędzi: usuwany wierzchołek nie może mieć
+            # w G żadnych krawędzi poza obrazami krawędzi z L
+            return out_G == out_L and in_G == in_L
+        return out_G >= out_L and in_G >= in_L
+
+    def _edges_consistent(self, a, x, mapping) -> bool:
+        G = self.G
+        if (a in self.l_succ[a]) != G.has_edge(x, x):
+            return False
+        for b, y in mapping.items():
+            if (b in self.l_succ[a]) != G.has_edge(x, y):
+                return False
+            if (b in self.l_pred[a]) != G.has_edge(y, x):
+                return False
+        return True
+
+    def _candidates(self, a, mapping):
+        # kandydaci z sąsiedztwa już dopasowanych wierzchołków (najmniejsza lista)
+        best = None
+        for b in self.l_pred[a]:
+            if b in mapping:
+                succs = list(self.G.successors(mapping[b]))
+                if best is None or len(succs) < len(best):
+                    best = succs
+        for b in self.l_succ[a]:
+            if b in mapping:
+                preds = list(self.G.predecessors(mapping[b]))
+                if best is None or len(preds) < len(best):
+                    best = preds
+        if best is None:
+            return self.root_candidates(a)
+        return best
+
+    def root_candidates(self, a):
+        """
+        Kandydaci dla wierzchołka a bez dopasowanych sąsiadów - z indeksów G:
+        wierzchołki z etykietą a, a dla usuwanego a bez etykiety - o dokładnie
+        takich stopniach jak w L (warunek wiszących krawędzi).
+        """
+        if self.l_label[a]:
+            return self.G.nodes_with_label(self.l_label[a])
+        if a in self.deleted:
+            return self.G.nodes_with_degree(out_degree=len(self.l_succ[a]),
+                                            in_degree=len(self.l_pred[a]))
+        return self.G.nodes()
+
+    def _search(self, depth, mapping, used, order=None):
+        if order is None:
+            order = self.order
+        if depth == len(order):
+            yield [mapping[a] for a in self.L_nodes_sorted]
+            return
+        a = order[depth]
+        for x in self._candidates(a, mapping):
+            if x in used:
+                continue
+            if not self._node_feasible(a, x):
+                continue
+            if not self._edges_consistent(a, x, mapping):
+                continue
+            mapping[a] = x
+            used.add(x)
+            yield from self._search(depth + 1, mapping, used, order)
+            del mapping[a]
+            used.discard(x)
+
+    def root(self):
+        """Pierwszy wierzchołek L w kolejności pełnego przeszukiwania (punkt podziału pracy)."""
+        if self.order is None:
+            self.order = self._compute_order()
+        return self.order[0] if self.order else None
+
+    def rooted_matches(self, root, candidates, limit: int | None = None):
+        """
+        Dopasowania, w których wierzchołek root z L trafia w jeden z candidates.
+        Dla rozłącznych zbiorów kandydatów wyniki są rozłączne.
+        """
+        order = self._compute_order(root=root)
+        count = 0
+        for x in candidates:
+            if not self.G.has_node(x) or not self._node_feasible(root, x):
+                continue
+            if not self._edges_consistent(root, x, {}):
+                continue
+            for match in self._search(1, {root: x}, {x}, order):
+                yield match
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+    def _anchored_search(self, anchors):
+        # dopasowania, w których co najmniej jeden wierzchołek L trafia w anchors
+        seen = set()
+        for a in self.L_nodes_sorted:
+            order = self._compute_order(root=a)
+            for x in anchors:
+                if not self.G.has_node(x) or not self._node_feasible(a, x):
+                    continue
+                if not self._edges_consistent(a, x, {}):
+                    continue
+                for match in self._search(1, {a: x}, {x}, order):
+                    key = tuple(match)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    yield match
+
+    def matches(self, limit: int | None = None, anchors=None):
+        if limit is not None and limit <= 0:
+            return
+        if anchors is None:
+            self.order = self._compute_order()
+            search = self._search(0, {}, set())
+        else:
+            search = self._anchored_search(list(anchors))
+        count = 0
+        for match in search:
+            yield match
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+
+class _CountingMatcher(Matcher):
+    # Matcher z licznikami dla Instrumentation - osobna klasa, żeby wyłączona
+    # instrumentacja nie kosztowała nic w pętli przeszukiwania
+    def __init__(self, L: Graph, G: Graph, deleted=(), instrumentation=None):
+        super().__init__(L, G, deleted=deleted)
+        self.instrumentation = instrumentation
+
+    def _node_feasible(self, a, x) -> bool:
+        self.instrumentation.count("candidates_tried")
+        return super()._node_feasible(a, x)
+
+    def matches(self, limit: int | None = None, anchors=None):
+        for match in super().matches(limit=limit, anchors=anchors):
+            self.instrumentation.count("matches_found")
+            yield match
+
+
+def find_matches(L: Graph, G: Graph, deleted=(), limit: int | None = None, anchors=None, instrumentation=None):
+    """
+    Leniwie zwraca dopasowania L -> G w formacie Production.apply.
+    Etykiety są filtrowane (validate ich nie sprawdza); anchors ogranicza wynik
+    do dopasowań zawierających któryś z podanych wierzchołków G.
+    """
+    if instrumentation is not None:
+        matcher = _CountingMatcher(L, G, deleted=deleted, instrumentation=instrumentation)
+    else:
+        matcher = Matcher(L, G, deleted=deleted)
+    return matcher.matches(limit=limit, anchors=anchors)
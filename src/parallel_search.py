@@ -0,0 +1,179 @@
+import os
+import weakref
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import shared_memory
+import numpy as np
+from .graph import Graph
+from .array_graph import ArrayGraph
+from .matching import Matcher
+from .snapshot import load_snapshot
+
+
+class SharedGraph:
+    """Graf w jednym bloku pamięci współdzielonej, dołączany przez procesy po nazwie."""
+
+    def __init__(self, graph: Graph):
+        if not isinstance(graph, ArrayGraph):
+            graph = ArrayGraph(vertices=graph.nodes(), edges=graph.edges(),
+                               vertex_labels=dict(graph.vertex_labels) or None,
+                               lazy_pos=True)
+        arrays = graph.to_arrays()
+        self.labels = list(graph._labels.values)
+        self.placement = graph.placement
+
+        # układ bloku: nazwa -> (przesunięcie, dtype, kształt), wyrównanie do 8 bajtów
+        self.layout = {}
+        offset = 0
+        for name, arr in arrays.items():
+            self.layout[name] = (offset, arr.dtype.str, arr.shape)
+            offset += (arr.nbytes + 7) // 8 * 8
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 8))
+        # blok jest zwalniany także wtedy, gdy nikt nie wywoła close() (np. porzucony generator)
+        self._finalizer = weakref.finalize(self, _release, self.shm)
+        for name, arr in arrays.items():
+            view = _view(self.shm, self.layout[name])
+            view[...] = arr
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _release(shm):
+    shm.close()
+    shm.unlink()
+
+
+def _view(shm, entry):
+    offset, dtype, shape = entry
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+
+
+def attach_graph(name: str, layout: dict, labels: list, placement=None) -> ArrayGraph:
+    """Dołącza się do grafu z SharedGraph (w procesie roboczym) - bez kopiowania tablic."""
+    shm = shared_memory.SharedMemory(name=name)
+    arrays = {key: _view(shm, entry) for key, entry in layout.items()}
+    graph = ArrayGraph.from_arrays(arrays, labels)
+    graph._shm = shm  # utrzymuje mapowanie przy życiu
+    return graph
+
+
+# stan procesu roboczego (ustawiany raz w inicjalizatorze puli)
+_worker = {}
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class _CancellableMatcher(Matcher):
+    # przerywa przeszukiwanie, gdy proces główny ustawi flagę (limit osiągnięty,
+    # generator zamknięty) - bez tego shutdown czekałby na pełne fragmenty
+    def __init__(self, L: Graph, G: Graph, deleted=(), cancel=None):
+        super().__init__(L, G, deleted=deleted)
+        self.cancel = cancel
+
+    def _node_feasible(self, a, x) -> bool:
+        if self.cancel.value:
+            raise _Cancelled()
+        return super()._node_feasible(a, x)
+
+
+def _init_worker(source, production, cancel):
+    # source: katalog zrzutu (save_snapshot) albo opis bloku SharedGraph
+    if isinstance(source, str):
+        graph = load_snapshot(source, mmap=True)
+    else:
+        graph = attach_graph(*source)
+    c = production.compiled
+    deleted = [c.L_nodes_sorted[i] for i in c.removed_idx]
+    _worker["matcher"] = _CancellableMatcher(production.L, graph, deleted=deleted, cancel=cancel)
+
+
+def _search_chunk(root, candidates, limit):
+    matcher = _worker["matcher"]
+    result = []
+    try:
+        for m in matcher.rooted_matches(root, candidates, limit=limit):
+            result.append(list(map(int, m)))
+    except _Cancelled:
+        pass
+    return result
+
+
+def find_matches_parallel(production, G: Graph, workers: int | None = None, limit: int | None = None, ordered: bool = True, chunk_size: int | None = None, snapshot: str | None = None):
+    """
+    Wyszukiwanie dopasowań w puli procesów, po fragmentach kandydatów pierwszego wierzchołka L.
+    ordered=True: kolejność jak w jednym procesie; snapshot: katalog z G.save_snapshot(...).
+    """
+    if limit is not None and limit <= 0:
+        return
+    c = production.compiled
+    deleted = [c.L_nodes_sorted[i] for i in c.removed_idx]
+    if not c.L_nodes_sorted:
+        yield []
+        return
+
+    matcher = Matcher(production.L, G, deleted=deleted)
+    root = matcher.root()
+    candidates = sorted(matcher.root_candidates(root))
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, len(candidates) // (workers * 8))
+    chunks = [candidates[i:i + chunk_size]
+              for i in range(0, len(candidates), chunk_size)]
+
+    if snapshot is not None:
+        shared = None
+        source = snapshot
+    else:
+        shared = SharedGraph(G)
+        source = (shared.name, shared.layout, shared.labels)
+
+    context = multiprocessing.get_context()
+    # flaga przerwania czytana przez procesy robocze w pętli przeszukiwania
+    cancel = context.RawValue("b", 0)
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                   initializer=_init_worker,
+                                   initargs=(source, production, cancel))
+    try:
+        futures = {executor.submit(_search_chunk, root, chunk, limit): k
+                   for k, chunk in enumerate(chunks)}
+        pending = set(futures)
+        done_results = {}
+        next_chunk = 0
+        produced = 0
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                done_results[futures[future]] = future.result()
+            if ordered:
+                # wyniki oddajemy dopiero, gdy wszystkie wcześniejsze fragmenty są gotowe
+                ready = []
+                while next_chunk in done_results:
+                    ready.extend(done_results.pop(next_chunk))
+                    next_chunk += 1
+            else:
+                ready = [m for k in sorted(done_results) for m in done_results[k]]
+                done_results.clear()
+            for match in ready:
+                yield match
+                produced += 1
+                if limit is not None and produced >= limit:
+                    return
+    finally:
+        cancel.value = 1
+        # procesy kończą się szybko (flaga), potem można zwolnić pamięć współdzieloną
+        executor.shutdown(wait=True, cancel_futures=True)
+        if shared is not None:
+            shared.close()
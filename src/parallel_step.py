@@ -0,0 +1,147 @@
+from .graph import Graph, PLACEMENT_LOCAL
+from .transaction import UndoLog
+
+# rodzaje kolizji dwóch dopasowań
+CONFLICT_DELETE_USE = "delete-use"          # usuwa wierzchołek używany przez drugie
+CONFLICT_DELETE_EDGE = "delete-edge"        # usuwa krawędź używaną przez drugie
+CONFLICT_PRODUCE_FORBID = "produce-forbid"  # dodaje krawędź między wierzchołkami drugiego spoza jego L
+
+
+class Footprint:
+    """
+    Ślad dopasowania w G: wierzchołki i krawędzie, których używa,
+    które usuwa i które dodaje między istniejącymi wierzchołkami.
+    """
+
+    def __init__(self, production, mapping):
+        c = production.compiled
+        images = list(mapping)
+        self.production = production
+        self.mapping = images
+        self.nodes = set(images)
+        self.deleted_nodes = {images[i] for i in c.removed_idx}
+        self.used_edges = {(images[i], images[j]) for i, j in c.L_edges_idx}
+        self.deleted_edges = {(images[i], images[j]) for i, j in c.removed_edges_idx}
+        self.added_edges = {(images[i], images[j]) for i, j in c.added_edges_idx}
+
+
+class ConflictTracker:
+    """Zbiór wzajemnie niezależnych dopasowań (do zastosowania w dowolnej kolejności)."""
+
+    def __init__(self):
+        self.accepted = []
+        self._node_owners = {}      # wierzchołek -> indeksy przyjętych dopasowań
+        self._deleted_nodes = set()
+        self._used_edges = set()
+        self._deleted_edges = set()
+        self._added_by_node = {}    # wierzchołek -> dodawane krawędzie przy nim
+
+    def conflicts(self, fp: Footprint) -> bool:
+        return self.conflict_reason(fp) is not None
+
+    def conflict_reason(self, fp: Footprint):
+        """Rodzaj kolizji z przyjętymi dopasowaniami (stałe CONFLICT_*) albo None."""
+        if fp.deleted_nodes & self._node_owners.keys():
+            return CONFLICT_DELETE_USE
+        if not self._deleted_nodes.isdisjoint(fp.nodes):
+            return CONFLICT_DELETE_USE
+        if not fp.deleted_edges.isdisjoint(self._used_edges):
+            return CONFLICT_DELETE_EDGE
+        if not fp.used_edges.isdisjoint(self._deleted_edges):
+            return CONFLICT_DELETE_EDGE
+        # nowe krawędzie tego dopasowania między wierzchołkami jednego z przyjętych
+        for u, v in fp.added_edges:
+            common = self._node_owners.get(u, set()) & self._node_owners.get(v, set())
+            for k in common:
+                if (u, v) not in self.accepted[k].used_edges:
+                    return CONFLICT_PRODUCE_FORBID
+        # nowe krawędzie przyjętych dopasowań między wierzchołkami tego dopasowania
+        for node in fp.nodes:
+            for u, v in self._added_by_node.get(node, ()):
+                if u in fp.nodes and v in fp.nodes and (u, v) not in fp.used_edges:
+                    return CONFLICT_PRODUCE_FORBID
+        return None
+
+    def add(self, fp: Footprint):
+        k = len(self.accepted)
+        self.accepted.append(fp)
+        for node in fp.nodes:
+            self._node_owners.setdefault(node, set()).add(k)
+        self._deleted_nodes |= fp.deleted_nodes
+        self._used_edges |= fp.used_edges
+        self._deleted_edges |= fp.deleted_edges
+        for u, v in fp.added_edges:
+            self._added_by_node.setdefault(u, []).append((u, v))
+            self._added_by_node.setdefault(v, []).append((u, v))
+
+    def try_add(self, fp: Footprint) -> bool:
+        if self.conflicts(fp):
+            return False
+        self.add(fp)
+        return True
+
+
+def select_independent(G: Graph, candidates, limit: int | None = None):
+    """
+    Zachłannie wybiera maksymalny zbiór niekolidujących dopasowań.
+    candidates: pary (produkcja, odwzorowanie); niepoprawne odwzorowania są pomijane.
+    Zwraca listę obiektów Footprint w kolejności wyboru.
+    """
+    tracker = ConflictTracker()
+    for production, mapping in candidates:
+        if limit is not None and len(tracker.accepted) >= limit:
+            break
+        try:
+            production.validate(G, mapping)
+        except Exception:
+            continue
+        tracker.try_add(Footprint(production, mapping))
+    return tracker.accepted
+
+
+def apply_footprints(G: Graph, footprints, transform_positions: bool = False, inplace: bool = False, undo_log: UndoLog | None = None) -> Graph:
+    """
+    Stosuje niezależne dopasowania (z select_independent) w jednym przejściu:
+    jedna kopia G (albo zmiany w miejscu z dziennikiem), jedna relaksacja
+    pozycji na końcu. Transformacje pozycji są liczone na G sprzed zmian.
+    """
+    transforms = []
+    for fp in footprints:
+        mapping_dict = fp.production.compiled.mapping_dict(fp.mapping)
+        M = fp.production._affine_transform(G, mapping_dict) if transform_positions else None
+        transforms.append((fp, mapping_dict, M))
+
+    if inplace:
+        output = G
+        log = undo_log if undo_log is not None else UndoLog(G)
+        editor = log
+        savepoint = log.savepoint()
+    else:
+        output = G.copy_structure()
+        editor = output
+
+    placement = output.placement
+    if inplace:
+        # jak w Production.apply: w miejscu bez spring_layout całego grafu
+        output.placement = PLACEMENT_LOCAL
+    placed = []
+    try:
+        try:
+            for fp, mapping_dict, M in transforms:
+                new_node_map = fp.production._rewrite(output, editor, mapping_dict)
+                placed.append((fp.production, M, new_node_map))
+        except Exception:
+            if inplace:
+                log.rollback(savepoint)
+            raise
+
+        if output.placement == PLACEMENT_LOCAL:
+            output.relax_local()
+    finally:
+        output.placement = placement
+
+    for production, M, new_node_map in placed:
+        if M is not None:
+            production._place_new_nodes(output, M, new_node_map)
+
+    return output
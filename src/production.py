@@ -1,14 +1,28 @@
-from matplotlib import pyplot as plt
 import numpy as np
-from .graph import Graph
+from .graph import Graph, PLACEMENT_LOCAL
+from .matching import find_matches
+from .parallel_search import find_matches_parallel
+from .transaction import UndoLog
+from .delta import StepDelta
+from .bulk_validation import validate_many
+from .compiled import CompiledProduction
+from .parallel_step import select_independent, apply_footprints
+from .instrumentation import Instrumentation, NULL_INSTRUMENTATION
 
 
 class Production:
+    # Instrumentation albo None (wyłączona), patrz enable_instrumentation()
+    instrumentation = None
+
     def __init__(self, left: Graph, right: Graph):
         self.L = left
         self.R = right
         self.K = None
+        # dziennik ostatniego apply(..., inplace=True), patrz rollback()
+        self.undo_log = None
+        self.compiled = None
         self.compute_K_graph()
+        self.compile()
 
     # Obliczenie grafu sklejającego
     def compute_K_graph(self) -> Graph:
@@ -31,193 +45,381 @@ class Production:
             self.K = K_graph
         return K_graph
 
+    # Struktury pochodne używane przy każdym apply
+    def compile(self) -> CompiledProduction:
+        """
+        Liczy raz zbiory węzłów/krawędzi L, K, R, plan nowych krawędzi i dane
+        do transformacji pozycji. Trzeba wywołać ponownie po zmianie L lub R.
+        """
+        self.compiled = CompiledProduction(self.L, self.R)
+        return self.compiled
+
+    # pomiary czasu faz
+    def enable_instrumentation(self, instrumentation: Instrumentation | None = None) -> Instrumentation:
+        """
+        Włącza pomiar faz apply (copy, validate, dangling, delete, add_nodes,
+        add_edges, relax_local, affine_transform, update_positions) i wyszukiwania dopasowań (match)
+        oraz liczniki. Zwraca obiekt ze statystykami (to_dict/dump/add_hook).
+        """
+        if instrumentation is None:
+            instrumentation = Instrumentation()
+        self.instrumentation = instrumentation
+        return instrumentation
+
+    def disable_instrumentation(self):
+        self.instrumentation = None
+
+    # automatyczne wyszukiwanie dopasowań L -> G
+    def find_matches(self, G: Graph, limit: int | None = None, anchors=None, workers: int | None = None):
+        """
+        Generator dopasowań L -> G spełniających warunki apply(), listy obrazów L posortowanych rosnąco.
+        Niepusta etykieta wierzchołka L musi być równa etykiecie obrazu - apply,
+        validate i validate_many etykiet nie sprawdzają. workers > 1: pula procesów.
+        """
+        if workers is not None and workers > 1 and anchors is None:
+            return find_matches_parallel(self, G, workers=workers, limit=limit)
+        c = self.compiled
+        deleted = [c.L_nodes_sorted[i] for i in c.removed_idx]
+        probe = self.instrumentation
+        if probe is None:
+            return find_matches(self.L, G, deleted=deleted, limit=limit, anchors=anchors)
+        matches = find_matches(self.L, G, deleted=deleted, limit=limit, anchors=anchors,
+                               instrumentation=probe)
+        return probe.timed_iter("match", matches)
+
     # zastosowanie produkcji
-    def apply(self, input: Graph, mapping: list[int], transform_positions: bool = False) -> Graph:
+    def apply(self, input: Graph, mapping: list[int], transform_positions: bool = False, inplace: bool = False, undo_log: UndoLog | None = None) -> Graph:
+        """
+        Stosuje produkcję dla odwzorowania L -> G; domyślnie zwraca nowy graf.
+        Przy inplace=True zmienia input i zapisuje zmiany w dzienniku (rollback()).
+        """
 
-        # kopia wejścia
         G = input
-        output = Graph(vertices=G.nodes(), edges=G.edges(), pos=G.pos.copy())
+        probe = self.instrumentation
+        if probe is None:
+            probe = NULL_INSTRUMENTATION
+
+        # sprawdzenie przed kopiowaniem - odrzucone dopasowanie nie kosztuje O(|G|)
+        with probe.phase("validate"):
+            mapping_dict, inv_map = self._validate_mapping(G, mapping)
+        with probe.phase("dangling"):
+            self._validate_dangling(G, mapping, inv_map)
+
+        # transformacja pozycji liczona przed zmianami (przy inplace G jest modyfikowany)
+        # i przed kopią - przy leniwym G wymusza układ, który kopia przejmuje,
+        # więc nowe wierzchołki trafiają w te same współrzędne co reszta wyniku
+        M = None
+        if transform_positions:
+            with probe.phase("affine_transform"):
+                M = self._affine_transform(G, mapping_dict)
+
+        if inplace:
+            output = G
+        else:
+            # kopia wejścia
+            # (przy leniwym układzie G wynik też dostaje leniwe pozycje)
+            with probe.phase("copy"):
+                output = G.copy_structure()
+
+        # układ liczony w output (spring, relax_local) trafia do tych samych statystyk
+        graph_probe = output.instrumentation
+        if probe.enabled and graph_probe is None:
+            output.instrumentation = probe
+        placement = output.placement
+        if inplace:
+            # w miejscu nowe wierzchołki są rozmieszczane lokalnie - spring_layout
+            # całego grafu dla każdego z nich kosztowałby O(|G|) na krok
+            output.placement = PLACEMENT_LOCAL
+        try:
+            if inplace:
+                log = undo_log if undo_log is not None else UndoLog(G)
+                self.undo_log = log
+                savepoint = log.savepoint()
+                try:
+                    new_node_map = self._rewrite(output, log, mapping_dict, probe)
+                except Exception:
+                    log.rollback(savepoint)
+                    raise
+            else:
+                new_node_map = self._rewrite(output, output, mapping_dict, probe)
+
+            # w trybie lokalnym jedna relaksacja na całe apply, tylko wokół nowych wierzchołków
+            if output.placement == PLACEMENT_LOCAL:
+                output.relax_local()
+
+            if M is not None:
+                with probe.phase("update_positions"):
+                    self._place_new_nodes(output, M, new_node_map)
+        finally:
+            output.instrumentation = graph_probe
+            output.placement = placement
 
-        for node in G.nodes():
-            lbl = G.get_labels(node)
-            if lbl is not None:
-                output.set_label(node, lbl)
+        return output
 
-        # Mapowanie wierzchołków L->G
-        L_nodes_sorted = sorted(self.L.nodes())
+    def apply_delta(self, input: Graph, mapping: list[int], transform_positions: bool = False, inplace: bool = False, title: str | None = None) -> StepDelta:
+        """
+        Jak apply, ale zwraca tylko deltę (StepDelta).
+        Bez inplace zmiany są wykonywane w miejscu i od razu cofane - O(zmian) zamiast kopii grafu.
+        """
+        log = UndoLog(input)
+        # rollback usuwa nowe wierzchołki, więc zapamiętane maksimum byłoby liczone od nowa
+        top = input.next_node_id() - 1
+        self.apply(input, mapping, transform_positions=transform_positions, inplace=True, undo_log=log)
+        delta = StepDelta.from_log(log, title=title, mapping=mapping)
+        if inplace:
+            self.undo_log = log
+        else:
+            log.rollback()
+            input._max_node = top
+            self.undo_log = None
+        return delta
+
+    # równoległy krok przepisywania
+    def apply_parallel(self, input: Graph, matches=None, transform_positions: bool = False, inplace: bool = False, undo_log: UndoLog | None = None, limit: int | None = None):
+        """
+        Stosuje produkcję w jednym przejściu we wszystkich niekolidujących dopasowaniach.
+        Zwraca (graf wynikowy, lista zastosowanych odwzorowań).
+        """
+        if matches is None:
+            matches = self.find_matches(input)
+        footprints = select_independent(
+            input, ((self, m) for m in matches), limit=limit)
+        if inplace:
+            if undo_log is None:
+                undo_log = UndoLog(input)
+            self.undo_log = undo_log
+        output = apply_footprints(input, footprints, transform_positions=transform_positions,
+                                  inplace=inplace, undo_log=undo_log)
+        return output, [fp.mapping for fp in footprints]
+
+    def validate(self, G: Graph, mapping: list[int]) -> dict:
+        """
+        Sprawdza odwzorowanie L -> G (wyjątek z opisem problemu) i zwraca je jako słownik.
+        Koszt O(suma stopni dopasowanych wierzchołków), niezależnie od rozmiaru G.
+        """
+        mapping_dict, inv_map = self._validate_mapping(G, mapping)
+        self._validate_dangling(G, mapping, inv_map)
+        return mapping_dict
+
+    def validate_many(self, G: Graph, mappings):
+        """
+        Wektorowe sprawdzenie wielu odwzorowań naraz (tablica k x |L|), patrz
+        src/bulk_validation.py. Zwraca (maska poprawnych, kody, opisy przyczyn).
+        """
+        return validate_many(self, G, mappings)
+
+    def _validate_mapping(self, G: Graph, mapping: list[int]):
+        # injektywność, krawędzie L i brak nadmiarowych krawędzi; zwraca (L -> G, G -> L)
+        c = self.compiled
 
         # Sprawdzanie produkcji
-        if len(mapping) != len(L_nodes_sorted):
+        if len(mapping) != len(c.L_nodes_sorted):
             raise Exception(
                 "Niepoprawna liczba wierzchołków w odwzorowaniu dla grafu L.")
 
-        mapping_dict = {Lnode: Gnode for Lnode,
-                        Gnode in zip(L_nodes_sorted, mapping)}
+        # Mapowanie wierzchołków L->G
+        mapping_dict = c.mapping_dict(mapping)
+
+        #  mapping w drugą stronę (liczony raz)
+        inv_map = {Gv: Lv for Lv, Gv in mapping_dict.items()}
 
-        if len(set(mapping_dict.values())) != len(mapping_dict):
+        if len(inv_map) != len(mapping_dict):
             raise Exception(
                 "Odwzorowanie nie jest injektywne – różne węzły L odwzorowano na ten sam węzeł grafu G.")
 
-        for (u, v) in self.L.edges():
+        for (u, v) in c.L_edges:
             uG = mapping_dict[u]
             vG = mapping_dict[v]
-            if not output.has_edge(uG, vG):
+            if not G.has_edge(uG, vG):
                 raise Exception(
                     f"Brak wymaganej krawędzi ({u}->{v}) z L w grafie początkowym (oczekiwano {uG}->{vG}).")
-        # TODO: Sprawdzenie czy nie brak krawędzi w drugą stronę?
-        for (u, v) in output.edges():
-            uL = None
-            vL = None
-            for lnode, gnode in mapping_dict.items():
-                if gnode == u:
-                    uL = lnode
-                if gnode == v:
-                    vL = lnode
-            if uL is not None and vL is not None:
-                if not self.L.has_edge(uL, vL):
+
+        for Lnode in c.L_nodes_sorted:
+            if not G.has_node(mapping_dict[Lnode]):
+                raise Exception(
+                    f"Wierzchołek {mapping_dict[Lnode]} (obraz {Lnode} z L) nie istnieje w grafie G.")
+
+        # krawędzie G między dopasowanymi wierzchołkami muszą być obrazami krawędzi L
+        # (wystarczy przejrzeć krawędzie wychodzące z dopasowanych wierzchołków)
+        for uL in c.L_nodes_sorted:
+            u = mapping_dict[uL]
+            for v in G.successors(u):
+                vL = inv_map.get(v)
+                if vL is not None and (uL, vL) not in c.L_edge_set:
                     raise Exception(
                         f"Krawędź ({u}->{v}) w G nie jest dozwolona – brak odpowiadającej krawędzi ({uL}->{vL}) w L.")
 
-        # Węzły
-        L_nodes = set(self.L.nodes())
-        R_nodes = set(self.R.nodes())
-        to_remove_L = L_nodes - R_nodes     # węzły które zostaną usunięte
-        # odpowiadające im węzły w G
-        to_remove_G = {mapping_dict[Ln] for Ln in to_remove_L}
+        return mapping_dict, inv_map
 
-        #  mapping w drugą stronę
-        inv_map = {Gv: Lv for Lv, Gv in mapping_dict.items()}
+    def _validate_dangling(self, G: Graph, mapping: list[int], inv_map: dict):
+        c = self.compiled
+
+        # węzły G odpowiadające węzłom L, które zostaną usunięte
+        to_remove_G = {mapping[i] for i in c.removed_idx}
 
         # sprawdzenie warunku wiszących krawędzi
-        for gnode in to_remove_G:
+        for i in c.removed_idx:
+            gnode = mapping[i]
+            Lnode_removed = c.L_nodes_sorted[i]
 
             # krawędzie wychodzące z gnode
-            for succ in list(G.nx_graph.successors(gnode)):
+            for succ in G.successors(gnode):
 
                 # jeśli succ pozostaje w wyniku
                 if succ not in to_remove_G:
-                    if succ not in inv_map:
+                    Lnode_other = inv_map.get(succ)
+                    if Lnode_other is None:
                         raise Exception(
                             f"Naruszenie warunku wiszącej krawędzi: wierzchołek {gnode} (do usunięcia) ma krawędź do {succ}, który nie jest objęty dopasowaniem.")
-                    else:
-                        # succ jest w G, jest obrazem jakiegoś węzła z L
-                        Lnode_removed = inv_map[gnode]
-                        Lnode_other = inv_map[succ]
-
-                        if not self.L.has_edge(Lnode_removed, Lnode_other):
-                            raise Exception(
-                                f"Naruszenie warunku wiszącej krawędzi: krawędź {Lnode_removed}->{Lnode_other} łączy usuwany i zachowany węzeł w G, ale nie istnieje w L.")
+                    # succ jest w G, jest obrazem jakiegoś węzła z L
+                    if (Lnode_removed, Lnode_other) not in c.L_edge_set:
+                        raise Exception(
+                            f"Naruszenie warunku wiszącej krawędzi: krawędź {Lnode_removed}->{Lnode_other} łączy usuwany i zachowany węzeł w G, ale nie istnieje w L.")
 
             # krawędzie wchodzące do gnode
-            for pred in list(G.nx_graph.predecessors(gnode)):
+            for pred in G.predecessors(gnode):
                 if pred not in to_remove_G:
-                    inv_map = {Gv: Lv for Lv, Gv in mapping_dict.items()}
-                    if pred not in inv_map:
+                    Lnode_other = inv_map.get(pred)
+                    if Lnode_other is None:
                         raise Exception(
                             f"Naruszenie warunku wiszącej krawędzi: wierzchołek {gnode} (do usunięcia) ma krawędź od {pred}, który nie jest objęty dopasowaniem.")
-                    else:
-                        Lnode_removed = inv_map[gnode]
-                        Lnode_other = inv_map[pred]
-                        if not self.L.has_edge(Lnode_other, Lnode_removed):
-                            raise Exception(
-                                f"Naruszenie warunku wiszącej krawędzi: krawędź {Lnode_other}->{Lnode_removed} łączy zachowany i usuwany węzeł w G, ale nie istnieje w L.")
+                    if (Lnode_other, Lnode_removed) not in c.L_edge_set:
+                        raise Exception(
+                            f"Naruszenie warunku wiszącej krawędzi: krawędź {Lnode_other}->{Lnode_removed} łączy zachowany i usuwany węzeł w G, ale nie istnieje w L.")
 
-        # Usunięcie węzłów i krawędzi do usunięcia
-        for node in to_remove_G:
-            output.remove_node(node)
+    def _rewrite(self, output: Graph, editor, mapping_dict: dict, probe=NULL_INSTRUMENTATION) -> dict:
+        # editor to output albo UndoLog(output) - przez niego idą wszystkie zmiany
+        c = self.compiled
+        images = [mapping_dict[a] for a in c.L_nodes_sorted]
 
-        L_edges = set(self.L.edges())
-        R_edges = set(self.R.edges())
+        # Usunięcie węzłów i krawędzi do usunięcia
+        with probe.phase("delete"):
+            for i in c.removed_idx:
+                editor.remove_node(images[i])
 
-        preserved_L = L_nodes.intersection(R_nodes)  # węzły zachowane
-        for (u, v) in L_edges:
-            if u in preserved_L and v in preserved_L and (u, v) not in R_edges:
-                uG, vG = mapping_dict[u], mapping_dict[v]
+            removed_edges = 0
+            for i, j in c.removed_edges_idx:
+                uG, vG = images[i], images[j]
                 if output.has_edge(uG, vG):
-                    output.remove_edge(uG, vG)
+                    editor.remove_edge(uG, vG)
+                    removed_edges += 1
+        probe.count("nodes_removed", len(c.removed_idx))
+        probe.count("edges_removed", removed_edges)
 
         # dodanie nowych węzłów
-        new_R_nodes = R_nodes - L_nodes
-        new_node_map = {}  # mapowanie: R -> output
-
-        next_id = max(output.nodes())+1 if output.nodes() else 1
-        for Rnode in sorted(new_R_nodes):
-            new_id = next_id
-            next_id += 1
-            output.add_node(new_id)
-            new_node_map[Rnode] = new_id
-            lbl = self.R.get_labels(Rnode)
-            if lbl is not None:
-                output.set_label(new_id, lbl)
+        with probe.phase("add_nodes"):
+            new_ids = []
+            next_id = output.next_node_id()
+            for lbl in c.new_labels:
+                new_id = next_id
+                next_id += 1
+                editor.add_node(new_id)
+                new_ids.append(new_id)
+                if lbl is not None:
+                    editor.set_label(new_id, lbl)
+        probe.count("nodes_added", len(new_ids))
 
         # dodanie nowych krawędzi
-        for (u, v) in self.R.edges():
-            u_out = mapping_dict.get(
-                u) if u in L_nodes else new_node_map.get(u)
-            v_out = mapping_dict.get(
-                v) if v in L_nodes else new_node_map.get(v)
-            if u_out is None or v_out is None:
-                continue
-            if output.has_edge(u_out, v_out):
-                continue  # jeśli krawędź już istnieje
-            output.add_edge(u_out, v_out)
+        with probe.phase("add_edges"):
+            added_edges = 0
+            for (u, v) in c.R_edge_plan:
+                u_out = images[u] if u >= 0 else new_ids[-u - 1]
+                v_out = images[v] if v >= 0 else new_ids[-v - 1]
+                if output.has_edge(u_out, v_out):
+                    continue  # jeśli krawędź już istnieje
+                editor.add_edge(u_out, v_out)
+                added_edges += 1
+        probe.count("edges_added", added_edges)
+
+        # mapowanie: R -> output
+        return dict(zip(c.new_R_nodes, new_ids))
+
+    def rollback(self):
+        """Cofa zmiany ostatniego apply(..., inplace=True)."""
+        if self.undo_log is None:
+            raise Exception("Brak dziennika zmian do cofnięcia.")
+        self.undo_log.rollback()
+        self.undo_log = None
+
+    def draw(self, title: str | None = None, path: str | None = None):
+        """
+        Rysuje L, K i R obok siebie (src/render.py). Z path zapisuje od razu
+        do pliku (PNG/SVG) bez pyplot, w przeciwnym razie pokazuje okno.
+        """
+        from .render import render_production, render_production_to_file
+        if path is not None:
+            return render_production_to_file(self, path, title=title)
 
-        if transform_positions:
-            self.update_positions(input, output, mapping)
+        from matplotlib import pyplot as plt
+        plt.figure(figsize=(14, 6))
+        render_production(self, plt.gca(), title=title)
+        plt.tight_layout()
+        plt.show()
 
-        return output
+    def update_positions(self, input_graph: Graph, output_graph: Graph, mapping: list[int]):
+        """
+        Oblicza pozycje nowych wierzchołków w output_graph stosując transformację afiniczną.
+        """
 
-    def draw(self, title: str | None = None):
+        c = self.compiled
 
-        plt.figure(figsize=(14, 6))
+        # 1. Odtworzenie mapowania (L -> G)
+        if len(mapping) != len(c.L_nodes_sorted):
+            print("[ERROR] Długość mapowania nie zgadza się z liczbą węzłów w L.")
+            return
+        mapping_dict = c.mapping_dict(mapping)
 
-        # kolorki
-        color_L = '#D44C33'
-        color_K = '#E0BA28'
-        color_R = '#6EB52D'
+        M = self._affine_transform(input_graph, mapping_dict)
+        if M is None:
+            return  # Brak punktów odniesienia
 
-        pos_L = self.L.draw(title="L (Lewy)", color=color_L)
-        if pos_L:
-            max_x_L = max(p[0] for p in pos_L.values())
-            offset_K = (max_x_L + 1.5, 0)
-        else:
-            offset_K = (0, 0)
+        # 4. Identyfikacja faktycznie nowych wierzchołków w Output
 
-        pos_K = self.K.draw(title="K (Sklejający)",
-                            offset=offset_K, color=color_K)
-        if pos_K:
-            max_x_K = max(p[0] for p in pos_K.values())
-            offset_R = (max_x_K + 1.5, 0)
-        else:
-            offset_R = (offset_K[0] + 2, 0)
+        # a) Ustalmy, co zostało usunięte z Input
+        to_remove_G = {mapping[i] for i in c.removed_idx}
 
-        self.R.draw(title="R (Prawy)", offset=offset_R, color=color_R)
+        # b) Ustalmy, co z Input przetrwało (tło + zachowana część produkcji)
+        input_nodes = set(input_graph.nodes())
+        preserved_input_nodes = input_nodes - to_remove_G
 
-        # tytuł
-        if title:
-            plt.suptitle(title, fontsize=16)
+        # c) Wszystko w Output, co nie jest "przetrwałe", musi być nowe
+        output_nodes = set(output_graph.nodes())
+        newly_added_ids = output_nodes - preserved_input_nodes
 
-        plt.tight_layout()
-        plt.show()
+        # Sortujemy po ID, bo apply() przydziela ID rosnąco
+        output_new_ids_sorted = sorted(list(newly_added_ids))
 
-    def update_positions(self, input_graph: Graph, output_graph: Graph, mapping: list[int]):
+        # d) Nowe węzły z definicji produkcji (R - L) - sortujemy, bo apply() dodaje je w tej kolejności
+        new_R_nodes_sorted = list(c.new_R_nodes)
+
+        # Weryfikacja
+        if len(new_R_nodes_sorted) != len(output_new_ids_sorted):
+            print(
+                f"[WARN] Liczba nowych wierzchołków w R ({len(new_R_nodes_sorted)}) nie zgadza się z wykrytymi w Output ({len(output_new_ids_sorted)}).")
+            return
+
+        # 5. Aplikacja transformacji
+        self._place_new_nodes(output_graph, M, dict(
+            zip(new_R_nodes_sorted, output_new_ids_sorted)))
+
+    def _affine_transform(self, input_graph: Graph, mapping_dict: dict):
         """
-        Oblicza pozycje nowych wierzchołków w output_graph stosując transformację afiniczną.
+        Macierz M transformacji afinicznej pozycji L -> G ([x_L, y_L, 1] * M = [x_G, y_G])
+        albo None, jeśli brak punktów odniesienia.
         """
+        c = self.compiled
+        images = [mapping_dict[a] for a in c.L_nodes_sorted]
 
-        # 1. Odtworzenie mapowania (L -> G)
-        L_nodes_sorted = sorted(self.L.nodes())
-        if len(mapping) != len(L_nodes_sorted):
-            print("[ERROR] Długość mapowania nie zgadza się z liczbą węzłów w L.")
-            return
-        mapping_dict = {Lnode: Gnode for Lnode,
-                        Gnode in zip(L_nodes_sorted, mapping)}
+        # szybka ścieżka: wszystkie węzły mają pozycje, pseudoodwrotność policzona w compile()
+        if c.L_pinv is not None and all(g in input_graph.pos for g in images):
+            dst_matrix = np.array([input_graph.pos[g][:2] for g in images], dtype=float)
+            return c.L_pinv @ dst_matrix
 
         # 2. Zbieranie punktów do obliczenia transformacji (Wspólne L i Input)
         src_pts = []
         dst_pts = []
 
-        for l_node in L_nodes_sorted:
+        for l_node in c.L_nodes_sorted:
             g_node = mapping_dict[l_node]
             # Bierzemy pod uwagę tylko węzły, które mają pozycje w obu grafach
             if l_node in self.L.pos and g_node in input_graph.pos:
@@ -225,7 +427,7 @@ class Production:
                 dst_pts.append(input_graph.pos[g_node])
 
         if not src_pts:
-            return  # Brak punktów odniesienia
+            return None
 
         src_matrix = np.array(src_pts)
         dst_matrix = np.array(dst_pts)
@@ -248,47 +450,18 @@ class Production:
                 [0.0, 1.0],
                 [diff[0], diff[1]]
             ])
+        return M
 
-        # 4. Identyfikacja faktycznie nowych wierzchołków w Output
-
-        # a) Ustalmy, co zostało usunięte z Input
-        L_nodes = set(self.L.nodes())
-        R_nodes = set(self.R.nodes())
-        to_remove_L = L_nodes - R_nodes
-        to_remove_G = {mapping_dict[ln]
-                       for ln in to_remove_L if ln in mapping_dict}
-
-        # b) Ustalmy, co z Input przetrwało (tło + zachowana część produkcji)
-        input_nodes = set(input_graph.nodes())
-        preserved_input_nodes = input_nodes - to_remove_G
-
-        # c) Wszystko w Output, co nie jest "przetrwałe", musi być nowe
-        output_nodes = set(output_graph.nodes())
-        newly_added_ids = output_nodes - preserved_input_nodes
-
-        # Sortujemy po ID, bo apply() przydziela ID rosnąco
-        output_new_ids_sorted = sorted(list(newly_added_ids))
-
-        # d) Nowe węzły z definicji produkcji (R - L) - sortujemy, bo apply() dodaje je w tej kolejności
-        new_R_nodes_sorted = sorted(list(R_nodes - L_nodes))
-
-        # Weryfikacja
-        if len(new_R_nodes_sorted) != len(output_new_ids_sorted):
-            print(
-                f"[WARN] Liczba nowych wierzchołków w R ({len(new_R_nodes_sorted)}) nie zgadza się z wykrytymi w Output ({len(output_new_ids_sorted)}).")
+    def _place_new_nodes(self, output_graph: Graph, M, new_node_map: dict):
+        # new_node_map: wierzchołek R -> nowy wierzchołek w output_graph
+        c = self.compiled
+        if not c.new_with_pos:
             return
 
-        # 5. Aplikacja transformacji
-        for r_node, out_id in zip(new_R_nodes_sorted, output_new_ids_sorted):
-            if r_node in self.R.pos:
-                rx, ry = self.R.pos[r_node]
-
-                # Przekształcenie: [rx, ry, 1] * M
-                vec = np.array([rx, ry, 1.0])
-                new_pos = vec @ M
-
+        # Przekształcenie: [rx, ry, 1] * M dla wszystkich nowych wierzchołków naraz
+        new_pos = c.new_points @ M
+        for k, p in zip(c.new_with_pos, new_pos):
+            out_id = new_node_map.get(c.new_R_nodes[k])
+            if out_id is not None:
                 # Aktualizacja pozycji w grafie wynikowym
-                output_graph.pos[out_id] = list(new_pos)
-
-        # output_graph.draw()
-        # plt.show()
+                output_graph.pos[out_id] = list(p)
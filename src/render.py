@@ -0,0 +1,211 @@
+import math
+from collections import Counter
+import numpy as np
+from .graph import Graph
+
+# matplotlib jest importowany w funkcjach rysujących, nie przy imporcie pakietu
+
+# poziom szczegółowości: powyżej tylu wierzchołków nie ma podpisów ani grotów
+# strzałek, a etykiety są agregowane w legendę
+LOD_LABELS = 200
+# ile krawędzi trafia do jednej ścieżki (Agg ma limit rozmiaru ścieżki)
+EDGE_CHUNK = 5000
+# ile najczęstszych etykiet dostaje własny kolor w trybie zagregowanym
+LEGEND_LABELS = 10
+
+DEFAULT_COLOR = '#99ccff'
+_LABEL_BOX = dict(facecolor='white', edgecolor='gray', boxstyle='round,pad=0.2', alpha=0.8)
+
+
+def new_figure(figsize=(8, 6), dpi=100):
+    """Figura na płótnie Agg, niezależna od globalnego stanu pyplot (bez okna)."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def save_figure(fig, path: str, dpi=None):
+    """Zapis do pliku; format (png, svg, pdf...) wynika z rozszerzenia."""
+    fig.savefig(path, dpi=dpi)
+
+
+def _node_size(ax, xy) -> float:
+    # 300 jak w dawnym Graph.draw, mniejsze kropki, gdy wierzchołki leżą gęsto
+    n = len(xy)
+    if n <= 1:
+        return 300.0
+    span = np.ptp(xy, axis=0)
+    area = max(span[0], 1e-9) * max(span[1], 1e-9)
+    spacing_pt = math.sqrt(area / n) / _data_per_point(ax)
+    return float(min(300.0, max(1.0, (0.5 * spacing_pt) ** 2)))
+
+
+def _positions(graph: Graph, offset):
+    nodes = graph.nodes()
+    pos = graph.pos
+    xy = np.empty((len(nodes), 2), dtype=float)
+    for i, node in enumerate(nodes):
+        p = pos[node]
+        xy[i, 0] = p[0]
+        xy[i, 1] = p[1]
+    xy += np.asarray(offset, dtype=float)
+    return nodes, xy
+
+
+def _edge_rows(graph: Graph, row):
+    edges = graph.edges()
+    if not edges:
+        return edges, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    src = np.fromiter((row[u] for u, _ in edges), dtype=np.int64, count=len(edges))
+    dst = np.fromiter((row[v] for _, v in edges), dtype=np.int64, count=len(edges))
+    return edges, src, dst
+
+
+def _data_per_point(ax) -> float:
+    # ile jednostek danych przypada na punkt typograficzny w poziomie
+    x0, x1 = ax.get_xlim()
+    width_pt = ax.bbox.width * 72.0 / ax.figure.dpi
+    return abs(x1 - x0) / max(width_pt, 1.0)
+
+
+def render_graph(graph: Graph, ax, title: str | None = None, offset=(0, 0), color=DEFAULT_COLOR,
+                 lod_labels: int = LOD_LABELS) -> dict:
+    """
+    Rysuje graf jedną ścieżką krawędzi i jedną kolekcją punktów.
+    Do lod_labels wierzchołków także groty i podpisy. Zwraca pozycje (z przesunięciem).
+    """
+    nodes, xy = _positions(graph, offset)
+    row = {node: i for i, node in enumerate(nodes)}
+    edges, src, dst = _edge_rows(graph, row)
+    n = len(nodes)
+    detailed = n <= lod_labels
+
+    if n:
+        ax.update_datalim(xy)
+        ax.autoscale_view()
+    size = _node_size(ax, xy)
+
+    # krawędzie: groty tylko w małych grafach
+    if len(edges):
+        if detailed:
+            _draw_arrows(ax, xy, src, dst, size)
+        else:
+            # kilka ścieżek z przerwami (NaN) - szybsze niż LineCollection z osobną
+            # ścieżką na każdy odcinek; podział na części ze względu na limit Agg
+            path = np.full((len(edges), 3, 2), np.nan)
+            path[:, 0] = xy[src]
+            path[:, 1] = xy[dst]
+            for start in range(0, len(edges), EDGE_CHUNK):
+                part = path[start:start + EDGE_CHUNK].reshape(-1, 2)
+                ax.plot(part[:, 0], part[:, 1], color='k', linewidth=0.4, alpha=0.5, zorder=1)
+
+    # wierzchołki: jedna kolekcja punktów
+    labels = [graph.get_labels(node) for node in nodes]
+    if detailed or not any(labels):
+        ax.scatter(xy[:, 0], xy[:, 1], s=size, c=color, zorder=2, linewidths=0)
+    else:
+        _scatter_by_label(ax, xy, labels, size, color)
+
+    if detailed:
+        _draw_texts(graph, ax, nodes, xy, edges, src, dst)
+
+    if title and n:
+        ax.text(xy[:, 0].mean(), xy[:, 1].max() + 0.4, title, fontsize=12,
+                fontweight='bold', ha='center')
+
+    ax.set_axis_off()
+    return {node: [xy[i, 0], xy[i, 1]] for i, node in enumerate(nodes)}
+
+
+def _draw_arrows(ax, xy, src, dst, size):
+    # strzałki skracane o promień wierzchołka w punktach - poprawne przy każdej skali
+    from matplotlib.patches import FancyArrowPatch
+    shrink = 0.5 * math.sqrt(size)
+    for a, b in zip(src, dst):
+        ax.add_patch(FancyArrowPatch(xy[a], xy[b], arrowstyle='-|>', mutation_scale=10,
+                                     shrinkA=shrink, shrinkB=shrink, color='k',
+                                     linewidth=1.0, zorder=1))
+
+
+def _scatter_by_label(ax, xy, labels, size, color):
+    # etykiety zagregowane: najczęstsze dostają kolor, reszta jest szara
+    counts = Counter(str(lbl) if lbl else "" for lbl in labels)
+    top = [lbl for lbl, _ in counts.most_common() if lbl][:LEGEND_LABELS]
+    palette = {lbl: f"C{i}" for i, lbl in enumerate(top)}
+    keys = [str(lbl) if lbl else "" for lbl in labels]
+    colors = [palette.get(k, '#bbbbbb') if k else color for k in keys]
+    ax.scatter(xy[:, 0], xy[:, 1], s=size, c=colors, zorder=2, linewidths=0)
+    handles = [ax.scatter([], [], s=30, c=palette[lbl], label=f"{lbl} ({counts[lbl]})") for lbl in top]
+    rest = sum(c for lbl, c in counts.items() if lbl and lbl not in palette)
+    if rest:
+        handles.append(ax.scatter([], [], s=30, c='#bbbbbb', label=f"inne ({rest})"))
+    if handles:
+        ax.legend(handles=handles, loc='upper right', fontsize=7, framealpha=0.8)
+
+
+def _draw_texts(graph, ax, nodes, xy, edges, src, dst):
+    # podpisy jak w dawnym Graph.draw - tylko dla małych grafów
+    for i, node in enumerate(nodes):
+        idx = graph.get_idx(node)
+        ax.text(xy[i, 0], xy[i, 1], str(idx) if idx is not None else str(node),
+                fontsize=9, ha='center', va='center', zorder=3)
+        lbl = graph.get_labels(node)
+        if lbl:
+            ax.text(xy[i, 0], xy[i, 1] + 0.12, str(lbl), bbox=_LABEL_BOX,
+                    ha='center', fontsize=8, color='black', zorder=10)
+    for k, (u, v) in enumerate(edges):
+        mid = (xy[src[k]] + xy[dst[k]]) / 2
+        e_idx = graph.edge_idx.get((u, v))
+        if e_idx is not None:
+            ax.text(mid[0], mid[1], f"[{e_idx}]", fontsize=8, ha='center', va='center',
+                    bbox=dict(facecolor='white', edgecolor='none', alpha=1.0), zorder=4)
+        e_lbl = graph.edge_labels.get((u, v))
+        if e_lbl:
+            ax.text(mid[0], mid[1] + 0.08, str(e_lbl), bbox=_LABEL_BOX,
+                    ha='center', va='center', fontsize=7, color='black', zorder=15)
+
+
+def render_production(production, ax, title: str | None = None):
+    """L, K i R obok siebie na jednych osiach (jak Production.draw)."""
+    color_L = '#D44C33'
+    color_K = '#E0BA28'
+    color_R = '#6EB52D'
+
+    pos_L = render_graph(production.L, ax, title="L (Lewy)", color=color_L)
+    if pos_L:
+        offset_K = (max(p[0] for p in pos_L.values()) + 1.5, 0)
+    else:
+        offset_K = (0, 0)
+
+    pos_K = render_graph(production.K, ax, title="K (Sklejający)", offset=offset_K, color=color_K)
+    if pos_K:
+        offset_R = (max(p[0] for p in pos_K.values()) + 1.5, 0)
+    else:
+        offset_R = (offset_K[0] + 2, 0)
+
+    render_graph(production.R, ax, title="R (Prawy)", offset=offset_R, color=color_R)
+
+    if title:
+        ax.figure.suptitle(title, fontsize=16)
+
+
+def render_to_file(graph: Graph, path: str, title: str | None = None, figsize=(8, 6), dpi=100, **kwargs):
+    """Rysuje graf bez pyplot i zapisuje od razu do PNG/SVG (format z rozszerzenia)."""
+    fig = new_figure(figsize=figsize, dpi=dpi)
+    ax = fig.add_subplot()
+    render_graph(graph, ax, **kwargs)
+    if title:
+        ax.set_title(title)
+    save_figure(fig, path)
+    return fig
+
+
+def render_production_to_file(production, path: str, title: str | None = None, figsize=(14, 6), dpi=100):
+    fig = new_figure(figsize=figsize, dpi=dpi)
+    ax = fig.add_subplot()
+    render_production(production, ax, title=title)
+    fig.tight_layout()
+    save_figure(fig, path)
+    return fig
@@ -0,0 +1,154 @@
+import random
+from .graph import Graph
+from .production import Production
+from .transaction import UndoLog
+
+# polityki wyboru produkcji w RewritingSystem
+POLICY_PRIORITY = "priority"        # pierwsza (wg kolejności na liście) produkcja, która pasuje
+POLICY_ROUND_ROBIN = "round_robin"  # produkcje po kolei, z pominięciem tych bez dopasowań
+POLICY_RANDOM = "random"            # losowa produkcja i losowe dopasowanie (z ziarnem)
+
+
+class _MatchSet:
+    # zbiór dopasowań z dodawaniem, usuwaniem i losowaniem w O(1)
+    def __init__(self):
+        self.items = []
+        self.index = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def add(self, key):
+        if key not in self.index:
+            self.index[key] = len(self.items)
+            self.items.append(key)
+
+    def discard(self, key):
+        i = self.index.pop(key, None)
+        if i is None:
+            return
+        last = self.items.pop()
+        if i < len(self.items):
+            self.items[i] = last
+            self.index[last] = i
+
+
+class RewritingSystem:
+    """
+    Stosuje zbiór produkcji do grafu, dopóki któraś z nich pasuje.
+    Dopasowania są aktualizowane przyrostowo, od zmienionych wierzchołków.
+    """
+
+    def __init__(self, productions: list[Production], policy: str = POLICY_PRIORITY, seed=None, transform_positions: bool = False):
+        if policy not in (POLICY_PRIORITY, POLICY_ROUND_ROBIN, POLICY_RANDOM):
+            raise ValueError(f"Nieznana polityka: {policy}")
+        self.productions = list(productions)
+        self.policy = policy
+        self.rng = random.Random(seed)
+        self.transform_positions = transform_positions
+        self.graph = None
+        self.history = []
+        self._matches = [_MatchSet() for _ in self.productions]
+        # wierzchołek G -> dopasowania (numer produkcji, krotka), które go zawierają
+        self._by_node = {}
+        self._next = 0
+
+    # --- utrzymanie zbioru dopasowań -------------------------------------
+
+    def _add_match(self, i, key):
+        if key in self._matches[i]:
+            return
+        self._matches[i].add(key)
+        for node in key:
+            self._by_node.setdefault(node, set()).add((i, key))
+
+    def _drop_match(self, i, key):
+        self._matches[i].discard(key)
+        for node in key:
+            owners = self._by_node.get(node)
+            if owners is not None:
+                owners.discard((i, key))
+                if not owners:
+                    del self._by_node[node]
+
+    def reset(self, graph: Graph):
+        """Ustawia graf roboczy (modyfikowany w miejscu) i wyszukuje wszystkie dopasowania od zera."""
+        self.graph = graph
+        self.history = []
+        self._matches = [_MatchSet() for _ in self.productions]
+        self._by_node = {}
+        self._next = 0
+        for i, production in enumerate(self.productions):
+            for match in production.find_matches(graph):
+                self._add_match(i, tuple(match))
+
+    def _update(self, touched):
+        for node in touched:
+            for i, key in list(self._by_node.get(node, ())):
+                self._drop_match(i, key)
+        anchors = [node for node in touched if self.graph.has_node(node)]
+        if not anchors:
+            return
+        for i, production in enumerate(self.productions):
+            for match in production.find_matches(self.graph, anchors=anchors):
+                self._add_match(i, tuple(match))
+
+    def matches(self, i: int) -> list:
+        """Aktualne dopasowania i-tej produkcji."""
+        return [list(key) for key in self._matches[i].items]
+
+    def has_matches(self) -> bool:
+        return any(len(m) for m in self._matches)
+
+    # --- wybór i wykonanie kroku -----------------------------------------
+
+    def _choose(self):
+        candidates = [i for i, m in enumerate(self._matches) if len(m)]
+        if not candidates:
+            return None
+        if self.policy == POLICY_PRIORITY:
+            i = candidates[0]
+        elif self.policy == POLICY_ROUND_ROBIN:
+            n = len(self.productions)
+            i = min(candidates, key=lambda k: (k - self._next) % n)
+            self._next = (i + 1) % n
+        else:
+            i = self.rng.choice(candidates)
+        items = self._matches[i].items
+        if self.policy == POLICY_RANDOM:
+            key = items[self.rng.randrange(len(items))]
+        else:
+            key = items[0]
+        return i, key
+
+    def step(self) -> bool:
+        """Wykonuje jeden krok. Zwraca False, jeśli żadna produkcja nie pasuje."""
+        if self.graph is None:
+            raise Exception("Brak grafu - najpierw wywołaj reset(graph).")
+        choice = self._choose()
+        if choice is None:
+            return False
+        i, key = choice
+        log = UndoLog(self.graph)
+        self.productions[i].apply(self.graph, list(key), transform_positions=self.transform_positions,
+                                  inplace=True, undo_log=log)
+        self.history.append((i, list(key)))
+        self._update(log.touched_nodes())
+        return True
+
+    def run(self, graph: Graph | None = None, max_steps: int | None = None) -> Graph:
+        """
+        Wykonuje kroki aż żadna produkcja nie pasuje (albo do max_steps).
+        Graf jest modyfikowany w miejscu; kolejne kroki są w self.history.
+        """
+        if graph is not None:
+            self.reset(graph)
+        steps = 0
+        while max_steps is None or steps < max_steps:
+            if not self.step():
+                break
+            steps += 1
+        return self.graph
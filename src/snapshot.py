@@ -0,0 +1,54 @@
+import json
+import os
+import pickle
+import numpy as np
+from .graph import Graph
+from .array_graph import ArrayGraph
+
+SNAPSHOT_FORMAT = 2
+SNAPSHOT_META = "meta.json"
+# tablica etykiet (LabelTable) - pickle, bo etykiety mogą być krotkami itp., których JSON nie odtworzy
+SNAPSHOT_LABELS = "labels.pkl"
+
+
+def save_snapshot(graph: Graph, path: str):
+    """Zapisuje graf jako katalog .npy, labels.pkl i meta.json; graf się nie zmienia."""
+    if not isinstance(graph, ArrayGraph):
+        graph = ArrayGraph.from_graph(graph)
+    arrays = graph.to_arrays()
+    os.makedirs(path, exist_ok=True)
+    for name, arr in arrays.items():
+        np.save(os.path.join(path, name + ".npy"), np.ascontiguousarray(arr))
+    with open(os.path.join(path, SNAPSHOT_LABELS), 'wb') as f:
+        pickle.dump(list(graph._labels.values), f)
+    meta = {
+        "format": SNAPSHOT_FORMAT,
+        "arrays": sorted(arrays),
+        "placement": graph.placement,
+    }
+    # meta.json zapisywany na końcu - jego obecność oznacza kompletny zrzut
+    tmp = os.path.join(path, SNAPSHOT_META + ".tmp")
+    with open(tmp, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(path, SNAPSHOT_META))
+
+
+def load_snapshot(path: str, mmap: bool = True) -> ArrayGraph:
+    """Wczytuje zrzut jako ArrayGraph; przy mmap=True tablice są mapowane (kopiowanie przy zapisie)."""
+    meta_path = os.path.join(path, SNAPSHOT_META)
+    if not os.path.exists(meta_path):
+        raise Exception(f"Brak zrzutu grafu w katalogu {path}.")
+    with open(meta_path, 'r') as f:
+        meta = json.load(f)
+    if meta.get("format") == 1:
+        # wersja 1 trzymała etykiety w meta.json
+        labels = meta["labels"]
+    elif meta.get("format") == SNAPSHOT_FORMAT:
+        with open(os.path.join(path, SNAPSHOT_LABELS), 'rb') as f:
+            labels = pickle.load(f)
+    else:
+        raise Exception(f"Nieobsługiwana wersja zrzutu grafu: {meta.get('format')}.")
+    mode = "c" if mmap else None
+    arrays = {name: np.load(os.path.join(path, name + ".npy"), mmap_mode=mode)
+              for name in meta["arrays"]}
+    return ArrayGraph.from_arrays(arrays, labels, placement=meta["placement"])
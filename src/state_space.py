@@ -0,0 +1,395 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import networkx as nx
+from .graph import Graph, PLACEMENT_LOCAL, label_key
+
+# strategie przeglądania przestrzeni stanów
+STRATEGY_BFS = "bfs"
+STRATEGY_DFS = "dfs"
+
+WL_ITERATIONS = 3
+# ile stanów z granicy jest rozwijanych naraz (jedna porcja dla puli procesów)
+EXPAND_BATCH = 64
+
+
+# --- kanoniczny skrót (Weisfeiler-Lehman) --------------------------------
+
+def encode_state(graph: Graph):
+    """Zwarty, serializowalny zapis struktury grafu (bez pozycji i indeksów)."""
+    nodes = tuple(graph.nodes())
+    labels = tuple((n, lbl) for n in nodes if (lbl := graph.get_labels(n)))
+    edge_labels = tuple((e, lbl) for e, lbl in graph.edge_labels.items() if lbl)
+    return nodes, tuple(graph.edges()), labels, edge_labels
+
+
+def decode_state(state) -> Graph:
+    nodes, edges, labels, edge_labels = state
+    # bez układu - stany nie są rysowane, pozycje policzą się dopiero przy odczycie pos
+    return Graph(vertices=nodes, edges=edges, vertex_labels=dict(labels) or None,
+                 edge_labels=dict(edge_labels) or None, placement=PLACEMENT_LOCAL,
+                 lazy_pos=True)
+
+
+def _digest(*parts) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part)
+    return h.digest()
+
+
+def _key_bytes(label) -> bytes:
+    # repr zamiast hash(): skrót musi być taki sam w każdym procesie
+    return repr(label_key(label)).encode()
+
+
+def wl_colours(state, iterations: int = WL_ITERATIONS) -> dict:
+    """Kolory wierzchołków po iterations krokach uściślania WL (z etykietami)."""
+    nodes, edges, labels, edge_labels = state
+    label = dict(labels)
+    edge_label = dict(edge_labels)
+    succ = {n: [] for n in nodes}
+    pred = {n: [] for n in nodes}
+    for u, v in edges:
+        succ[u].append(v)
+        pred[v].append(u)
+
+    colour = {n: _digest(_key_bytes(label.get(n)), b"%d,%d" % (len(succ[n]), len(pred[n])))
+              for n in nodes}
+    classes = len(set(colour.values()))
+    for _ in range(iterations):
+        new = {}
+        for n in nodes:
+            out = sorted(_key_bytes(edge_label.get((n, m))) + colour[m] for m in succ[n])
+            inc = sorted(_key_bytes(edge_label.get((m, n))) + colour[m] for m in pred[n])
+            new[n] = _digest(colour[n], b">", b"".join(out), b"<", b"".join(inc))
+        colour = new
+        refined = len(set(colour.values()))
+        if refined == classes:
+            break
+        classes = refined
+    return colour
+
+
+def _state_hash(state, colours) -> bytes:
+    nodes, edges = state[0], state[1]
+    return _digest(b"%d,%d" % (len(nodes), len(edges)), b"".join(sorted(colours.values())))
+
+
+def canonical_hash(graph: Graph, iterations: int = WL_ITERATIONS) -> str:
+    """
+    Skrót niezmienniczy względem izomorfizmu (z etykietami wierzchołków i krawędzi).
+    Grafy izomorficzne mają zawsze ten sam skrót; różne mogą go mieć wyjątkowo.
+    """
+    state = encode_state(graph)
+    return _state_hash(state, wl_colours(state, iterations)).hex()
+
+
+def _nx_state(state, colours):
+    nodes, edges, _, edge_labels = state
+    G = nx.DiGraph()
+    G.add_nodes_from((n, {"c": colours[n]}) for n in nodes)
+    edge_label = dict(edge_labels)
+    G.add_edges_from((u, v, {"label": label_key(edge_label.get((u, v)))}) for u, v in edges)
+    return G
+
+
+def _isomorphic_states(a, b, iterations) -> bool:
+    if a == b:
+        return True
+    colours_a = wl_colours(a, iterations)
+    colours_b = wl_colours(b, iterations)
+    # kolor WL zawiera etykietę, więc porównanie kolorów wystarcza dla wierzchołków
+    return nx.is_isomorphic(_nx_state(a, colours_a), _nx_state(b, colours_b),
+                            node_match=lambda x, y: x["c"] == y["c"],
+                            edge_match=lambda x, y: x["label"] == y["label"])
+
+
+def are_isomorphic(G1: Graph, G2: Graph, iterations: int = WL_ITERATIONS) -> bool:
+    """Dokładne sprawdzenie izomorfizmu z zachowaniem etykiet (VF2 z kolorami WL)."""
+    return _isomorphic_states(encode_state(G1), encode_state(G2), iterations)
+
+
+# --- przechowywanie stanów i granicy --------------------------------------
+
+class _StateStore:
+    # zakodowane stany: w pamięci albo dopisywane do pliku (w pamięci tylko przesunięcia)
+    def __init__(self, path=None):
+        self.path = path
+        self.offsets = array('q')
+        self.states = [] if path is None else None
+        self.file = open(path, 'w+b') if path is not None else None
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def add(self, state) -> int:
+        i = len(self.offsets)
+        if self.file is None:
+            self.states.append(state)
+            self.offsets.append(i)
+        else:
+            self.file.seek(0, os.SEEK_END)
+            self.offsets.append(self.file.tell())
+            pickle.dump(state, self.file, protocol=pickle.HIGHEST_PROTOCOL)
+        return i
+
+    def get(self, i: int):
+        if self.file is None:
+            return self.states[i]
+        self.file.seek(self.offsets[i])
+        return pickle.load(self.file)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            os.remove(self.path)
+
+
+class _TransitionStore(_StateStore):
+    # przejścia (stan, produkcja, dopasowanie, stan docelowy) - jak stany, przy spill_dir w pliku
+    def append(self, transition):
+        self.add(transition)
+
+    def __getitem__(self, i: int):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.get(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.get(i)
+
+
+class _Frontier:
+    """Kolejka (bfs) albo stos (dfs) numerów stanów; nadmiar ponad limit trafia do pliku."""
+
+    def __init__(self, strategy, limit, path=None):
+        self.lifo = strategy == STRATEGY_DFS
+        self.limit = max(1, limit)
+        self.path = path
+        self.memory = deque()
+        self.tail = []       # bfs: elementy czekające za blokami z pliku
+        self.file = None
+        self.blocks = deque()  # (przesunięcie, liczba) bloków zapisanych w pliku
+        self.spilled = 0
+
+    def __len__(self):
+        return len(self.memory) + len(self.tail) + self.spilled
+
+    def _spill(self, items):
+        if self.file is None:
+            self.file = tempfile.TemporaryFile() if self.path is None else open(self.path, 'w+b')
+        self.file.seek(0, os.SEEK_END)
+        self.blocks.append((self.file.tell(), len(items)))
+        self.spilled += len(items)
+        array('q', items).tofile(self.file)
+
+    def _load(self, block):
+        offset, n = block
+        self.file.seek(offset)
+        items = array('q')
+        items.fromfile(self.file, n)
+        self.spilled -= n
+        if not self.blocks:
+            self.file.truncate(0)
+        elif self.lifo:
+            self.file.truncate(offset)
+        return items
+
+    def push(self, item: int):
+        if self.lifo:
+            self.memory.append(item)
+            if len(self.memory) > self.limit:
+                # na dysk idzie dolna połowa stosu - wróci, gdy górna się wyczerpie
+                half = len(self.memory) // 2
+                self._spill([self.memory.popleft() for _ in range(half)])
+        elif self.tail or self.blocks or len(self.memory) >= self.limit:
+            # bfs: gdy cokolwiek czeka za pamięcią, nowe elementy stają za tym
+            self.tail.append(item)
+            if len(self.tail) >= self.limit:
+                self._spill(self.tail)
+                self.tail = []
+        else:
+            self.memory.append(item)
+
+    def pop(self) -> int:
+        if self.lifo:
+            if not self.memory:
+                self.memory.extend(self._load(self.blocks.pop()))
+            return self.memory.pop()
+        if not self.memory:
+            if self.blocks:
+                self.memory.extend(self._load(self.blocks.popleft()))
+            else:
+                self.memory.extend(self.tail)
+                self.tail = []
+        return self.memory.popleft()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            if self.path is not None:
+                os.remove(self.path)
+
+
+# --- eksploracja ------------------------------------------------------------
+
+class StateSpace:
+    """Wynik eksploracji: stany (0 = graf startowy), głębokości, przejścia i stany końcowe."""
+
+    def __init__(self, store, iterations, transitions=None):
+        self._store = store
+        self.iterations = iterations
+        self.depth = array('i')
+        self.parent = array('q')
+        self.transitions = transitions if transitions is not None else _TransitionStore()
+        self.terminal = []
+        self.truncated = False
+        self.isomorphism_checks = 0
+        self._by_hash = {}  # skrót -> numery stanów (więcej niż jeden tylko przy kolizji)
+
+    def __len__(self):
+        return len(self.depth)
+
+    def state(self, i: int) -> Graph:
+        """Graf i-tego stanu (odtworzony z zapisu)."""
+        return decode_state(self._store.get(i))
+
+    def trace(self, i: int) -> list[int]:
+        """Numery stanów na ścieżce od grafu startowego do i-tego stanu."""
+        path = [i]
+        while self.parent[path[-1]] >= 0:
+            path.append(self.parent[path[-1]])
+        return path[::-1]
+
+    def _find(self, state, digest):
+        for i in self._by_hash.get(digest, ()):
+            self.isomorphism_checks += 1
+            if _isomorphic_states(state, self._store.get(i), self.iterations):
+                return i
+        return None
+
+    def _add(self, state, digest, depth, parent) -> int:
+        i = self._store.add(state)
+        self._by_hash.setdefault(digest, []).append(i)
+        self.depth.append(depth)
+        self.parent.append(parent)
+        return i
+
+    def close(self):
+        """Usuwa pliki tymczasowe (przy spill_dir) - potem state() i transitions nie działają."""
+        self._store.close()
+        self.transitions.close()
+
+
+class StateSpaceExplorer:
+    """
+    Przegląd grafów osiągalnych przez produkcje, bez powtórzeń stanów izomorficznych.
+    spill_dir: stany, przejścia i nadmiar granicy w plikach; w pamięci zostaje
+    ok. 200 B na stan i 8 B na przejście.
+    """
+
+    def __init__(self, productions, strategy: str = STRATEGY_BFS, max_depth: int | None = None,
+                 max_states: int | None = None, iterations: int = WL_ITERATIONS,
+                 spill_dir: str | None = None, frontier_limit: int = 100000,
+                 workers: int | None = None, batch_size: int = EXPAND_BATCH,
+                 record_transitions: bool = True):
+        if strategy not in (STRATEGY_BFS, STRATEGY_DFS):
+            raise ValueError(f"Nieznana strategia: {strategy}")
+        self.productions = list(productions)
+        self.strategy = strategy
+        self.max_depth = max_depth
+        self.max_states = max_states
+        self.iterations = iterations
+        self.spill_dir = spill_dir
+        self.frontier_limit = frontier_limit
+        self.workers = workers
+        self.batch_size = batch_size
+        self.record_transitions = record_transitions
+
+    def explore(self, start: Graph) -> StateSpace:
+        store_path = frontier_path = transitions_path = None
+        if self.spill_dir is not None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            store_path = os.path.join(self.spill_dir, "states.bin")
+            frontier_path = os.path.join(self.spill_dir, "frontier.bin")
+            transitions_path = os.path.join(self.spill_dir, "transitions.bin")
+        space = StateSpace(_StateStore(store_path), self.iterations,
+                           _TransitionStore(transitions_path))
+        frontier = _Frontier(self.strategy, self.frontier_limit, frontier_path)
+
+        state = encode_state(start)
+        root = space._add(state, _state_hash(state, wl_colours(state, self.iterations)), 0, -1)
+        if self.max_depth is None or self.max_depth > 0:
+            frontier.push(root)
+
+        executor = None
+        if self.workers is not None and self.workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_explore_worker,
+                                           initargs=(self.productions, self.iterations))
+            mapper = executor.map
+        else:
+            _init_explore_worker(self.productions, self.iterations)
+            mapper = map
+        try:
+            while len(frontier) and not space.truncated:
+                batch = [frontier.pop() for _ in range(min(self.batch_size, len(frontier)))]
+                results = mapper(_expand, [space._store.get(i) for i in batch])
+                for source, children in zip(batch, results):
+                    self._merge(space, frontier, source, children)
+                    if space.truncated:
+                        break
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+            frontier.close()
+        return space
+
+    def _merge(self, space, frontier, source, children):
+        if not children:
+            space.terminal.append(source)
+            return
+        depth = space.depth[source] + 1
+        for i, mapping, state, digest in children:
+            target = space._find(state, digest)
+            if target is None:
+                if self.max_states is not None and len(space) >= self.max_states:
+                    space.truncated = True
+                    return
+                target = space._add(state, digest, depth, source)
+                if self.max_depth is None or depth < self.max_depth:
+                    frontier.push(target)
+            if self.record_transitions:
+                space.transitions.append((source, i, mapping, target))
+
+
+# stan procesu rozwijającego stany (ustawiany raz w inicjalizatorze puli)
+_explore_worker = {}
+
+
+def _init_explore_worker(productions, iterations):
+    _explore_worker["productions"] = productions
+    _explore_worker["iterations"] = iterations
+
+
+def _expand(state):
+    # wszystkie następniki stanu: (numer produkcji, dopasowanie, stan, skrót)
+    productions = _explore_worker["productions"]
+    iterations = _explore_worker["iterations"]
+    graph = decode_state(state)
+    children = []
+    for i, production in enumerate(productions):
+        for mapping in production.find_matches(graph):
+            child = encode_state(production.apply(graph, mapping))
+            children.append((i, tuple(mapping), child,
+                             _state_hash(child, wl_colours(child, iterations))))
+    return children
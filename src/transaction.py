@@ -0,0 +1,188 @@
+from .graph import Graph
+
+
+class UndoLog:
+    """Dziennik zmian grafu w miejscu (te same metody co Graph); rollback() cofa je w O(operacji)."""
+
+    def __init__(self, graph: Graph):
+        self.graph = graph
+        self.ops = []
+
+    def __len__(self):
+        return len(self.ops)
+
+    # --- operacje zapisywane w dzienniku ---------------------------------
+
+    def add_node(self, node, index=None, label=None, pos=None):
+        existed = self.graph.has_node(node)
+        self.graph.add_node(node, index=index, label=label, pos=pos)
+        if not existed:
+            self.ops.append(("add_node", node))
+
+    def add_edge(self, u, v, index=None, label=None):
+        for node in (u, v):
+            if not self.graph.has_node(node):
+                # add_edge dodaje brakujące wierzchołki tak jak nx.DiGraph
+                self.ops.append(("add_node", node))
+        if self.graph.has_edge(u, v):
+            self.ops.append(("set_edge", u, v, self._edge_attrs(u, v)))
+        else:
+            self.ops.append(("add_edge", u, v))
+        self.graph.add_edge(u, v, index=index, label=label)
+
+    def remove_edge(self, u, v):
+        attrs = self._edge_attrs(u, v)
+        self.graph.remove_edge(u, v)
+        self.ops.append(("remove_edge", u, v, attrs))
+
+    def remove_node(self, node):
+        G = self.graph
+        out_edges = [(node, v, self._edge_attrs(node, v))
+                     for v in G.successors(node)]
+        in_edges = [(u, node, self._edge_attrs(u, node))
+                    for u in G.predecessors(node) if u != node]
+        pos = None
+        if G.pos_computed and node in G.pos:
+            pos = list(G.pos[node])
+        entry = ("remove_node", node, G.get_labels(node), G.get_idx(node),
+                 pos, out_edges + in_edges)
+        G.remove_node(node)
+        self.ops.append(entry)
+
+    def set_label(self, node, label):
+        self.ops.append(("set_label", node, self.graph.get_labels(node)))
+        self.graph.set_label(node, label)
+
+    def set_pos(self, node, pos):
+        G = self.graph
+        old = list(G.pos[node]) if node in G.pos else None
+        self.ops.append(("set_pos", node, old))
+        G.pos[node] = list(pos)
+
+    def _edge_attrs(self, u, v):
+        return (self.graph.edge_labels.get((u, v)), self.graph.edge_idx.get((u, v)))
+
+    # --- podsumowanie zmian ----------------------------------------------
+
+    def added_nodes(self):
+        # kolejność operacji ma znaczenie: po usunięciu wierzchołka o największym
+        # numerze next_node_id() zwraca ten sam numer dla nowego wierzchołka
+        added = {}
+        for op in self.ops:
+            if op[0] == "add_node":
+                added[op[1]] = None
+            elif op[0] == "remove_node":
+                added.pop(op[1], None)
+        return list(added)
+
+    def removed_nodes(self):
+        # wierzchołki istniejące przed zmianami (dodane i usunięte w dzienniku są pomijane)
+        new = set()
+        removed = []
+        for op in self.ops:
+            if op[0] == "add_node":
+                new.add(op[1])
+            elif op[0] == "remove_node":
+                if op[1] in new:
+                    new.discard(op[1])
+                else:
+                    removed.append(op[1])
+        return removed
+
+    def added_edges(self):
+        # bez powtórzeń, gdy krawędź była dodana, usunięta i dodana ponownie
+        added = {(op[1], op[2]): None for op in self.ops if op[0] == "add_edge"}
+        return [e for e in added if self.graph.has_edge(*e)]
+
+    def removed_edges(self):
+        # krawędzie istniejące przed zmianami (jak w removed_nodes - dodane
+        # i usunięte w dzienniku są pomijane), także usunięte razem z wierzchołkiem
+        new = set()
+        removed = {}
+        for op in self.ops:
+            if op[0] == "add_edge":
+                new.add((op[1], op[2]))
+                continue
+            if op[0] == "remove_edge":
+                edges = [(op[1], op[2])]
+            elif op[0] == "remove_node":
+                edges = [(u, v) for u, v, _ in op[5]]
+            else:
+                continue
+            for e in edges:
+                if e in new:
+                    new.discard(e)
+                else:
+                    removed[e] = None
+        return list(removed)
+
+    def touched_nodes(self) -> set:
+        """
+        Wierzchołki, których sąsiedztwo, stopień albo etykieta zmieniły się
+        (łącznie z dodanymi i usuniętymi). Pozycje nie są brane pod uwagę.
+        """
+        touched = set()
+        for op in self.ops:
+            kind = op[0]
+            if kind in ("add_node", "set_label"):
+                touched.add(op[1])
+            elif kind in ("add_edge", "remove_edge", "set_edge"):
+                touched.add(op[1])
+                touched.add(op[2])
+            elif kind == "remove_node":
+                touched.add(op[1])
+                for u, v, _ in op[5]:
+                    touched.add(u)
+                    touched.add(v)
+        return touched
+
+    # --- cofanie ---------------------------------------------------------
+
+    def _restore_edge(self, u, v, attrs):
+        label, index = attrs
+        self.graph.add_edge(u, v, index=index, label=label)
+
+    def savepoint(self) -> int:
+        """Znacznik bieżącego miejsca w dzienniku, do użycia w rollback(savepoint)."""
+        return len(self.ops)
+
+    def rollback(self, savepoint: int = 0):
+        """Cofa operacje zapisane po savepoint (w odwrotnej kolejności) i usuwa je z dziennika."""
+        G = self.graph
+        for op in reversed(self.ops[savepoint:]):
+            kind = op[0]
+            if kind == "add_node":
+                if G.has_node(op[1]):
+                    G.remove_node(op[1])
+            elif kind == "add_edge":
+                if G.has_edge(op[1], op[2]):
+                    G.remove_edge(op[1], op[2])
+            elif kind in ("remove_edge", "set_edge"):
+                _, u, v, attrs = op
+                if kind == "set_edge":
+                    G.remove_edge(u, v)
+                self._restore_edge(u, v, attrs)
+            elif kind == "remove_node":
+                _, node, label, idx, pos, edges = op
+                G.add_node(node, index=idx, pos=(pos if pos is not None else [0.0, 0.0]))
+                if label is not None:
+                    G.set_label(node, label)
+                if pos is None and G.pos_computed:
+                    G.pos.pop(node, None)
+                for u, v, attrs in edges:
+                    self._restore_edge(u, v, attrs)
+            elif kind == "set_label":
+                _, node, old = op
+                if G.has_node(node):
+                    G.set_label(node, old)
+            elif kind == "set_pos":
+                _, node, old = op
+                if old is None:
+                    G.pos.pop(node, None)
+                else:
+                    G.pos[node] = old
+        del self.ops[savepoint:]
+
+    def commit(self):
+        """Zatwierdza zmiany - dziennik jest czyszczony, cofnięcie nie będzie możliwe."""
+        self.ops = []
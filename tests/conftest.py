@@ -0,0 +1,69 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src as dp  # noqa: E402
+
+GRAPHS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "graphs", "graphs_obj")
+
+
+def id_reuse_case():
+    """
+    Produkcja usuwa wierzchołek o największym numerze i dodaje nowy - nowy
+    dostaje ten sam numer (next_node_id() = max + 1). Zwraca (produkcja, G, odwzorowanie).
+    """
+    L = dp.Graph(vertices=[1, 2], edges=[(1, 2)], vertex_labels={1: "a"})
+    R = dp.Graph(vertices=[1, 3], edges=[(1, 3)], vertex_labels={1: "a", 3: "b"})
+    G = dp.Graph(vertices=[1, 2, 3], edges=[(1, 3), (1, 2)], vertex_labels={1: "a", 2: "x", 3: "y"})
+    return dp.Production(L, R), G, [1, 3]
+
+
+def obj_production(left: str, right: str):
+    return dp.Production(dp.Graph.from_obj(os.path.join(GRAPHS, left)),
+                         dp.Graph.from_obj(os.path.join(GRAPHS, right)))
+
+
+def obj_graph(name: str):
+    return dp.Graph.from_obj(os.path.join(GRAPHS, name))
+
+
+def example_productions():
+    return [obj_production("production_left.obj", "production_right.obj"),
+            obj_production("production_left2.obj", "production_right2.obj")]
+
+
+def random_graph(seed, n=10, m=18, cls=None):
+    """Losowy graf bez etykiet o n wierzchołkach i m krawędziach (bez pętli)."""
+    rng = random.Random(seed)
+    edges = set()
+    while len(edges) < m:
+        u, v = rng.randrange(1, n + 1), rng.randrange(1, n + 1)
+        if u != v:
+            edges.add((u, v))
+    cls = cls or dp.Graph
+    return cls(vertices=list(range(1, n + 1)), edges=sorted(edges), lazy_pos=True)
+
+
+def is_valid(production, G, mapping) -> bool:
+    try:
+        production.validate(G, mapping)
+    except Exception:
+        return False
+    return True
+
+
+def same_graph(A, B):
+    """Te same wierzchołki, krawędzie i etykiety."""
+    assert set(A.nodes()) == set(B.nodes())
+    assert set(A.edges()) == set(B.edges())
+    for node in A.nodes():
+        assert A.get_labels(node) == B.get_labels(node), node
+
+
+@pytest.fixture
+def id_reuse():
+    return id_reuse_case()
@@ -0,0 +1,16 @@
+import src as dp
+from conftest import same_graph, obj_graph, example_productions, random_graph
+
+
+def test_array_graph_apply_equals_graph_apply():
+    for seed in range(5):
+        G = random_graph(seed)
+        A = random_graph(seed, cls=dp.ArrayGraph)
+        for production in example_productions():
+            for mapping in list(production.find_matches(G))[:5]:
+                same_graph(production.apply(A, mapping), production.apply(G, mapping))
+
+
+def test_from_graph_keeps_structure():
+    for name in ("initial_graph.obj", "initial2_graph.obj", "graph.obj"):
+        same_graph(dp.ArrayGraph.from_graph(obj_graph(name)), obj_graph(name))
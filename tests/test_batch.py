@@ -0,0 +1,78 @@
+import io
+import json
+
+import src as dp
+from src.batch import BatchRunner
+from conftest import same_graph, obj_production, GRAPHS
+
+
+def _snapshots(tmp_path, production, G):
+    paths = {}
+    for name, graph in (("graph", G), ("left", production.L), ("right", production.R)):
+        paths[name] = str(tmp_path / name)
+        graph.save_snapshot(paths[name])
+    return paths
+
+
+def test_batch_counts_match_apply(id_reuse, tmp_path):
+    production, G, mapping = id_reuse
+    job = dict(_snapshots(tmp_path, production, G), id=1, mappings=[mapping, [1, 2], [2, 1]])
+    out = io.StringIO()
+    runner = BatchRunner()
+    runner.run([job], out)
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["ok"] for r in results] == [True, True, False]
+    for r in results[:2]:
+        expected = production.apply(G, r["mapping"])
+        assert r["nodes"] == expected.number_of_nodes()
+        assert r["edges"] == expected.number_of_edges()
+    # graf w pamięci podręcznej po cofnięciu zmian
+    cached = runner.graph(job["graph"])
+    same_graph(cached, G)
+    assert cached.next_node_id() == G.next_node_id()
+
+
+def test_batch_output_snapshot_matches_apply(tmp_path):
+    production = obj_production("production_left.obj", "production_right.obj")
+    G = dp.Graph.from_obj(f"{GRAPHS}/initial_graph.obj")
+    mappings = list(production.find_matches(G, limit=3))
+    job = {"id": 7, "graph": f"{GRAPHS}/initial_graph.obj",
+           "left": f"{GRAPHS}/production_left.obj", "right": f"{GRAPHS}/production_right.obj",
+           "mappings": mappings, "output": str(tmp_path / "out_{job}_{line}")}
+    out = io.StringIO()
+    BatchRunner().run([job], out)
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert len(results) == len(mappings) and all(r["ok"] for r in results)
+    for r in results:
+        same_graph(dp.Graph.load_snapshot(r["output"]), production.apply(G, r["mapping"]))
+
+
+def test_failed_job_does_not_change_later_results(tmp_path, monkeypatch):
+    L = dp.Graph(vertices=[1], edges=[], vertex_labels={1: "a"})
+    R = dp.Graph(vertices=[1, 2], edges=[(1, 2)], vertex_labels={1: "a", 2: "b"})
+    production = dp.Production(L, R)
+    G = dp.Graph(vertices=[1, 2, 3], edges=[(1, 2)], vertex_labels={1: "a"})
+    job = dict(_snapshots(tmp_path, production, G), id=1, mappings=[[1]])
+    out = io.StringIO()
+    BatchRunner().run([job], out)
+    expected = json.loads(out.getvalue())
+
+    relax = dp.Graph.relax_local
+    calls = []
+
+    def failing_once(self, *args, **kwargs):
+        # błąd po przydzieleniu numerów nowym wierzchołkom (po _rewrite)
+        calls.append(None)
+        if len(calls) == 1:
+            raise Exception("błąd po _rewrite")
+        return relax(self, *args, **kwargs)
+
+    monkeypatch.setattr(dp.Graph, "relax_local", failing_once)
+    out = io.StringIO()
+    runner = BatchRunner()
+    runner.run([job, job], out)
+    failed, result = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert not failed["ok"] and result["ok"]
+    for key in ("nodes", "edges", "added_nodes", "added_edges"):
+        assert result[key] == expected[key]
+    same_graph(runner.graph(job["graph"]), G)
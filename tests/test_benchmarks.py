@@ -0,0 +1,51 @@
+import json
+
+import numpy as np
+
+import src as dp
+from benchmarks import run as bench
+from benchmarks.generators import GENERATORS
+
+
+def test_generators_are_seeded_and_round_trip_through_obj(tmp_path):
+    for kind, generate in GENERATORS.items():
+        synthetic = generate(100, seed=3)
+        assert np.array_equal(synthetic.edges, generate(100, seed=3).edges)
+        edges = set(map(tuple, synthetic.edges.tolist()))
+        assert len(edges) == synthetic.m and all(u != v for u, v in edges)
+        G = synthetic.to_graph(dp.Graph)
+        assert G.number_of_nodes() == synthetic.n
+        path = str(tmp_path / f"{kind}.obj")
+        synthetic.write_obj(path)
+        loaded = dp.Graph.from_obj(path, lazy_pos=True)
+        assert set(loaded.nodes()) == set(G.nodes()) and set(loaded.edges()) == set(G.edges())
+        # .obj bez etykiet daje [] zamiast None
+        assert all((loaded.get_labels(v) or None) == G.get_labels(v) for v in G.nodes())
+
+
+def test_every_production_is_measured_on_every_graph(tmp_path):
+    runner = bench.Runner(repeat=1, backend="graph", limits={"draw": 0, "layout": 0, "force_layout": 0},
+                          verbose=False)
+    productions = bench.load_productions()
+    for generate in GENERATORS.values():
+        runner.run_graph(generate(60, seed=0), productions, str(tmp_path))
+    assert not [r for r in runner.results if "error" in r or "skipped" in r]
+    for kind in GENERATORS:
+        measured = {(r["params"]["production"], r["params"]["transform_positions"])
+                    for r in runner.results if r["bench"] == "apply" and r["graph"] == kind}
+        assert measured == {(name, t) for name in productions for t in (False, True)}
+    # "triangle" nie pasuje do generatorów - mierzony na dołożonej kopii L
+    assert all(r["params"].get("planted") for r in runner.results
+               if r["bench"] == "apply" and r["params"]["production"] == "triangle")
+
+
+def test_compare_reports_regressions(tmp_path):
+    def report(path, seconds):
+        entry = {"bench": "apply", "graph": "grid", "n": 10, "m": 1, "params": {}, "min": seconds}
+        with open(path, 'w') as f:
+            json.dump({"results": [entry]}, f)
+        return str(path)
+
+    old = report(tmp_path / "old.json", 1.0)
+    assert bench.compare(old, report(tmp_path / "same.json", 1.1), threshold=0.2) == 0
+    assert bench.compare(old, report(tmp_path / "slow.json", 1.5), threshold=0.2) == 1
@@ -0,0 +1,16 @@
+import itertools
+
+import numpy as np
+
+import src as dp
+from conftest import example_productions, random_graph, is_valid
+
+
+def test_validate_many_equals_validate():
+    for cls in (dp.Graph, dp.ArrayGraph):
+        G = random_graph(2, n=8, m=14, cls=cls)
+        for production in example_productions():
+            k = len(production.compiled.L_nodes_sorted)
+            mappings = np.array(list(itertools.product(G.nodes(), repeat=k)))
+            mask, codes, reasons = production.validate_many(G, mappings)
+            assert mask.tolist() == [is_valid(production, G, list(m)) for m in mappings]
@@ -0,0 +1,89 @@
+import itertools
+import random
+
+import src as dp
+from src.parallel_step import Footprint, ConflictTracker
+from conftest import same_graph, obj_production
+
+
+def _productions():
+    return [
+        obj_production("production_left.obj", "production_right.obj"),
+        obj_production("production_left2.obj", "production_right2.obj"),
+        # usunięcie krawędzi, dodanie krawędzi, usunięcie wierzchołka, nowy wierzchołek
+        dp.Production(dp.Graph(vertices=[1, 2], edges=[(1, 2)]), dp.Graph(vertices=[1, 2], edges=[])),
+        dp.Production(dp.Graph(vertices=[1, 2], edges=[]), dp.Graph(vertices=[1, 2], edges=[(1, 2)])),
+        dp.Production(dp.Graph(vertices=[1, 2], edges=[(1, 2)]), dp.Graph(vertices=[1], edges=[])),
+        dp.Production(dp.Graph(vertices=[1], edges=[]), dp.Graph(vertices=[1, 3], edges=[(1, 3)])),
+    ]
+
+
+def _random_graph(rng, n, m, labels=None):
+    edges = set()
+    while len(edges) < m:
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v:
+            edges.add((u, v))
+    vertex_labels = {v: rng.choice(labels) for v in range(n)} if labels else None
+    return dp.Graph(vertices=list(range(n)), edges=list(edges), vertex_labels=vertex_labels, lazy_pos=True)
+
+
+def test_conflict_table_matches_conflict_tracker():
+    P = _productions()
+    analysis = dp.ProductionAnalysis(P)
+    rng = random.Random(1)
+    for _ in range(10):
+        G = _random_graph(rng, 10, rng.randrange(5, 20))
+        M = [(k, m) for k, p in enumerate(P) for m in p.find_matches(G, limit=20)]
+        for (a, ma), (b, mb) in itertools.product(rng.sample(M, min(len(M), 25)), repeat=2):
+            tracker = ConflictTracker()
+            tracker.add(Footprint(P[b], mb))
+            expected = tracker.conflict_reason(Footprint(P[a], ma)) is None
+            assert (analysis.conflict(a, ma, b, mb) is None) == expected, (a, ma, b, mb)
+
+
+def test_apply_concurrent_matches_sequential_apply():
+    P = _productions()
+    analysis = dp.ProductionAnalysis(P)
+    rng = random.Random(2)
+    for _ in range(10):
+        G = _random_graph(rng, 12, rng.randrange(5, 25))
+        candidates = [(p, m) for p in P for m in p.find_matches(G, limit=20)]
+        output, applied = dp.apply_concurrent(G, P, analysis=analysis, matches=candidates)
+        assert applied == [(fp.production, fp.mapping) for fp in dp.select_independent(G, candidates)]
+        expected = G.copy_structure()
+        for production, mapping in applied:
+            expected = production.apply(expected, mapping)
+        same_graph(output, expected)
+
+
+def test_label_incompatible_matches_still_checked():
+    # validate nie sprawdza etykiet - takie dopasowania nie mają wpisu w tablicy
+    L = dp.Graph(vertices=[1, 2], edges=[], vertex_labels={1: "a", 2: "b"})
+    R = dp.Graph(vertices=[1, 2], edges=[(1, 2)], vertex_labels={1: "a", 2: "b"})
+    production = dp.Production(L, R)
+    G = dp.Graph(vertices=[1, 2], edges=[], vertex_labels={1: "a", 2: "b"})
+    analysis = dp.ProductionAnalysis([production])
+    # [2, 1] dodaje krawędź (2, 1) między wierzchołkami [1, 2], której nie ma w L
+    candidates = [(production, [1, 2]), (production, [2, 1])]
+    assert analysis.conflict(0, [2, 1], 0, [1, 2]) is not None
+    output, applied = dp.apply_concurrent(G, [production], analysis=analysis, matches=candidates)
+    assert applied == [(production, [1, 2])]
+    same_graph(output, production.apply(G, [1, 2]))
+
+
+def test_dependencies_predict_new_matches():
+    P = _productions()
+    analysis = dp.ProductionAnalysis(P)
+    rng = random.Random(3)
+    for _ in range(10):
+        G = _random_graph(rng, 10, rng.randrange(5, 20))
+        for a, production in enumerate(P):
+            mapping = next(iter(production.find_matches(G, limit=1)), None)
+            if mapping is None:
+                continue
+            H = production.apply(G, mapping)
+            for b, other in enumerate(P):
+                before = {tuple(m) for m in other.find_matches(G)}
+                if any(tuple(m) not in before for m in other.find_matches(H)):
+                    assert analysis.depends(a, b), (a, b, mapping)
@@ -0,0 +1,59 @@
+import pytest
+
+import src as dp
+from conftest import same_graph, obj_graph, obj_production
+
+
+def _positions_equal(A, B):
+    for node in A.nodes():
+        assert list(A.pos[node]) == pytest.approx(list(B.pos[node])), node
+
+
+@pytest.mark.parametrize("name", ["log.jsonl", "log.bin"])
+def test_replay_matches_sequential_apply_with_id_reuse(id_reuse, tmp_path, name):
+    production, G, mapping = id_reuse
+    G.pos  # układ startowy liczony przed zrzutem
+    G.save_snapshot(str(tmp_path / "start"))
+    expected = G.copy_structure()
+    path = str(tmp_path / name)
+    with dp.DeltaLog(path) as log:
+        for _ in range(3):
+            expected = production.apply(expected, mapping, transform_positions=True)
+            delta = production.apply_delta(G, mapping, transform_positions=True, inplace=True)
+            assert delta.removed_nodes == [3] and [n for n, *_ in delta.added_nodes] == [3]
+            log.append(delta)
+    replayed = dp.replay(str(tmp_path / "start"), path)
+    same_graph(replayed, expected)
+    assert replayed.get_idx(3) == expected.get_idx(3)
+    assert replayed.pos.get(3) is not None
+    _positions_equal(replayed, expected)
+
+
+def test_replay_matches_apply_on_obj_productions(tmp_path):
+    production = obj_production("production_left.obj", "production_right.obj")
+    G = obj_graph("initial_graph.obj")
+    G.save_snapshot(str(tmp_path / "start"))
+    expected = G.copy_structure()
+    path = str(tmp_path / "log.jsonl")
+    steps = 0
+    with dp.DeltaLog(path) as log:
+        for _ in range(3):
+            mapping = next(iter(production.find_matches(G, limit=1)), None)
+            if mapping is None:
+                break
+            steps += 1
+            expected = production.apply(expected, mapping, transform_positions=True)
+            log.append(production.apply_delta(G, mapping, transform_positions=True, inplace=True))
+    assert steps > 0
+    replayed = dp.replay(str(tmp_path / "start"), path)
+    same_graph(replayed, expected)
+    _positions_equal(replayed, expected)
+
+
+def test_apply_delta_without_inplace_leaves_graph(id_reuse):
+    production, G, mapping = id_reuse
+    before = G.copy_structure()
+    delta = production.apply_delta(G, mapping)
+    same_graph(G, before)
+    assert G.next_node_id() == before.next_node_id()
+    assert delta.mapping == mapping
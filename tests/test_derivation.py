@@ -0,0 +1,31 @@
+import os
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import src as dp  # noqa: E402
+from conftest import same_graph  # noqa: E402
+
+
+def test_recorder_frames_match_apply(id_reuse):
+    production, G, mapping = id_reuse
+    expected = production.apply(G, mapping, transform_positions=True)
+    recorder = dp.DerivationRecorder(G.copy_structure())
+    delta = recorder.apply(production, mapping)
+    assert [n for n, _, _, _ in delta.added_nodes] == [3]
+    frame = recorder.frame_graph(1)
+    same_graph(frame, expected)
+    assert frame.pos[3] == list(recorder.graph.pos[3])
+
+
+def test_render_step_reusing_max_id(id_reuse, tmp_path):
+    production, G, mapping = id_reuse
+    recorder = dp.DerivationRecorder(G)
+    recorder.apply(production, mapping)
+    new_pos = recorder.graph.pos[3]
+    xmin, xmax, ymin, ymax = recorder.bounds()
+    assert xmin <= new_pos[0] <= xmax and ymin <= new_pos[1] <= ymax
+    frames = recorder.render(str(tmp_path / "x.gif"), workers=1)
+    assert len(frames) == 2
+    assert os.path.exists(tmp_path / "x.gif")
@@ -0,0 +1,18 @@
+import src as dp
+from conftest import obj_graph, example_productions
+
+
+def test_indexes_match_brute_force_after_edits():
+    for cls in (dp.Graph, dp.ArrayGraph):
+        G = obj_graph("initial_graph.obj") if cls is dp.Graph else dp.ArrayGraph.from_graph(obj_graph("initial_graph.obj"))
+        production = example_productions()[0]
+        for _ in range(3):
+            mapping = next(iter(production.find_matches(G, limit=1)))
+            production.apply(G, mapping, inplace=True)
+        G.set_label(1, "z")
+        for label in {dp.label_key(G.get_labels(n)) for n in G.nodes()} - {None}:
+            assert sorted(G.nodes_with_label(label)) == sorted(n for n in G.nodes() if dp.label_key(G.get_labels(n)) == label)
+        for d in range(4):
+            assert sorted(G.nodes_with_degree(out_degree=d)) == sorted(n for n in G.nodes() if G.out_degree(n) == d)
+            assert sorted(G.nodes_with_degree(in_degree=d, at_least=True)) == \
+                sorted(n for n in G.nodes() if G.in_degree(n) >= d)
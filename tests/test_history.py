@@ -0,0 +1,20 @@
+import src as dp
+from conftest import same_graph, obj_graph, example_productions
+
+
+def test_history_versions_equal_sequential_apply():
+    production = example_productions()[0]
+    G = obj_graph("initial_graph.obj")
+    expected = [G.copy_structure()]
+    history = dp.GraphHistory(G, transform_positions=False)
+    for _ in range(4):
+        mapping = next(iter(production.find_matches(G, limit=1)))
+        expected.append(production.apply(expected[-1], mapping))
+        history.apply(production, mapping)
+    for k, graph in enumerate(expected):
+        version = history[k]
+        same_graph(version.to_graph(), graph)
+        assert version.number_of_nodes() == graph.number_of_nodes()
+        assert version.number_of_edges() == graph.number_of_edges()
+        for node in graph.nodes():
+            assert sorted(version.successors(node)) == sorted(graph.successors(node))
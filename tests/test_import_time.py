@@ -0,0 +1,13 @@
+from benchmarks.import_time import IMPORT_BUDGET, FORBIDDEN_MODULES, CLI_FORBIDDEN_MODULES, measure_import, measure_cli
+
+
+def test_headless_import_within_budget():
+    times, modules = measure_import(repeat=3)
+    assert min(times) < IMPORT_BUDGET
+    assert not [m for m in FORBIDDEN_MODULES if m in modules]
+
+
+def test_cli_out_does_not_load_pyplot(tmp_path):
+    _, modules = measure_cli(str(tmp_path))
+    assert not [m for m in CLI_FORBIDDEN_MODULES if m in modules]
+    assert (tmp_path / "result.png").exists()
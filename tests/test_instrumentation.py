@@ -0,0 +1,34 @@
+import src as dp
+from conftest import example_productions, obj_graph
+
+
+def test_counters_match_the_applied_step():
+    production = example_productions()[0]
+    G = obj_graph("initial_graph.obj")
+    probe = production.enable_instrumentation()
+    events = []
+    probe.add_hook(lambda kind, name, value: events.append((kind, name)))
+    matches = list(production.find_matches(G))
+    mapping = matches[0]
+    output = production.apply(G, mapping)
+    stats = probe.to_dict()
+    counters = stats["counters"]
+    assert counters["matches_found"] == len(matches)
+    assert counters["candidates_tried"] >= len(matches)
+    # układ liczony w wyniku trafia do tych samych statystyk
+    assert counters["layout_iterations"] > 0
+    added = set(output.nodes()) - set(G.nodes())
+    removed = set(G.nodes()) - set(output.nodes())
+    assert counters.get("nodes_added", 0) == len(added)
+    assert counters.get("nodes_removed", 0) == len(removed)
+    assert counters.get("edges_added", 0) - counters.get("edges_removed", 0) == \
+        output.number_of_edges() - G.number_of_edges()
+    for phase in ("match", "validate", "dangling", "copy"):
+        assert stats["phases"][phase]["calls"] >= 1
+    assert ("count", "matches_found") in events and ("phase", "validate") in events
+    # wyłączona instrumentacja nie zbiera nic
+    production.disable_instrumentation()
+    probe.reset()
+    production.apply(G, mapping)
+    assert probe.to_dict() == {"phases": {}, "counters": {}}
+    assert output.instrumentation is None
@@ -0,0 +1,37 @@
+import numpy as np
+
+from src.layout import _QuadTree, force_layout
+
+
+def _exact(xy, min_d2):
+    d = xy[:, None, :] - xy[None, :, :]
+    r2 = np.maximum((d ** 2).sum(-1), min_d2)
+    np.fill_diagonal(r2, np.inf)
+    return (d / r2[..., None]).sum(1)
+
+
+def test_repulsion_close_to_direct_sum():
+    rng = np.random.default_rng(0)
+    uniform = rng.random((2000, 2))
+    clustered = np.concatenate([rng.normal(0, 0.02, (1500, 2)), rng.random((500, 2))])
+    for xy in (uniform, clustered):
+        tree = _QuadTree(xy)
+        approx = tree.repulsion(xy, np.arange(len(xy)))
+        exact = _exact(xy, tree.min_d2)
+        err = np.linalg.norm(approx - exact, axis=1) / np.linalg.norm(exact, axis=1)
+        assert np.quantile(err, 0.95) < 0.02
+
+
+def test_force_layout_is_seeded_and_untangles_a_grid():
+    side = 30
+    nodes = list(range(side * side))
+    edges = [(i, i + 1) for i in nodes if (i + 1) % side] + [(i, i + side) for i in nodes if i + side < len(nodes)]
+    pos = force_layout(nodes, edges, seed=1)
+    again = force_layout(nodes, edges, seed=1)
+    assert all(np.array_equal(pos[n], again[n]) for n in nodes)
+    P = np.array([pos[n] for n in nodes])
+    edge_len = np.median([np.linalg.norm(P[u] - P[v]) for u, v in edges])
+    rng = np.random.default_rng(0)
+    a, b = rng.integers(0, len(nodes), (2, 5000))
+    # sąsiedzi w siatce blisko siebie w porównaniu z losowymi parami
+    assert edge_len < 0.1 * np.median(np.linalg.norm(P[a] - P[b], axis=1))
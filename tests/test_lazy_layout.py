@@ -0,0 +1,34 @@
+import numpy as np
+
+import src as dp
+from conftest import GRAPHS, example_productions
+
+
+def test_loaders_do_not_compute_layout_until_pos_is_read():
+    for loader, path in ((dp.Graph.from_obj, f"{GRAPHS}/initial_graph.obj"),
+                         (dp.ArrayGraph.from_obj, f"{GRAPHS}/initial_graph.obj")):
+        G = loader(path, lazy_pos=True)
+        assert not G.pos_computed
+        G.layout_seed = 0
+        pos = G.pos
+        assert G.pos_computed and set(pos) == set(G.nodes())
+
+
+def test_apply_keeps_lazy_result_lazy():
+    G = dp.Graph.from_obj(f"{GRAPHS}/initial_graph.obj", lazy_pos=True)
+    production = example_productions()[0]
+    mapping = next(iter(production.find_matches(G, limit=1)))
+    output = production.apply(G, mapping)
+    assert not G.pos_computed and not output.pos_computed
+
+
+def test_transform_positions_on_lazy_graph_keeps_layout():
+    G = dp.Graph.from_obj(f"{GRAPHS}/initial_graph.obj", lazy_pos=True)
+    production = example_productions()[0]
+    mapping = next(iter(production.find_matches(G, limit=1)))
+    output = production.apply(G, mapping, transform_positions=True)
+    # układ policzony dla transformacji jest układem wyniku - stare wierzchołki się nie ruszają
+    assert output.pos_computed
+    for node in output.nodes():
+        if G.has_node(node):
+            assert np.allclose(output.pos[node], G.pos[node])
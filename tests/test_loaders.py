@@ -0,0 +1,47 @@
+import src as dp
+from src.loaders import iter_lines, parse_csv, parse_obj
+
+
+def _write(tmp_path, name, data: bytes):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_iter_lines_skips_blank_lines_and_handles_missing_newline(tmp_path):
+    path = _write(tmp_path, "a.txt", b"  first \r\n\r\n\nsecond\n   \nlast")
+    assert list(iter_lines(path)) == [b"first", b"second", b"last"]
+    assert list(iter_lines(_write(tmp_path, "empty.txt", b""))) == []
+
+
+def test_parse_obj_with_malformed_lines(tmp_path, capsys):
+    path = _write(tmp_path, "g.obj", b"v 1 a\nv 2 b c\n\nv 3\ne 1 2\ne 2 3 7 x y\ne 1 z\ne 3\n# komentarz\n")
+    parsed = parse_obj(path)
+    assert "[WARN]" in capsys.readouterr().out
+    assert list(parsed.vertices) == [1, 2, 3]
+    assert [parsed.label(i) for i in parsed.vertex_labels] == [["a"], ["b", "c"], []]
+    assert list(zip(parsed.src, parsed.dst)) == [(1, 2), (2, 3)]
+    assert list(parsed.edge_idx) == [1, 7]
+    assert parsed.label(parsed.edge_labels[1]) == ["x", "y"]
+    G = dp.Graph.from_obj(path, lazy_pos=True)
+    assert G.get_labels(2) == ["b", "c"] and G.edge_labels[(2, 3)] == ["x", "y"]
+    # każdy wierzchołek ma własną listę etykiet
+    assert G.get_labels(1) is not dp.Graph.from_obj(path, lazy_pos=True).get_labels(1)
+
+
+def test_parse_csv_with_labels_and_junk(tmp_path):
+    path = _write(tmp_path, "g.csv", b"3, red, green, blue\n1, 2\nfoo, bar\n2,3\n\n3\n")
+    parsed = parse_csv(path)
+    assert list(parsed.vertices) == [1, 2, 3]
+    assert [parsed.label(i) for i in parsed.vertex_labels] == ["red", "green", "blue"]
+    assert list(zip(parsed.src, parsed.dst)) == [(1, 2), (2, 3)]
+    # bez liczby wierzchołków w pierwszej linii wszystkie linie są krawędziami
+    parsed = parse_csv(_write(tmp_path, "edges.csv", b"u, v\n1, 2\n2, 4\n"))
+    assert list(parsed.vertices) == [] and list(zip(parsed.src, parsed.dst)) == [(1, 2), (2, 4)]
+
+
+def test_empty_files_give_empty_graphs(tmp_path):
+    assert parse_obj(_write(tmp_path, "e.obj", b"")) is None
+    assert parse_csv(_write(tmp_path, "e.csv", b"\n\n")) is None
+    for loader, name in ((dp.Graph.from_obj, "e.obj"), (dp.ArrayGraph.from_csv, "e.csv")):
+        assert loader(str(tmp_path / name), lazy_pos=True).number_of_nodes() == 0
@@ -0,0 +1,27 @@
+import itertools
+
+import numpy as np
+
+import src as dp
+from conftest import example_productions, random_graph, is_valid
+
+
+def test_find_matches_equals_brute_force():
+    for seed in range(5):
+        G = random_graph(seed)
+        for production in example_productions():
+            k = len(production.compiled.L_nodes_sorted)
+            brute = {m for m in itertools.permutations(G.nodes(), k) if is_valid(production, G, list(m))}
+            assert {tuple(m) for m in production.find_matches(G)} == brute
+
+
+def test_labels_filter_find_matches_but_not_validate():
+    L = dp.Graph(vertices=[1, 2], edges=[(1, 2)], vertex_labels={1: "a"}, lazy_pos=True)
+    R = dp.Graph(vertices=[1, 2], edges=[(1, 2)], vertex_labels={1: "a"}, lazy_pos=True)
+    production = dp.Production(L, R)
+    G = dp.Graph(vertices=[1, 2, 3], edges=[(1, 2), (3, 2)], vertex_labels={1: "a", 3: "b"}, lazy_pos=True)
+    assert [list(m) for m in production.find_matches(G)] == [[1, 2]]
+    # etykieta 3 różni się od etykiety L - apply i validate_many ją przyjmują
+    assert is_valid(production, G, [3, 2])
+    mask, _, _ = production.validate_many(G, np.array([[1, 2], [3, 2]]))
+    assert mask.tolist() == [True, True]
@@ -0,0 +1,49 @@
+import gc
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import pytest
+
+import src as dp
+from src.matching import Matcher
+from src.parallel_search import SharedGraph
+from conftest import example_productions, random_graph
+
+
+def test_parallel_search_equals_find_matches():
+    G = random_graph(0, n=30, m=60)
+    for production in example_productions():
+        expected = [tuple(m) for m in production.find_matches(G)]
+        found = [tuple(m) for m in dp.find_matches_parallel(production, G, workers=2)]
+        assert sorted(found) == sorted(expected)
+
+
+def test_limit_interrupts_running_chunks(monkeypatch):
+    if multiprocessing.get_start_method() != "fork":
+        pytest.skip("wolny _node_feasible trafia do procesów roboczych tylko przez fork")
+    feasible = Matcher._node_feasible
+
+    def slow(self, a, x):
+        if x > 200:
+            time.sleep(0.02)
+        return feasible(self, a, x)
+
+    # fragment 1 (wierzchołki 201..400) przeszukiwany w całości trwałby ~4 s
+    monkeypatch.setattr(Matcher, "_node_feasible", slow)
+    L = dp.Graph(vertices=[1, 2], edges=[(1, 2)], lazy_pos=True)
+    production = dp.Production(L, L.copy_structure())
+    G = dp.Graph(vertices=range(1, 401), edges=[(1, 2)], lazy_pos=True)
+    start = time.perf_counter()
+    found = list(dp.find_matches_parallel(production, G, workers=2, limit=1, chunk_size=200))
+    assert found == [[1, 2]]
+    assert time.perf_counter() - start < 2.0
+
+
+def test_shared_graph_released_without_close():
+    shared = SharedGraph(random_graph(0))
+    name = shared.name
+    del shared
+    gc.collect()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
@@ -0,0 +1,12 @@
+from conftest import same_graph, example_productions, random_graph
+
+
+def test_apply_parallel_equals_sequential_apply():
+    for seed in range(5):
+        G = random_graph(seed, n=20, m=30)
+        for production in example_productions():
+            output, applied = production.apply_parallel(G)
+            expected = G
+            for mapping in applied:
+                expected = production.apply(expected, mapping)
+            same_graph(output, expected)
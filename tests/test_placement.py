@@ -0,0 +1,43 @@
+import math
+
+import src as dp
+from conftest import GRAPHS, example_productions
+
+
+def test_local_placement_moves_only_new_nodes(monkeypatch):
+    G = dp.Graph.from_obj(f"{GRAPHS}/initial_graph.obj", placement=dp.PLACEMENT_LOCAL)
+    before = {n: list(G.pos[n]) for n in G.nodes()}
+    production = example_productions()[0]
+
+    def full_layout(*args, **kwargs):
+        raise AssertionError("układ całego grafu przy rozmieszczaniu lokalnym")
+
+    monkeypatch.setattr(dp.Graph, "_run_layout", full_layout)
+    mapping = next(iter(production.find_matches(G, limit=1)))
+    output = production.apply(G, mapping)
+    new = [n for n in output.nodes() if n not in before]
+    assert new
+    for n in output.nodes():
+        if n in before:
+            assert list(output.pos[n]) == before[n]
+    spread = max(math.dist(before[a], before[b]) for a in before for b in before)
+    for n in new:
+        neighbours = [m for m in list(output.successors(n)) + list(output.predecessors(n)) if m in before]
+        centre = [sum(before[m][0] for m in neighbours) / len(neighbours),
+                  sum(before[m][1] for m in neighbours) / len(neighbours)]
+        # blisko sąsiadów, ale nie na żadnym z nich
+        assert math.dist(output.pos[n], centre) < spread
+        assert all(math.dist(output.pos[n], before[m]) > 0 for m in neighbours)
+
+
+def test_relax_local_keeps_other_positions():
+    G = dp.Graph(vertices=[1, 2, 3], edges=[(1, 2), (2, 3)], pos={1: [0.0, 0.0], 2: [1.0, 0.0], 3: [2.0, 0.0]},
+                 placement=dp.PLACEMENT_LOCAL)
+    G.add_node(4)
+    G.add_edge(4, 2)
+    G.add_edge(4, 3)
+    assert G._unplaced == {4}
+    G.relax_local()
+    assert not G._unplaced
+    assert G.pos[1] == [0.0, 0.0] and G.pos[2] == [1.0, 0.0] and G.pos[3] == [2.0, 0.0]
+    assert 0 < math.dist(G.pos[4], [1.5, 0.0]) < 2.0
@@ -0,0 +1,41 @@
+import math
+
+import src as dp
+from src.render import EDGE_CHUNK, LEGEND_LABELS, new_figure, render_graph, render_to_file
+
+
+def _grid(side, labelled=True):
+    nodes = list(range(1, side * side + 1))
+    edges = [(i, i + 1) for i in nodes if i % side] + [(i, i + side) for i in nodes if i + side <= len(nodes)]
+    labels = {n: f"l{n % 15}" for n in nodes} if labelled else None
+    pos = {n: [(n - 1) % side, (n - 1) // side] for n in nodes}
+    return dp.Graph(vertices=nodes, edges=edges, vertex_labels=labels, pos=pos)
+
+
+def test_small_graph_gets_arrows_and_texts():
+    G = _grid(4)
+    ax = new_figure().add_subplot()
+    render_graph(G, ax, lod_labels=100)
+    assert len(ax.patches) == G.number_of_edges()
+    # numer i etykieta każdego wierzchołka
+    assert len(ax.texts) == 2 * G.number_of_nodes()
+
+
+def test_large_graph_is_batched_and_aggregated(tmp_path):
+    G = _grid(80)
+    ax = new_figure().add_subplot()
+    pos = render_graph(G, ax, lod_labels=100)
+    assert set(pos) == set(G.nodes())
+    assert not ax.patches and not ax.texts
+    assert len(ax.lines) == math.ceil(G.number_of_edges() / EDGE_CHUNK)
+    # jedna kolekcja wierzchołków i wpisy legendy (najczęstsze etykiety + "inne")
+    legend = [t.get_text() for t in ax.get_legend().get_texts()]
+    assert len(legend) == LEGEND_LABELS + 1 and legend[-1].startswith("inne")
+    render_to_file(G, str(tmp_path / "g.png"), lod_labels=100)
+    assert (tmp_path / "g.png").stat().st_size > 0
+
+
+def test_large_unlabelled_graph_has_no_legend():
+    ax = new_figure().add_subplot()
+    render_graph(_grid(20, labelled=False), ax, lod_labels=100)
+    assert ax.get_legend() is None and len(ax.collections) == 1
@@ -0,0 +1,19 @@
+import src as dp
+from conftest import same_graph, example_productions, random_graph
+
+
+def test_rewriting_system_matches_stay_complete():
+    productions = example_productions()
+    system = dp.RewritingSystem(productions)
+    G = random_graph(1, n=12, m=20)
+    system.reset(G)
+    for _ in range(4):
+        if not system.step():
+            break
+        for i, production in enumerate(productions):
+            assert sorted(map(tuple, system.matches(i))) == sorted(map(tuple, production.find_matches(G)))
+    # te same kroki przez Production.apply
+    replay = random_graph(1, n=12, m=20)
+    for i, mapping in system.history:
+        replay = productions[i].apply(replay, mapping)
+    same_graph(system.graph, replay)
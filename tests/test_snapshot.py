@@ -0,0 +1,60 @@
+import shutil
+
+import numpy as np
+
+import src as dp
+from conftest import same_graph, obj_graph, obj_production
+
+
+def test_loaded_graph_is_independent_of_snapshot_files(tmp_path):
+    G = obj_graph("initial_graph.obj")
+    pos = {n: list(G.pos[n]) for n in G.nodes()}
+    G.save_snapshot(str(tmp_path / "snap"))
+    loaded = dp.Graph.load_snapshot(str(tmp_path / "snap"))
+    # nadpisanie i usunięcie zrzutu nie zmienia wczytanego grafu
+    other = dp.Graph(vertices=list(G.nodes()), edges=[], pos={n: [9.0, 9.0] for n in G.nodes()})
+    other.save_snapshot(str(tmp_path / "snap"))
+    shutil.rmtree(tmp_path / "snap")
+    same_graph(loaded, G)
+    for n in G.nodes():
+        assert not isinstance(loaded.pos[n], np.ndarray)
+        assert loaded.pos[n] == pos[n]
+
+
+def test_snapshot_after_apply_matches_apply(tmp_path):
+    production = obj_production("production_left.obj", "production_right.obj")
+    G = obj_graph("initial_graph.obj")
+    result = production.apply(G, [1, 2], inplace=True)
+    # Graph zostawia indeks usuniętej krawędzi (1, 2) - zrzut musi go pominąć
+    assert (1, 2) in result.edge_idx and not result.has_edge(1, 2)
+    result.save_snapshot(str(tmp_path / "snap"))
+    for cls in (dp.Graph, dp.ArrayGraph):
+        loaded = cls.load_snapshot(str(tmp_path / "snap"))
+        same_graph(loaded, result)
+        assert {e: loaded.edge_idx[e] for e in loaded.edges() if e in loaded.edge_idx} == \
+            {e: result.edge_idx[e] for e in result.edges() if e in result.edge_idx}
+
+
+def test_labels_round_trip_with_their_types(tmp_path):
+    labels = {1: ("a", 1), 2: ["h"], 3: "x", 4: 7}
+    G = dp.ArrayGraph(vertices=[1, 2, 3, 4, 5], edges=[(1, 2), (2, 3)], vertex_labels=labels,
+                      edge_labels={(1, 2): ("e", 2)}, lazy_pos=True)
+    G.save_snapshot(str(tmp_path / "snap"))
+    loaded = dp.ArrayGraph.load_snapshot(str(tmp_path / "snap"))
+    for node, label in labels.items():
+        assert loaded.get_labels(node) == label and type(loaded.get_labels(node)) is type(label)
+    assert loaded.edge_labels[(1, 2)] == ("e", 2)
+    assert loaded.nodes_with_label(("a", 1)) == [1]
+
+
+def test_save_snapshot_does_not_compact_the_graph(tmp_path):
+    G = dp.ArrayGraph(vertices=[1, 2, 3], edges=[(1, 2)], lazy_pos=True)
+    G.add_edge(2, 3)
+    G.remove_node(1)
+    before = {name: getattr(G, name).copy() for name in ("_node_ids", "_alive", "_indptr")}
+    n_added = G._n_added
+    G.save_snapshot(str(tmp_path / "snap"))
+    assert G._n_added == n_added
+    for name, arr in before.items():
+        assert np.array_equal(getattr(G, name), arr)
+    same_graph(dp.ArrayGraph.load_snapshot(str(tmp_path / "snap")), G)
@@ -0,0 +1,43 @@
+import networkx as nx
+
+import src as dp
+from conftest import obj_graph, example_productions
+
+
+def test_state_space_equals_naive_search():
+    production = example_productions()[0]
+    start = obj_graph("initial_graph.obj")
+    space = dp.StateSpaceExplorer([production], max_depth=2).explore(start)
+
+    def key(graph):
+        g = graph.nx_graph.copy()
+        nx.set_node_attributes(g, {n: dp.label_key(graph.get_labels(n)) for n in g}, "label")
+        return g
+
+    states = [key(start)]
+    level = [start]
+    for _ in range(2):
+        nxt = []
+        for graph in level:
+            for mapping in production.find_matches(graph):
+                result = production.apply(graph, mapping)
+                g = key(result)
+                if not any(nx.is_isomorphic(g, s, node_match=lambda a, b: a["label"] == b["label"]) for s in states):
+                    states.append(g)
+                    nxt.append(result)
+        level = nxt
+    assert len(space) == len(states)
+
+
+def test_spilled_transitions_equal_in_memory(tmp_path):
+    production = example_productions()[0]
+    start = obj_graph("initial_graph.obj")
+    in_memory = dp.StateSpaceExplorer([production], max_depth=2).explore(start)
+    spilled = dp.StateSpaceExplorer([production], max_depth=2, spill_dir=str(tmp_path),
+                                    frontier_limit=2).explore(start)
+    # przejścia są w pliku, w pamięci tylko przesunięcia
+    assert spilled.transitions.states is None
+    assert len(spilled.transitions) == len(in_memory.transitions) > 0
+    assert list(spilled.transitions) == list(in_memory.transitions)
+    assert spilled.transitions[-1] == in_memory.transitions[-1]
+    spilled.close()
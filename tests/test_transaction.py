@@ -0,0 +1,84 @@
+import src as dp
+from conftest import same_graph, obj_graph, example_productions, random_graph
+
+
+def test_added_nodes_with_reused_id(id_reuse):
+    production, G, mapping = id_reuse
+    expected = production.apply(G, mapping)
+    log = dp.UndoLog(G)
+    production.apply(G, mapping, inplace=True, undo_log=log)
+    same_graph(G, expected)
+    # wierzchołek 3 został usunięty, a nowy wierzchołek dostał jego numer
+    assert log.removed_nodes() == [3]
+    assert log.added_nodes() == [3]
+    assert G.get_labels(3) == "b"
+
+
+def test_node_added_and_removed_in_log_is_not_reported():
+    G = dp.Graph(vertices=[1], edges=[])
+    log = dp.UndoLog(G)
+    log.add_node(2)
+    log.remove_node(2)
+    assert log.added_nodes() == []
+    assert log.removed_nodes() == []
+
+
+def test_rollback_restores_graph(id_reuse):
+    production, G, mapping = id_reuse
+    before = G.copy_structure()
+    log = dp.UndoLog(G)
+    production.apply(G, mapping, inplace=True, undo_log=log)
+    log.rollback()
+    same_graph(G, before)
+
+
+def test_inplace_apply_and_rollback_match_apply():
+    for cls in (dp.Graph, dp.ArrayGraph):
+        for seed in range(5):
+            G = random_graph(seed, cls=cls)
+            before = G.copy_structure()
+            for production in example_productions():
+                for mapping in list(production.find_matches(G))[:5]:
+                    expected = production.apply(G, mapping)
+                    log = dp.UndoLog(G)
+                    production.apply(G, mapping, inplace=True, undo_log=log)
+                    same_graph(G, expected)
+                    log.rollback()
+                    same_graph(G, before)
+
+
+def test_inplace_apply_does_not_run_full_layout(monkeypatch):
+    G = obj_graph("initial_graph.obj")
+    production = example_productions()[0]
+    mapping = next(iter(production.find_matches(G, limit=1)))
+    expected = production.apply(G, mapping)
+    assert G.pos_computed and G.placement == dp.PLACEMENT_SPRING
+
+    def full_layout(*args, **kwargs):
+        raise AssertionError("układ całego grafu w kroku w miejscu")
+
+    monkeypatch.setattr(dp.Graph, "_run_layout", full_layout)
+    log = dp.UndoLog(G)
+    production.apply(G, mapping, inplace=True, undo_log=log)
+    same_graph(G, expected)
+    assert all(node in G.pos for node in log.added_nodes())
+    assert G.placement == dp.PLACEMENT_SPRING
+
+
+def test_edge_added_and_removed_in_log_is_not_reported():
+    G = dp.Graph(vertices=[1, 2, 3], edges=[(1, 2)], lazy_pos=True)
+    log = dp.UndoLog(G)
+    log.add_edge(2, 3)
+    log.remove_edge(2, 3)
+    log.add_edge(3, 1)
+    log.add_node(4)
+    log.add_edge(4, 1)
+    log.remove_node(4)
+    assert log.added_edges() == [(3, 1)]
+    assert log.removed_edges() == []
+    log.remove_edge(1, 2)
+    log.add_edge(1, 2)
+    log.remove_edge(1, 2)
+    assert log.removed_edges() == [(1, 2)]
+    # liczba krawędzi wyliczona z dziennika (jak w trybie wsadowym)
+    assert 1 + len(log.added_edges()) - len(log.removed_edges()) == G.number_of_edges()